@@ -0,0 +1,408 @@
+import asyncio
+import contextlib
+import io
+import json
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from data_manager import DataManager, TaskList, resolve_tasks
+from metrics import InstrumentedDataManager, Metrics, instrument_service
+from script_runner import UPDATABLE_FIELDS
+from task_manager import PAGE_SIZE
+from task_query import And, Contains, Eq, Range
+from task_service import IMPORTED_FIELDS, SORTING_KEYS, TaskService, validate_task_data
+
+MAX_BODY_SIZE = 1024 * 1024
+
+API_HELP = """
+HTTP API (запросы и ответы в формате JSON):
+    GET    /tasks?offset=0&limit=50        задачи по порядку id, условия ниже можно сочетать:
+           /tasks?sort=<поле>              ... отсортированные (priority, due_date, category, status)
+           /tasks?category=<категория>     ... выбранной категории
+           /tasks?search=<строка>          ... с подстрокой в названии или описании
+           /tasks?priority=<приоритет>     ... с выбранным приоритетом
+           /tasks?status=<статус>          ... с выбранным статусом
+           /tasks?due_from=<YYYY-MM-DD>    ... со сроком не раньше даты
+           /tasks?due_before=<YYYY-MM-DD>  ... со сроком раньше даты
+    GET    /tasks/<id>                     одна задача
+    POST   /tasks                          добавить задачу {title, description, category, due_date, priority}
+    PATCH  /tasks/<id>                     изменить поля задачи {поле: значение, ...}
+    POST   /tasks/<id>/complete            отметить задачу выполненной
+    DELETE /tasks/<id>                     удалить задачу
+"""
+
+
+class ApiError(Exception):
+    """Ошибка запроса, возвращаемая клиенту с HTTP-статусом."""
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Request:
+    """Разобранный запрос к API: id задачи из адреса, параметры строки запроса и JSON-тело."""
+    task_id: Optional[int] = None
+    query: dict[str, str] = field(default_factory=dict)
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+class BackgroundDataManager:
+    """
+    Обертка над менеджером данных, выполняющая сохранения в отдельном потоке.
+    Один рабочий поток сохраняет изменения строго в порядке вызовов, а вызывающий код
+    не ждет окончания записи. Чтение из менеджера данных дожидается всех начатых сохранений.
+    Если менеджер данных объединил сохранение с изменениями другого процесса, итоговый список передается
+    в on_merge. Сохранения, поставленные в очередь до того, как вызывающий код применил итоговый список,
+    объединяются с файлом заново, чтобы их устаревший список задач не затер изменения другого процесса.
+    """
+    def __init__(
+            self,
+            data_manager: DataManager,
+            executor: Optional[ThreadPoolExecutor] = None,
+            on_merge: Optional[Callable[[list[dict[str, Any]], int], None]] = None,
+    ):
+        """
+        :param on_merge: Вызывается в рабочем потоке с итоговым списком задач и номером объединения.
+        Вызывающий код должен применить список и сообщить номер объединения через adopt_merge.
+        """
+        self.data_manager = data_manager
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self.on_merge = on_merge
+        self.pending: list[Future] = []
+        # Количество объединений в рабочем потоке и номер последнего объединения, примененного вызывающим кодом
+        self.merge_count = 0
+        self.adopted_merge = 0
+        self.previous_tasks: list[dict[str, Any]] = []
+        # Последнее поставленное в очередь сохранение задач: его результат - перенумерованные id
+        self.last_save: Optional[Future] = None
+
+    def _submit(self, func: Callable, *args, **kwargs) -> Future:
+        self.pending = [future for future in self.pending if not future.done()]
+        future = self.executor.submit(func, *args, **kwargs)
+        future.add_done_callback(self._report_error)
+        self.pending.append(future)
+        return future
+
+    @staticmethod
+    def _report_error(future: Future) -> None:
+        if future.exception() is not None:
+            print(f"Ошибка сохранения задач: {future.exception()}", file=sys.stderr)
+
+    def save_tasks(
+            self,
+            tasks: TaskList,
+            changed: Optional[list[dict[str, Any]]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> None:
+        """
+        Ставит сохранение в очередь. Полный список задач строится сразу, в вызывающем потоке,
+        поэтому дальнейшие изменения задач в памяти не влияют на записываемые данные.
+        Итоговый список после объединения с изменениями другого процесса передается в on_merge.
+        Перенумерованные при объединении id можно получить из результата last_save.
+        """
+        tasks = resolve_tasks(tasks)
+        self.last_save = self._submit(self._save, tasks, changed, deleted, self.adopted_merge, self.previous_tasks)
+        self.previous_tasks = tasks
+
+    def _save(
+            self,
+            tasks: list[dict[str, Any]],
+            changed: Optional[list[dict[str, Any]]],
+            deleted: Optional[list[int]],
+            adopted_merge: int,
+            previous_tasks: list[dict[str, Any]],
+    ) -> dict[int, int]:
+        """
+        Выполняется в рабочем потоке. Если список задач построен до применения последнего объединения,
+        версия файла сбрасывается, чтобы менеджер данных объединил изменения с файлом заново.
+        Известными при этом считаются задачи, которые были у вызывающего кода до этого изменения.
+        :return: Новые id задач, перенумерованных при объединении: {прежний id: новый id}.
+        """
+        if adopted_merge < self.merge_count and hasattr(self.data_manager, "reset_for_merge"):
+            self.data_manager.reset_for_merge({task["id"] for task in previous_tasks})
+        merged = self.data_manager.save_tasks(tasks, changed=changed, deleted=deleted)
+        if merged is None:
+            return {}
+        self.merge_count += 1
+        if self.on_merge is not None:
+            self.on_merge(merged, self.merge_count)
+        return dict(getattr(self.data_manager, "renumbered", None) or {})
+
+    def adopt_merge(self, merge_number: int, tasks: list[dict[str, Any]]) -> None:
+        """Отмечает, что вызывающий код заменил задачи в памяти итоговым списком объединения merge_number."""
+        self.adopted_merge = merge_number
+        self.previous_tasks = tasks
+
+    def save_next_id(self, next_id: int) -> None:
+        self._submit(self.data_manager.save_next_id, next_id)
+
+    def flush(self) -> None:
+        """Дожидается окончания всех начатых сохранений."""
+        for future in self.pending:
+            future.exception()
+        self.pending = []
+
+    def close(self) -> None:
+        self.flush()
+        self.executor.shutdown()
+
+    def load_tasks(self) -> list[dict[str, Any]]:
+        self.flush()
+        return self.data_manager.load_tasks()
+
+    def iter_tasks(self) -> Iterator[dict[str, Any]]:
+        self.flush()
+        return self.data_manager.iter_tasks()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "data_manager":
+            raise AttributeError(name)
+        return getattr(self.data_manager, name)
+
+
+class ApiServer:
+    """
+    HTTP-сервер с JSON API над одним объектом TaskService.
+    Задачи загружаются один раз при запуске и остаются в памяти. Все запросы обрабатываются
+    в одном потоке цикла событий, а операции TaskService не содержат точек переключения,
+    поэтому изменения задач выполняются последовательно и не пересекаются с чтением.
+    Запись на диск выполняется в отдельном потоке через BackgroundDataManager.
+    """
+    def __init__(self, task_service: TaskService):
+        self.task_service = task_service
+        self.routes = {
+            ("GET", False, None): self.list_tasks,
+            ("POST", False, None): self.add_task,
+            ("GET", True, None): self.get_task,
+            ("PATCH", True, None): self.update_task,
+            ("DELETE", True, None): self.delete_task,
+            ("POST", True, "complete"): self.complete_task,
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.Server:
+        """Загружает задачи и начинает принимать соединения."""
+        data_manager = self.task_service.data_manager
+        if isinstance(data_manager, BackgroundDataManager):
+            loop = asyncio.get_running_loop()
+            data_manager.on_merge = lambda merged, number: loop.call_soon_threadsafe(
+                self._apply_merge, data_manager, merged, number,
+            )
+        await asyncio.get_running_loop().run_in_executor(None, self.task_service.reload_tasks)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        server = await self.start(host, port)
+        print(f"Сервер запущен: http://{host}:{server.sockets[0].getsockname()[1]}/tasks", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Обрабатывает запросы одного соединения, пока клиент не закроет его (HTTP/1.1 keep-alive)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_SIZE:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Слишком большой запрос"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method, target, body)
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _apply_merge(self, data_manager: BackgroundDataManager, merged: list[dict[str, Any]], number: int) -> None:
+        """
+        Заменяет задачи в памяти итоговым списком, который сохранение в рабочем потоке получило
+        при объединении с изменениями другого процесса. Выполняется в потоке цикла событий.
+        """
+        if number <= data_manager.adopted_merge:
+            return
+        self.task_service._set_tasks(merged)
+        data_manager.adopt_merge(number, merged)
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple[HTTPStatus, Any]:
+        """
+        Находит обработчик запроса и возвращает статус ответа и данные для отправки клиенту.
+        Обработчик может быть сопрограммой, если перед ответом ему нужно дождаться сохранения.
+        """
+        url = urlsplit(target)
+        parts = url.path.strip("/").split("/")
+        try:
+            if parts[0] != "tasks" or len(parts) > 3:
+                raise ApiError(HTTPStatus.NOT_FOUND, "Неизвестный адрес")
+            task_id = self._task_id(parts[1]) if len(parts) > 1 else None
+            handler = self.routes.get((method, task_id is not None, parts[2] if len(parts) > 2 else None))
+            if handler is None:
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "Метод не поддерживается")
+            response = handler(Request(
+                task_id=task_id,
+                query={key: values[-1] for key, values in parse_qs(url.query).items()},
+                data=self._parse_body(body),
+            ))
+            return await response if asyncio.iscoroutine(response) else response
+        except ApiError as error:
+            return error.status, {"error": str(error)}
+        except Exception as error:
+            # Непредвиденная ошибка обработчика не должна обрывать соединение без ответа
+            print(f"Ошибка обработки запроса {method} {target}: {error!r}", file=sys.stderr)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Внутренняя ошибка сервера"}
+
+    def _task_id(self, value: str) -> int:
+        if not value.isdigit() or int(value) not in self.task_service.tasks_by_id:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Задача с id '{value}' не найдена")
+        return int(value)
+
+    @staticmethod
+    def _parse_body(body: bytes) -> dict[str, Any]:
+        if not body:
+            return {}
+        try:
+            data = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Тело запроса должно быть в формате JSON")
+        if not isinstance(data, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Тело запроса должно быть JSON-объектом")
+        return data
+
+    def _mutate(self, method, *args) -> tuple[Any, str]:
+        """Вызывает изменяющий метод TaskService и возвращает его результат и выведенное им сообщение."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = method(*args)
+        return result, output.getvalue().strip()
+
+    def list_tasks(self, request: Request) -> tuple[HTTPStatus, Any]:
+        query = dict(request.query)
+        try:
+            offset = int(query.pop("offset", 0))
+            limit = int(query.pop("limit", PAGE_SIZE))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "offset и limit должны быть числами")
+        if offset < 0 or limit < 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "offset и limit не могут быть отрицательными")
+        order_by = query.pop("sort", None)
+        if order_by is not None and order_by not in SORTING_KEYS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Неизвестное поле сортировки '{order_by}'")
+
+        conditions = []
+        for name, value in query.items():
+            if name == "category":
+                conditions.append(Eq(name, value))
+            elif name in ("priority", "status"):
+                conditions.append(Eq(name, value.lower()))
+            elif name == "search":
+                conditions.append(Contains(value))
+            elif name == "due_from":
+                conditions.append(Range("due_date", start=value))
+            elif name == "due_before":
+                conditions.append(Range("due_date", end=value))
+            else:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"Неизвестный параметр выборки '{name}={value}'")
+        tasks = self.task_service.query_tasks(
+            And(*conditions) if conditions else None, order_by=order_by, offset=offset, limit=limit + 1,
+        )
+        return HTTPStatus.OK, {
+            "tasks": [task.to_dict() for task in tasks[:limit]],
+            "has_more": len(tasks) > limit,
+        }
+
+    def get_task(self, request: Request) -> tuple[HTTPStatus, Any]:
+        return HTTPStatus.OK, self.task_service.tasks_by_id[request.task_id].to_dict()
+
+    async def add_task(self, request: Request) -> tuple[HTTPStatus, Any]:
+        """
+        Добавляет задачу и перед ответом дожидается ее сохранения: если другой процесс уже занял ее id,
+        задача перенумеровывается при объединении, и клиент должен получить окончательный id.
+        """
+        if error := validate_task_data(request.data):
+            raise ApiError(HTTPStatus.BAD_REQUEST, error)
+        task, message = self._mutate(
+            lambda: self.task_service.add_task(**{key: request.data[key] for key in IMPORTED_FIELDS})
+        )
+        data_manager = self.task_service.data_manager
+        if isinstance(data_manager, BackgroundDataManager) and data_manager.last_save is not None:
+            # Объединенный список применяется в цикле событий (_apply_merge) до возврата из ожидания
+            renumbered = await asyncio.wrap_future(data_manager.last_save)
+            task_id = renumbered.get(task.id, task.id)
+            task = self.task_service.tasks_by_id.get(task_id) or self.task_service.task_class.from_dict(
+                dict(task.to_dict(), id=task_id),
+            )
+        return HTTPStatus.CREATED, {"task": task.to_dict(), "message": message}
+
+    def update_task(self, request: Request) -> tuple[HTTPStatus, Any]:
+        unknown = set(request.data) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Поля нельзя изменить: {', '.join(sorted(unknown))}")
+        task = self.task_service.tasks_by_id[request.task_id]
+        if error := validate_task_data(dict(task.to_dict(), **request.data)):
+            raise ApiError(HTTPStatus.BAD_REQUEST, error)
+        messages = [
+            self._mutate(self.task_service.update_task, request.task_id, updated_attr, new_value)[1]
+            for updated_attr, new_value in request.data.items()
+        ]
+        return HTTPStatus.OK, {"task": task.to_dict(), "message": "\n".join(messages)}
+
+    def complete_task(self, request: Request) -> tuple[HTTPStatus, Any]:
+        _, message = self._mutate(self.task_service.complete_task, request.task_id)
+        return HTTPStatus.OK, {
+            "task": self.task_service.tasks_by_id[request.task_id].to_dict(),
+            "message": message,
+        }
+
+    def delete_task(self, request: Request) -> tuple[HTTPStatus, Any]:
+        _, message = self._mutate(lambda: self.task_service.delete_task(request.task_id))
+        return HTTPStatus.OK, {"message": message}
+
+
+def run_server(
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        data_manager: Optional[DataManager] = None,
+        metrics: Optional[Metrics] = None,
+) -> None:
+    """
+    Запускает сервер до прерывания (Ctrl+C), сохраняя все изменения перед выходом.
+    :param metrics: Собирать метрики операций сервиса и менеджера данных.
+    """
+    data_manager = data_manager or DataManager()
+    if metrics is not None:
+        data_manager = InstrumentedDataManager(data_manager, metrics)
+    data_manager = BackgroundDataManager(data_manager)
+    task_service = TaskService(data_manager=data_manager)
+    if metrics is not None:
+        instrument_service(task_service, metrics)
+    server = ApiServer(task_service)
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        data_manager.close()
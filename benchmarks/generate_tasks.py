@@ -0,0 +1,89 @@
+"""
+Генератор синтетических задач для нагрузочного тестирования.
+Создает задачи с правдоподобными русскими названиями и описаниями по всем категориям,
+приоритетам и статусам. При одинаковом seed результат одинаковый.
+
+Пример: python benchmarks/generate_tasks.py 100000 tasks.json
+"""
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_manager import DataManager
+from task_service import TaskCategory, TaskPriority, TaskStatus
+
+ACTIONS = {
+    TaskCategory.WORK.value: (
+        ["Подготовить", "Согласовать", "Проверить", "Отправить", "Обсудить", "Доработать"],
+        ["квартальный отчет", "презентацию для клиента", "план проекта", "договор с подрядчиком",
+         "техническое задание", "бюджет отдела", "релиз сервиса", "задачи спринта"],
+    ),
+    TaskCategory.PERSONAL.value: (
+        ["Купить", "Забрать", "Заказать", "Починить", "Организовать", "Оплатить"],
+        ["подарок маме", "продукты на неделю", "билеты в театр", "велосипед", "день рождения друга",
+         "коммунальные услуги", "новый диван", "поездку на выходные"],
+    ),
+    TaskCategory.STUDY.value: (
+        ["Изучить", "Прочитать", "Повторить", "Законспектировать", "Сдать", "Пройти"],
+        ["основы FastAPI", "главу по алгоритмам", "курс по SQL", "лекцию по статистике",
+         "экзамен по английскому", "документацию asyncio", "книгу о чистом коде", "тест по Python"],
+    ),
+    TaskCategory.HEALTH.value: (
+        ["Записаться", "Сходить", "Сдать", "Начать", "Продлить", "Пройти"],
+        ["к стоматологу", "на тренировку", "анализы", "утреннюю пробежку", "абонемент в бассейн",
+         "медосмотр", "курс витаминов", "прием у терапевта"],
+    ),
+    TaskCategory.OTHER.value: (
+        ["Разобрать", "Найти", "Выбросить", "Переставить", "Сфотографировать", "Записать"],
+        ["старые документы", "гараж", "зимние вещи", "книжную полку", "идеи для блога",
+         "список дел на год", "коробки после переезда", "рецепты бабушки"],
+    ),
+}
+
+DETAILS = [
+    "до конца недели", "вместе с коллегами", "не забыть взять документы", "уточнить сроки заранее",
+    "согласовать с руководителем", "проверить все детали", "обязательно до пятницы", "если будет время",
+    "по возможности утром", "записать итоги в заметки",
+]
+
+START_DATE = date(2024, 1, 1)
+DATE_RANGE_DAYS = 3 * 365
+
+
+def generate_tasks(count: int, seed: int = 0) -> Iterator[dict[str, Any]]:
+    """Поочередно создает count задач с id от 1 до count."""
+    generator = random.Random(seed)
+    categories = list(ACTIONS)
+    priorities = [priority.value for priority in TaskPriority]
+    statuses = [status.value for status in TaskStatus]
+    for task_id in range(1, count + 1):
+        category = generator.choice(categories)
+        verbs, objects = ACTIONS[category]
+        verb, obj = generator.choice(verbs), generator.choice(objects)
+        yield {
+            "id": task_id,
+            "title": f"{verb} {obj}",
+            "description": f"{verb} {obj}, {generator.choice(DETAILS)}. Задача №{task_id}",
+            "category": category,
+            "due_date": (START_DATE + timedelta(days=generator.randrange(DATE_RANGE_DAYS))).isoformat(),
+            "priority": generator.choice(priorities),
+            "status": generator.choices(statuses, weights=(3, 7))[0],
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Генерирует файл tasks.json с синтетическими задачами")
+    parser.add_argument("count", type=int, help="количество задач")
+    parser.add_argument("output", type=Path, help="путь к создаваемому файлу")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    DataManager(args.output).save_tasks(list(generate_tasks(args.count, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
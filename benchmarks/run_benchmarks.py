@@ -0,0 +1,195 @@
+"""
+Нагрузочное тестирование операций TaskService на синтетических наборах задач.
+Для каждого размера набора замеряет запуск приложения до вывода меню, загрузку, сохранение,
+добавление задачи, поиск по id, все виды поиска, сортировки и вывод по категориям. Результаты выводятся в формате JSON,
+чтобы их можно было сравнивать между версиями.
+
+Пример: python benchmarks/run_benchmarks.py --sizes 1000 10000 --output results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.generate_tasks import generate_tasks
+from binary_data_manager import BinaryDataManager
+from data_manager import DataManager
+from sharded_data_manager import ShardedDataManager
+from sqlite_data_manager import SQLiteDataManager
+from task_manager import PAGE_SIZE
+from task_service import SORTING_KEYS, TaskCategory, TaskPriority, TaskService, TaskStatus
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+DATA_MANAGERS = {
+    "json": (DataManager, "tasks.json"),
+    "sqlite": (SQLiteDataManager, "tasks.db"),
+    "binary": (BinaryDataManager, "tasks.bin"),
+    "sharded": (ShardedDataManager, "tasks"),
+}
+
+SEARCH_CASES = {
+    "search": "отчет",
+    "status": TaskStatus.UNCOMPLETED.value,
+    "priority": TaskPriority.HIGH_PRIORITY.value,
+}
+
+NEW_TASK = {
+    "title": "Новая задача для замера",
+    "description": "Добавлена во время нагрузочного тестирования",
+    "category": TaskCategory.WORK.value,
+    "due_date": "2030-01-01",
+    "priority": TaskPriority.MID_PRIORITY.value,
+}
+
+LOOKUPS = 1000
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Запуск интерактивного приложения до вывода меню: импорт модулей, создание TaskManager и TaskService
+STARTUP_CODE = "import main; main.TaskManager(); main.display_menu()"
+
+
+def measure(func: Callable[[], Any], repeat: int, calls: int = 1) -> dict[str, float]:
+    """
+    Выполняет func repeat раз с подавленным выводом на экран.
+    :param calls: Сколько операций выполняет один вызов func, время пересчитывается на одну операцию.
+    :return: Минимальное и медианное время одной операции в миллисекундах.
+    """
+    timings = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000 / calls)
+    return {"min_ms": round(min(timings), 4), "median_ms": round(statistics.median(timings), 4)}
+
+
+def measure_startup(size: int, directory: Path, repeat: int) -> dict[str, float]:
+    """
+    Замеряет запуск приложения в отдельном процессе в каталоге с файлом tasks.json из size задач,
+    включая запуск интерпретатора: так замер учитывает и импорт модулей, и работу при создании объектов.
+    """
+    working_directory = directory / f"{size}_startup"
+    working_directory.mkdir()
+    DataManager(working_directory / "tasks.json").save_tasks(list(generate_tasks(size)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (str(ROOT), os.environ.get("PYTHONPATH")))))
+    return measure(
+        lambda: subprocess.run(
+            [sys.executable, "-c", STARTUP_CODE],
+            cwd=working_directory, env=env, stdout=subprocess.DEVNULL, check=True,
+        ),
+        repeat,
+    )
+
+
+def benchmark_size(size: int, backend: str, directory: Path, repeat: int, compact: bool) -> dict[str, Any]:
+    """Замеряет все операции на наборе из size задач."""
+    manager_class, file_name = DATA_MANAGERS[backend]
+    path = directory / f"{size}_{file_name}"
+    manager_class(path).save_tasks(list(generate_tasks(size)))
+
+    def new_service() -> TaskService:
+        return TaskService(data_manager=manager_class(path), compact=compact)
+
+    results = {
+        "startup": measure_startup(size, directory, repeat),
+        "first_page": measure(lambda: new_service().display_tasks(limit=PAGE_SIZE), repeat),
+        "load": measure(lambda: new_service().tasks, repeat),
+    }
+
+    task_service = new_service()
+    task_service.tasks
+    results["save"] = measure(task_service._save_tasks, repeat)
+    results["add_task"] = measure(lambda: task_service.add_task(**NEW_TASK), repeat)
+
+    task_ids = random.Random(size).choices(range(1, size + 1), k=LOOKUPS)
+    results["get_task_by_id"] = measure(
+        lambda: [task_service._get_task_by_id(task_id) for task_id in task_ids], repeat, calls=LOOKUPS,
+    )
+    for search_type, search_term in SEARCH_CASES.items():
+        results[f"search_task[{search_type}]"] = measure(
+            lambda: task_service.search_task(search_type, search_term, limit=PAGE_SIZE), repeat,
+        )
+        if search_type == "search":
+            # Первый текстовый поиск запускает построение индекса триграмм в фоновом потоке,
+            # дожидаемся его, чтобы построение не замедляло следующие замеры
+            task_service.text_index.wait_for_build()
+    for sorting_term in SORTING_KEYS:
+        results[f"display_sorted_tasks[{sorting_term}]"] = measure(
+            lambda: task_service.display_sorted_tasks(sorting_term, limit=PAGE_SIZE), repeat,
+        )
+    for category in TaskCategory:
+        results[f"display_tasks_by_category[{category.value}]"] = measure(
+            lambda: task_service.display_tasks_by_category(category.value, limit=PAGE_SIZE), repeat,
+        )
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+        sizes: tuple[int, ...] = SIZES,
+        backend: str = "json",
+        repeat: int = 3,
+        compact: bool = False,
+) -> dict[str, Any]:
+    """Запускает замеры для всех размеров наборов и возвращает отчет."""
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend,
+            "compact": compact,
+            "repeat": repeat,
+            "page_size": PAGE_SIZE,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            report["results"][str(size)] = benchmark_size(size, backend, Path(directory), repeat, compact)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочное тестирование TaskService")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="размеры наборов задач")
+    parser.add_argument("--backend", choices=DATA_MANAGERS, default="json", help="менеджер данных")
+    parser.add_argument("--repeat", type=int, default=3, help="количество повторов каждого замера")
+    parser.add_argument("--compact", action="store_true", help="использовать компактное представление задач")
+    parser.add_argument("--output", type=Path, help="файл для отчета (по умолчанию - стандартный вывод)")
+    args = parser.parse_args()
+
+    report = json.dumps(
+        run_benchmarks(tuple(args.sizes), args.backend, args.repeat, args.compact),
+        indent=4, ensure_ascii=False,
+    )
+    if args.output:
+        args.output.write_text(report, encoding="utf-8")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
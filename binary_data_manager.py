@@ -0,0 +1,254 @@
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from data_manager import DataManager, TaskList, resolve_tasks
+from task_service import PRIORITY_WEIGHT, TaskCategory, TaskPriority, TaskStatus, parse_date
+
+MAGIC = b"TASKBIN1"
+# magic, количество записей, смещение кучи строк, смещение таблиц кодов
+HEADER = struct.Struct("<8sQQQ")
+# id, коды категории, приоритета и статуса, номер дня срока выполнения,
+# смещения и длины названия, описания и срока выполнения (если он не в формате YYYY-MM-DD)
+RECORD = struct.Struct("<qBBBxiIIIIII")
+STATUS_OFFSET = 10
+
+CODED_FIELDS = {"category": TaskCategory, "priority": TaskPriority, "status": TaskStatus}
+# Позиции кодов полей в распакованной записи
+CODED_FIELDS_INDEX = {"category": 1, "priority": 2, "status": 3}
+
+
+class BinaryDataManager(DataManager):
+    """
+    Менеджер данных с двоичным форматом файла для быстрого запуска на больших наборах данных.
+    Файл состоит из заголовка, таблицы записей фиксированной длины, отсортированной по id,
+    кучи строк в UTF-8 и таблиц кодов для категории, приоритета и статуса.
+    Файл открывается через mmap, задачи декодируются только при обращении к ним,
+    а изменение статуса записывается на место без перезаписи файла.
+    """
+    def __init__(self, file_path: Path = Path("tasks.bin"), fsync: bool = False):
+        super().__init__(file_path, fsync)
+        self.mmap: Optional[mmap.mmap] = None
+        # Версия (inode, время изменения, размер) отображенного файла: если другой процесс или объект
+        # заменил файл через os.replace, отображение открывается заново
+        self.mapped_version: Optional[tuple[int, int, int]] = None
+        self.count = 0
+        self.heap_offset = 0
+        self.codes: dict[str, list[str]] = {}
+
+    def load_tasks(self) -> list[dict[str, Any]]:
+        """Выгружает все задачи из файла в порядке увеличения id."""
+        return list(self.iter_tasks())
+
+    def iter_tasks(self) -> Iterator[dict[str, Any]]:
+        """Поочередно декодирует задачи из файла в порядке увеличения id."""
+        for record in self._records():
+            yield self._decode(record)
+
+    def get_task(self, task_id: int) -> Optional[dict[str, Any]]:
+        """Находит задачу по id бинарным поиском по таблице записей."""
+        row = self._find_row(task_id)
+        return None if row is None else self._decode(self._record(row))
+
+    def find_tasks(
+            self,
+            equals: Optional[dict[str, str]] = None,
+            contains: Optional[str] = None,
+            order_by: Optional[str] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Выполняет выборку задач, просматривая таблицу записей.
+        Условия на категорию, приоритет и статус проверяются по кодам, строки декодируются
+        только для задач, прошедших эти условия.
+        :param equals: Точное совпадение значений полей, например {'category': 'работа'}.
+        :param contains: Подстрока для поиска в названии и описании без учета регистра.
+        :param order_by: Поле для сортировки, приоритет сортируется от высокого к низкому.
+        :param offset: Сколько найденных задач пропустить.
+        :param limit: Максимальное количество задач, None - без ограничения.
+        Без сортировки просмотр останавливается, как только набрана нужная страница.
+        :return: Список найденных задач.
+        """
+        self._open()
+        coded, other = {}, {}
+        for field, value in (equals or {}).items():
+            if field in CODED_FIELDS:
+                if value not in self.codes.get(field, []):
+                    return []
+                coded[CODED_FIELDS_INDEX[field]] = self.codes[field].index(value)
+            else:
+                other[field] = value
+
+        end = None if limit is None else offset + limit
+        tasks = []
+        for record in self._records():
+            if order_by is None and end is not None and len(tasks) >= end:
+                break
+            if any(record[position] != code for position, code in coded.items()):
+                continue
+            task = self._decode(record)
+            if any(task.get(field) != value for field, value in other.items()):
+                continue
+            if contains is not None and not (
+                    contains.lower() in task["title"].lower() or contains.lower() in task["description"].lower()):
+                continue
+            tasks.append(task)
+
+        if order_by == "priority":
+            tasks.sort(key=lambda task: -PRIORITY_WEIGHT.get(task["priority"], 0))
+        elif order_by is not None:
+            tasks.sort(key=lambda task: task[order_by])
+        return tasks[offset:end]
+
+    def save_tasks(
+            self,
+            tasks: TaskList,
+            changed: Optional[list[dict[str, Any]]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> None:
+        """
+        Сохраняет задачи. Если изменился только статус существующих задач, новые коды статуса
+        записываются на место в таблицу записей. В остальных случаях файл перезаписывается целиком.
+        """
+        with self.locked():
+            if changed is not None and not deleted and self.update_statuses(changed):
+                return
+            self._write(resolve_tasks(tasks))
+
+    def close(self) -> None:
+        """Закрывает отображение файла в память."""
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def _open(self) -> None:
+        """
+        Открывает файл через mmap и читает заголовок и таблицы кодов, если это еще не сделано
+        или если файл был заменен после открытия.
+        """
+        if self.mmap is not None:
+            if self._current_version() == self.mapped_version:
+                return
+            self.close()
+        try:
+            with self.file_path.open("r+b") as file:
+                stat = os.fstat(file.fileno())
+                if stat.st_size == 0:
+                    return
+                self.mmap = mmap.mmap(file.fileno(), 0)
+                self.mapped_version = self._file_version(stat)
+        except FileNotFoundError:
+            return
+        magic, self.count, self.heap_offset, codes_offset = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Файл {self.file_path} не является файлом задач в двоичном формате")
+        self.codes = json.loads(self.mmap[codes_offset:])
+
+    def _records(self) -> Iterator[tuple]:
+        self._open()
+        if self.mmap is None:
+            return iter(())
+        return RECORD.iter_unpack(self.mmap[HEADER.size:HEADER.size + self.count * RECORD.size])
+
+    def _record(self, row: int) -> tuple:
+        return RECORD.unpack_from(self.mmap, HEADER.size + row * RECORD.size)
+
+    def _find_row(self, task_id: int) -> Optional[int]:
+        self._open()
+        if self.mmap is None:
+            return None
+        row = bisect_left(range(self.count), task_id, key=lambda position: self._record(position)[0])
+        if row < self.count and self._record(row)[0] == task_id:
+            return row
+        return None
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self.heap_offset + offset
+        return self.mmap[start:start + length].decode("utf-8")
+
+    def _decode(self, record: tuple) -> dict[str, Any]:
+        task_id, category, priority, status, ordinal, *strings = record
+        title_offset, title_length, description_offset, description_length, date_offset, date_length = strings
+        return {
+            "id": task_id,
+            "title": self._string(title_offset, title_length),
+            "description": self._string(description_offset, description_length),
+            "category": self.codes["category"][category],
+            "due_date": date.fromordinal(ordinal).isoformat() if ordinal else self._string(date_offset, date_length),
+            "priority": self.codes["priority"][priority],
+            "status": self.codes["status"][status],
+        }
+
+    def update_statuses(self, changed: list[dict[str, Any]]) -> bool:
+        """
+        Записывает новые статусы на место без загрузки и перезаписи файла.
+        Возвращает False и ничего не записывает, если задачи нет в файле или изменилось что-то кроме статуса.
+        Запись выполняется под блокировкой в отображение текущего файла, а не файла, замененного другим процессом.
+        """
+        with self.locked():
+            updates = []
+            for task in changed:
+                row = self._find_row(task["id"])
+                if row is None or task["status"] not in self.codes["status"]:
+                    return False
+                stored = self._decode(self._record(row))
+                if dict(stored, status=task["status"]) != task:
+                    return False
+                updates.append((row, self.codes["status"].index(task["status"])))
+
+            for row, code in updates:
+                self.mmap[HEADER.size + row * RECORD.size + STATUS_OFFSET] = code
+            if self.fsync:
+                self.mmap.flush()
+            self.mapped_version = self._current_version()
+        return True
+
+    def _write(self, tasks: list[dict[str, Any]]) -> None:
+        """Записывает все задачи в новый файл и атомарно заменяет им старый."""
+        codes = {field: [item.value for item in enum] for field, enum in CODED_FIELDS.items()}
+        records, heap = [], bytearray()
+
+        def add_string(value: str) -> tuple[int, int]:
+            data = value.encode("utf-8")
+            heap.extend(data)
+            return len(heap) - len(data), len(data)
+
+        def code(field: str, value: str) -> int:
+            if value not in codes[field]:
+                codes[field].append(value)
+            return codes[field].index(value)
+
+        for task in sorted(tasks, key=lambda task: task["id"]):
+            due = parse_date(task["due_date"])
+            ordinal, raw_date = (0, task["due_date"]) if due is None else (due.toordinal(), "")
+            records.append(RECORD.pack(
+                task["id"],
+                code("category", task["category"]),
+                code("priority", task["priority"]),
+                code("status", task["status"]),
+                ordinal,
+                *add_string(task["title"]),
+                *add_string(task["description"]),
+                *add_string(raw_date),
+            ))
+
+        heap_offset = HEADER.size + len(records) * RECORD.size
+        codes_offset = heap_offset + len(heap)
+        temp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+        with temp_path.open("wb") as file:
+            file.write(HEADER.pack(MAGIC, len(records), heap_offset, codes_offset))
+            file.writelines(records)
+            file.write(heap)
+            file.write(json.dumps(codes, ensure_ascii=False).encode("utf-8"))
+            if self.fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        self.close()
+        os.replace(temp_path, self.file_path)
@@ -1,24 +1,338 @@
 import json
-from typing import Any
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: блокировки файлов не поддерживаются
+    fcntl = None
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r"\s*")
+
+# Полный список задач для save_tasks: сам список или функция без аргументов, которая его строит.
+# Менеджер данных вызывает функцию, только если полный список действительно нужен для записи,
+# поэтому сохранение небольшого изменения не требует преобразования всех задач в словари
+TaskList = list[dict[str, Any]] | Callable[[], list[dict[str, Any]]]
+
+
+def resolve_tasks(tasks: TaskList) -> list[dict[str, Any]]:
+    """Возвращает полный список задач, переданный в save_tasks списком или функцией."""
+    return tasks() if callable(tasks) else tasks
+
 
 class DataManager:
-    def __init__(self, file_path: Path = Path("tasks.json") ):
+    """
+    Менеджер данных, хранящий задачи в JSON-файле.
+    С одним файлом могут одновременно работать несколько процессов: сохранение выполняется
+    под блокировкой файла tasks.json.lock, и если с момента загрузки файл изменил другой процесс,
+    изменения этого процесса объединяются с содержимым файла по задачам, а не затирают его.
+    """
+    def __init__(self, file_path: Path = Path("tasks.json"), fsync: bool = False):
+        """
+        :param file_path: Путь к файлу базы данных.
+        :param fsync: Дожидаться физической записи на диск при каждом сохранении.
+        """
         self.file_path = file_path
+        self.meta_path = file_path.with_name(file_path.name + ".meta")
+        self.lock_path = file_path.with_name(file_path.name + ".lock")
+        self.fsync = fsync
+        # Версия файла (inode, время изменения, размер) и id задач на момент последней загрузки или сохранения
+        self.version: Optional[tuple[int, int, int]] = None
+        self.known_ids: set[int] = set()
+        # Новые id задач, перенумерованных при последнем объединении: {id в сохранении: id в файле}
+        self.renumbered: dict[int, int] = {}
+        # Закодированные в JSON записи задач из последнего сохранения: при следующем сохранении
+        # заново кодируются только измененные задачи, остальные записи берутся отсюда.
+        # Кэш занимает около 700 байт на задачу и отключается через set_fragment_cache(False)
+        self.cache_fragments = True
+        self.fragments: dict[int, str] = {}
+        self.lock_depth = 0
+        self.lock_file = None
 
-    def load_tasks(self) -> list[dict[str, Any]]:
-        """Выгружает все данные из файла базы данных."""
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Удерживает эксклюзивную блокировку файла базы данных для других процессов.
+        Повторный вход в том же объекте не блокируется.
+        """
+        if fcntl is None:
+            yield
+            return
+        if not self.lock_depth:
+            self.lock_file = self.lock_path.open("a")
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        self.lock_depth += 1
         try:
-            content = self.file_path.read_text()
-            if not content.strip():
-                return []
-            return json.loads(content)
+            yield
+        finally:
+            self.lock_depth -= 1
+            if not self.lock_depth:
+                fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+                self.lock_file.close()
+                self.lock_file = None
+
+    def reset_for_merge(self, known_ids: set[int]) -> None:
+        """
+        Забывает версию файла, чтобы следующее сохранение с известными изменениями объединило их
+        с содержимым файла заново. Вызывается через обертки менеджера данных, поэтому это метод, а не атрибуты.
+        :param known_ids: ID задач, которые вызывающий код уже видел (такие новые задачи не перенумеровываются).
+        """
+        self.version, self.fragments, self.known_ids = None, {}, set(known_ids)
+
+    def set_fragment_cache(self, enabled: bool) -> None:
+        """
+        Включает или отключает кэш закодированных записей задач между сохранениями.
+        Без кэша каждое сохранение заново кодирует все задачи, зато записи не хранятся в памяти.
+        """
+        self.cache_fragments = enabled
+        if not enabled:
+            self.fragments = {}
+
+    @staticmethod
+    def _file_version(stat: os.stat_result) -> tuple[int, int, int]:
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _current_version(self) -> Optional[tuple[int, int, int]]:
+        try:
+            return self._file_version(self.file_path.stat())
         except FileNotFoundError:
-            return []
+            return None
+
+    def load_tasks(self) -> list[dict[str, Any]]:
+        """
+        Выгружает все данные из файла базы данных.
+        Поврежденный файл перемещается в сторону (см. set_aside_corrupted) и загружается пустой список задач.
+        """
+        try:
+            return list(self._read_json_array())
         except json.JSONDecodeError:
-            return []
+            self.set_aside_corrupted()
+            return list(self._read_json_array())
+
+    def set_aside_corrupted(self) -> Optional[Path]:
+        """
+        Переименовывает поврежденный файл базы данных в <имя>.corrupt (.corrupt.1 и т.д., если такой уже есть),
+        чтобы следующее сохранение не затерло данные, которые еще можно восстановить вручную.
+        Под блокировкой файл разбирается заново: если другой процесс уже заменил его целым, он не перемещается.
+        :return: Новый путь поврежденного файла или None, если файл не поврежден или отсутствует.
+        """
+        with self.locked():
+            try:
+                for _ in self._read_json_array():
+                    pass
+                return None
+            except json.JSONDecodeError:
+                pass
+            corrupt_path = self._free_path(self.file_path.with_name(self.file_path.name + ".corrupt"))
+            os.replace(self.file_path, corrupt_path)
+            self.version, self.known_ids, self.fragments = None, set(), {}
+        return corrupt_path
+
+    @staticmethod
+    def _free_path(path: Path) -> Path:
+        """Возвращает path или, если он занят, первый свободный путь вида <path>.1, <path>.2 и т.д."""
+        candidate, number = path, 0
+        while candidate.exists():
+            number += 1
+            candidate = path.with_name(f"{path.name}.{number}")
+        return candidate
+
+    def iter_tasks(self) -> Iterator[dict[str, Any]]:
+        """
+        Построчно (по одной задаче) выгружает данные из файла базы данных,
+        не загружая в память весь файл. При повреждении файла выбрасывает json.JSONDecodeError.
+        """
+        return self._read_json_array()
+
+    def _read_json_array(self, chunk_size: int = CHUNK_SIZE) -> Iterator[dict[str, Any]]:
+        """Разбирает JSON-массив из файла поэлементно, читая файл блоками по chunk_size символов."""
+        decoder = json.JSONDecoder()
+        try:
+            file = self.file_path.open()
+        except FileNotFoundError:
+            self.version, self.known_ids, self.fragments = None, set(), {}
+            return
+
+        # Файл всегда заменяется целиком, поэтому открытый файл соответствует версии на момент открытия.
+        # Загруженные задачи могут отличаться от сохраненных этим объектом, поэтому кэш записей сбрасывается
+        self.version, self.known_ids = self._file_version(os.fstat(file.fileno())), set()
+        self.fragments = {}
+        with file:
+            buffer, position, eof = "", 0, False
+
+            def skip_whitespace() -> bool:
+                """Пропускает пробелы, при необходимости дочитывая файл. Возвращает False в конце файла."""
+                nonlocal buffer, position, eof
+                while True:
+                    position = WHITESPACE.match(buffer, position).end()
+                    if position < len(buffer):
+                        return True
+                    if eof:
+                        return False
+                    buffer, position = file.read(chunk_size), 0
+                    eof = not buffer
+
+            def expect(*chars: str) -> str:
+                nonlocal position
+                if not skip_whitespace() or buffer[position] not in chars:
+                    raise json.JSONDecodeError(f"Expecting {' or '.join(chars)}", buffer, position)
+                position += 1
+                return buffer[position - 1]
+
+            if not skip_whitespace():
+                return
+            expect("[")
+            if skip_whitespace() and buffer[position] == "]":
+                return
+
+            while True:
+                skip_whitespace()
+                while True:
+                    try:
+                        task, end = decoder.raw_decode(buffer, position)
+                        if end < len(buffer) or eof:
+                            break
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    chunk = file.read(chunk_size)
+                    eof = not chunk
+                    buffer, position = buffer[position:] + chunk, 0
+                position = end
+                self.known_ids.add(task["id"])
+                yield task
+                if expect(",", "]") == "]":
+                    return
+
+    def save_tasks(
+            self,
+            tasks: TaskList,
+            changed: Optional[list[dict[str, Any]]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        Сохраняет полученные данные в файл базы данных.
+        Если изменения известны, в JSON заново кодируются только задачи из changed, записи остальных задач
+        берутся из предыдущего сохранения.
+        Если файл был изменен другим процессом после загрузки, а изменения известны, файл загружается
+        заново и к нему применяются changed и deleted: задачи, измененные обоими процессами,
+        сохраняются в версии этого процесса, остальные изменения другого процесса не теряются.
+        :param tasks: Полный список задач или функция, которая его строит (не вызывается при объединении).
+        :param changed: Добавленные или измененные задачи (None - изменения неизвестны, файл перезаписывается).
+        :param deleted: ID удаленных задач.
+        :return: Итоговый список задач, если он отличается от tasks из-за объединения, иначе None.
+        """
+        with self.locked():
+            merged = None
+            changes_known = changed is not None or deleted is not None
+            if self._current_version() != self.version and changes_known:
+                tasks = merged = self._merge(changed or [], deleted or [])
+            tasks = resolve_tasks(tasks)
+            changed_ids = {task["id"] for task in changed or []} if changes_known and merged is None else None
+            self._write_atomic(self.file_path, self._encode_tasks(tasks, changed_ids))
+            self.version = self._current_version()
+            self.known_ids = {task["id"] for task in tasks}
+        return merged
+
+    def _encode_tasks(self, tasks: list[dict[str, Any]], changed_ids: Optional[set[int]]) -> str:
+        """
+        Кодирует список задач так же, как json.dumps(tasks, indent=4), собирая его из записей отдельных задач.
+        Если сохраненных записей нет (первое сохранение после загрузки или кэш отключен), список кодируется
+        одним вызовом json.dumps, который вдвое быстрее покомпонентного кодирования, а записи для кэша
+        вырезаются из результата.
+        :param changed_ids: ID задач, записи которых нужно закодировать заново (None - закодировать все задачи).
+        """
+        if changed_ids is None or not self.fragments:
+            content = json.dumps(tasks, indent=4, ensure_ascii=False)
+            self.fragments = self._split_fragments(tasks, content) if self.cache_fragments else {}
+            return content
+
+        cached = self.fragments
+        fragments = {}
+        for task in tasks:
+            task_id = task["id"]
+            fragment = cached.get(task_id)
+            if fragment is None or task_id in changed_ids:
+                fragment = "    " + json.dumps(task, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+            fragments[task_id] = fragment
+        self.fragments = fragments
+        if len(fragments) != len(tasks):
+            # Задачи с повторяющимися id записываются как есть
+            return json.dumps(tasks, indent=4, ensure_ascii=False)
+        return "[\n" + ",\n".join(fragments.values()) + "\n]" if fragments else "[]"
+
+    @staticmethod
+    def _split_fragments(tasks: list[dict[str, Any]], content: str) -> dict[int, str]:
+        """
+        Делит результат json.dumps(tasks, indent=4) на записи задач. Запись верхнего уровня начинается
+        строкой '    {', а строки внутри записей имеют больший отступ (переводы строк в значениях экранированы).
+        Если записи не удалось сопоставить с задачами (например, id повторяются), возвращает пустой кэш.
+        """
+        if not tasks:
+            return {}
+        parts = content[2:-2].split(",\n    {")
+        if len(parts) != len(tasks):
+            return {}
+        fragments = {tasks[0]["id"]: parts[0]}
+        fragments.update((task["id"], "    {" + part) for task, part in zip(tasks[1:], parts[1:]))
+        return fragments if len(fragments) == len(tasks) else {}
+
+    def _merge(self, changed: list[dict[str, Any]], deleted: list[int]) -> list[dict[str, Any]]:
+        """
+        Применяет изменения к текущему содержимому файла.
+        Новые задачи, id которых уже занят задачей другого процесса, получают следующий свободный id,
+        соответствие старых и новых id записывается в renumbered.
+        """
+        known_ids = self.known_ids
+        tasks = {task["id"]: task for task in self.load_tasks()}
+        next_id = max(self.load_next_id() or 1, max(tasks, default=0) + 1)
+        self.renumbered = {}
+        for task_id in deleted:
+            tasks.pop(task_id, None)
+        for task in changed:
+            if task["id"] in tasks and task["id"] not in known_ids:
+                self.renumbered[task["id"]] = next_id
+                task = dict(task, id=next_id)
+                next_id += 1
+            tasks[task["id"]] = task
+        return sorted(tasks.values(), key=lambda task: task["id"])
+
+
+    def load_next_id(self) -> Optional[int]:
+        """Выгружает сохраненный счетчик id для новых задач, если он есть."""
+        try:
+            return json.loads(self.meta_path.read_text())["next_id"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def save_next_id(self, next_id: int) -> None:
+        """
+        Сохраняет счетчик id для новых задач, чтобы id удаленных задач не выдавались повторно.
+        Счетчик не уменьшается, если другой процесс уже сохранил большее значение.
+        """
+        with self.locked():
+            next_id = max(next_id, self.load_next_id() or 1)
+            self._write_atomic(self.meta_path, json.dumps({"next_id": next_id}))
 
-    def save_tasks(self, tasks: list[dict[str, Any]]) -> None:
-        """Сохраняет полученные данные в файл базы данных."""
-        self.file_path.write_text(json.dumps(tasks, indent=4, ensure_ascii=False))
\ No newline at end of file
+    def _write_atomic(self, path: Path, content: str) -> None:
+        """
+        Записывает содержимое во временный файл и заменяет им целевой файл через os.replace,
+        чтобы сбой во время записи не оставил поврежденный файл.
+        """
+        temp_path = path.with_name(path.name + ".tmp")
+        with temp_path.open("w") as file:
+            file.write(content)
+            if self.fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            directory = os.open(path.parent, os.O_DIRECTORY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
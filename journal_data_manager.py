@@ -0,0 +1,126 @@
+import json
+import os
+from typing import Any, Iterator, Optional
+from pathlib import Path
+
+from data_manager import DataManager, TaskList, resolve_tasks
+
+
+class JournalDataManager(DataManager):
+    """
+    Менеджер данных с журналом изменений.
+    Вместо перезаписи всего файла каждое изменение дописывается в журнал небольшой записью,
+    при загрузке журнал применяется поверх основного файла. Когда в журнале накапливается
+    compact_threshold записей, он сворачивается обратно в основной файл.
+    Если с момента загрузки основной файл или журнал изменил другой процесс, изменения этого процесса
+    объединяются с ними так же, как в DataManager, и результат сворачивается в основной файл.
+    """
+    def __init__(
+            self,
+            file_path: Path = Path("tasks.json"),
+            journal_path: Optional[Path] = None,
+            compact_threshold: int = 1000,
+            fsync: bool = False,
+    ):
+        super().__init__(file_path, fsync)
+        self.journal_path = journal_path or file_path.with_name(file_path.name + ".journal")
+        self.compact_threshold = compact_threshold
+        self.journal_size = 0
+        # Версия журнала на момент последней загрузки или записи этим объектом
+        self.journal_version: Optional[tuple[int, int, int]] = None
+
+    def _current_journal_version(self) -> Optional[tuple[int, int, int]]:
+        try:
+            return self._file_version(self.journal_path.stat())
+        except FileNotFoundError:
+            return None
+
+    def load_tasks(self) -> list[dict[str, Any]]:
+        """Выгружает данные из основного файла и применяет к ним записи журнала."""
+        tasks = {task["id"]: task for task in super().load_tasks()}
+        self.journal_size = 0
+        self.journal_version = self._current_journal_version()
+        for record in self._read_journal():
+            if record["op"] == "upsert":
+                tasks[record["task"]["id"]] = record["task"]
+            elif record["op"] == "delete":
+                tasks.pop(record["id"], None)
+            self.journal_size += 1
+        self.known_ids = set(tasks)
+        return list(tasks.values())
+
+    def iter_tasks(self) -> Iterator[dict[str, Any]]:
+        """Журнал может изменить любую задачу, поэтому данные выгружаются целиком перед выдачей."""
+        return iter(self.load_tasks())
+
+    def save_tasks(
+            self,
+            tasks: TaskList,
+            changed: Optional[list[dict[str, Any]]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        Дописывает изменения в журнал. Если изменения неизвестны (changed и deleted равны None),
+        сохраняет полный список задач в основной файл. Только в этом случае строится полный список tasks,
+        если он передан функцией: при сворачивании журнала задачи читаются из файлов. Когда журнал достигает порога, в основной файл
+        сворачивается текущее содержимое файлов, включая записи других процессов.
+        Запись выполняется под блокировкой, поэтому записи разных процессов не перемешиваются. Если файлы
+        изменил другой процесс, изменения объединяются с ними (новые задачи с занятым id получают следующий
+        свободный id), и результат сворачивается в основной файл.
+        :return: Итоговый список задач, если изменения были объединены с изменениями другого процесса, иначе None.
+        """
+        with self.locked():
+            if changed is None and deleted is None:
+                self.compact(resolve_tasks(tasks))
+                return None
+            if (self._current_version(), self._current_journal_version()) != (self.version, self.journal_version):
+                merged = self._merge(changed or [], deleted or [])
+                self.compact(merged)
+                return merged
+
+            records = [{"op": "upsert", "task": task} for task in changed or []]
+            records += [{"op": "delete", "id": task_id} for task_id in deleted or []]
+            if not records:
+                return None
+
+            with self.journal_path.open("a", encoding="utf-8") as journal:
+                journal.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+                if self.fsync:
+                    journal.flush()
+                    os.fsync(journal.fileno())
+            self.journal_size += len(records)
+            self.journal_version = self._current_journal_version()
+            self.known_ids.update(task["id"] for task in changed or [])
+            self.known_ids.difference_update(deleted or [])
+
+            if self.journal_size >= self.compact_threshold:
+                self.compact(self.load_tasks())
+        return None
+
+    def reset_for_merge(self, known_ids: set[int]) -> None:
+        """Кроме версии основного файла забывает и версию журнала."""
+        super().reset_for_merge(known_ids)
+        self.journal_version = None
+
+    def compact(self, tasks: list[dict[str, Any]]) -> None:
+        """Сохраняет полный список задач в основной файл и очищает журнал."""
+        with self.locked():
+            super().save_tasks(tasks)
+            self.journal_path.unlink(missing_ok=True)
+            self.journal_size = 0
+            self.journal_version = None
+
+    def _read_journal(self):
+        """
+        Построчно читает записи журнала.
+        Недописанная последняя строка (например, после сбоя во время записи) пропускается.
+        """
+        try:
+            with self.journal_path.open(encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        return
+        except FileNotFoundError:
+            return
@@ -1,5 +1,12 @@
+import argparse
 import sys
+from api_server import API_HELP, run_server
+from data_manager import DataManager
+from metrics import InstrumentedDataManager, Metrics, instrument_service
+from script_runner import SCRIPT_HELP, ScriptRunner
 from task_manager import TaskManager
+from task_service import TaskService
+from write_behind_data_manager import Durability, WriteBehindDataManager
 import io
 import sys
 
@@ -11,6 +18,72 @@ def configure_io() -> None:
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 
+def parse_args(args: list[str] | None = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(
+        description="Менеджер задач",
+        epilog=SCRIPT_HELP + API_HELP,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--script",
+        metavar="FILE",
+        help="выполнить команды из файла ('-' - из стандартного ввода) без интерактивного меню",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="в режиме сценария сохранять изменения каждые N команд (по умолчанию - один раз в конце)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="PORT",
+        type=int,
+        help="запустить HTTP-сервер с JSON API на указанном порту вместо интерактивного меню",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="адрес, на котором сервер принимает соединения (по умолчанию - 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="собирать метрики времени выполнения операций и записать их в файл при выходе "
+             "(в формате Prometheus для расширения .prom, иначе в JSON)",
+    )
+    return parser.parse_args(args)
+
+
+def run_script(script_path: str, batch_size: int = 0, metrics: Metrics | None = None) -> int:
+    """
+    Выполняет команды сценария над одним загруженным набором задач.
+    Изменения сохраняются пакетами по batch_size команд или один раз в конце.
+    :return: Количество команд, завершившихся ошибкой.
+    """
+    data_manager = DataManager()
+    if metrics is not None:
+        data_manager = InstrumentedDataManager(data_manager, metrics)
+    data_manager = WriteBehindDataManager(
+        data_manager,
+        max_batch=batch_size or sys.maxsize,
+        max_delay=None,
+        durability=Durability.NONE,
+    )
+    task_service = TaskService(data_manager=data_manager)
+    if metrics is not None:
+        instrument_service(task_service, metrics)
+    runner = ScriptRunner(task_service)
+    try:
+        if script_path == "-":
+            return runner.run(sys.stdin)
+        with open(script_path, encoding="utf-8") as script:
+            return runner.run(script)
+    finally:
+        data_manager.close()
+
+
 def display_menu() -> None:
     """Отображает меню действий"""
 
@@ -20,15 +93,31 @@ def display_menu() -> None:
         3: "Выполнить/изменить задачу",
         4: "Удалить задачи",
         5: "Поиск задач",
-        6: "Выйти из приложения"
+        6: "Статистика задач",
+        7: "Выйти из приложения"
     }
     for key, value in menu_items.items():
         print(f"{key}. {value}")
 
 
 def main() -> None:
+    args = parse_args()
     configure_io()
-    task_manager = TaskManager()
+    metrics = None
+    if args.metrics:
+        metrics = Metrics()
+        metrics.dump_on_exit(args.metrics)
+    if args.script:
+        sys.exit(1 if run_script(args.script, args.batch_size, metrics) else 0)
+    if args.serve is not None:
+        run_server(args.host, args.serve, metrics=metrics)
+        return
+
+    task_service = None
+    if metrics is not None:
+        task_service = TaskService(data_manager=InstrumentedDataManager(DataManager(), metrics))
+        instrument_service(task_service, metrics)
+    task_manager = TaskManager(task_service)
     while True:
         display_menu()
         choice = input("\nВведите номер действия: ")
@@ -39,9 +128,10 @@ def main() -> None:
             "3": task_manager.modify_task,
             "4": task_manager.remove_task,
             "5": task_manager.search_task,
+            "6": task_manager.display_summary,
         }
 
-        if choice == "6":
+        if choice == "7":
             print("\nДо свидания! Ждем вас снова в нашем менеджере задач!")
             break
 
@@ -0,0 +1,206 @@
+import atexit
+import json
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from data_manager import DataManager, TaskList, resolve_tasks
+
+# Верхние границы интервалов гистограммы времени выполнения, в секундах
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+STORAGE_PATH_ATTRIBUTES = ("file_path", "journal_path")
+
+
+class Histogram:
+    """Гистограмма времени выполнения операции: количество вызовов, суммарное время и число вызовов по интервалам."""
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Учитывает один вызов, длившийся seconds секунд."""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Возвращает гистограмму с накопленными значениями по интервалам, как в формате Prometheus."""
+        cumulative, total = {}, 0
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            cumulative[bound] = total
+        return {"count": self.count, "sum": self.total, "buckets": cumulative}
+
+
+class Metrics:
+    """
+    Хранилище метрик: гистограммы времени выполнения операций и счетчики
+    (прочитанные и записанные байты, загруженные и сохраненные задачи).
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Записывает время выполнения операции."""
+        with self.lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, counter: str, value: int = 1) -> None:
+        """Увеличивает счетчик на value."""
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def timed(self, operation: str, func: Callable) -> Callable:
+        """Возвращает обертку над func, которая записывает время каждого вызова."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe(operation, time.perf_counter() - start)
+
+        return wrapper
+
+    def snapshot(self) -> dict[str, Any]:
+        """Возвращает текущие значения всех метрик."""
+        with self.lock:
+            return {
+                "operations": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=4, ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """Возвращает метрики в текстовом формате Prometheus."""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP task_manager_operation_seconds Время выполнения операций.",
+            "# TYPE task_manager_operation_seconds histogram",
+        ]
+        for name, histogram in snapshot["operations"].items():
+            for bound, count in histogram["buckets"].items():
+                lines.append(f'task_manager_operation_seconds_bucket{{operation="{name}",le="{bound}"}} {count}')
+            lines.append(f'task_manager_operation_seconds_sum{{operation="{name}"}} {histogram["sum"]}')
+            lines.append(f'task_manager_operation_seconds_count{{operation="{name}"}} {histogram["count"]}')
+        for name, value in snapshot["counters"].items():
+            lines.append(f"# TYPE task_manager_{name}_total counter")
+            lines.append(f"task_manager_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Path) -> None:
+        """Записывает метрики в файл: в формате Prometheus для расширения .prom, иначе в JSON."""
+        path = Path(path)
+        path.write_text(self.to_prometheus() if path.suffix == ".prom" else self.to_json(), encoding="utf-8")
+
+    def dump_on_exit(self, path: Path) -> None:
+        """Записывает метрики в файл при выходе из программы."""
+        atexit.register(self.dump, path)
+
+
+def instrument_service(task_service: Any, metrics: Metrics) -> Any:
+    """
+    Подключает замеры ко всем публичным методам объекта TaskService.
+    Обертки устанавливаются только на переданный объект, поэтому без вызова этой функции
+    методы работают без каких-либо дополнительных затрат.
+    """
+    for name, attribute in vars(type(task_service)).items():
+        if name.startswith("_") or not callable(attribute):
+            continue
+        method = getattr(task_service, name)
+        setattr(task_service, name, metrics.timed(f"task_service.{name}", method))
+    return task_service
+
+
+class InstrumentedDataManager:
+    """
+    Обертка над менеджером данных, которая записывает время загрузки и сохранения задач,
+    количество загруженных и сохраненных задач и объем прочитанных и записанных данных.
+    Объем определяется по размеру файлов менеджера данных: при загрузке учитывается размер
+    файлов целиком, при сохранении - размер замененных файлов или прирост дописанных.
+    """
+    def __init__(self, data_manager: DataManager, metrics: Metrics):
+        self.data_manager = data_manager
+        self.metrics = metrics
+
+    @property
+    def fsync(self) -> bool:
+        return self.data_manager.fsync
+
+    @fsync.setter
+    def fsync(self, value: bool) -> None:
+        self.data_manager.fsync = value
+
+    def _storage_files(self) -> dict[Path, tuple[int, int]]:
+        """Возвращает (inode, размер) для каждого существующего файла менеджера данных."""
+        files = {}
+        for attribute in STORAGE_PATH_ATTRIBUTES:
+            path = getattr(self.data_manager, attribute, None)
+            if isinstance(path, Path) and path.exists():
+                stat = path.stat()
+                files[path] = (stat.st_ino, stat.st_size)
+        return files
+
+    def load_tasks(self) -> list[dict[str, Any]]:
+        self.metrics.increment("bytes_read", sum(size for _, size in self._storage_files().values()))
+        start = time.perf_counter()
+        try:
+            tasks = self.data_manager.load_tasks()
+        finally:
+            self.metrics.observe("data_manager.load_tasks", time.perf_counter() - start)
+        self.metrics.increment("tasks_loaded", len(tasks))
+        return tasks
+
+    def iter_tasks(self) -> Iterator[dict[str, Any]]:
+        """Время загрузки учитывается до конца перебора задач, так как чтение идет по мере перебора."""
+        self.metrics.increment("bytes_read", sum(size for _, size in self._storage_files().values()))
+        start = time.perf_counter()
+        count = 0
+        try:
+            for task in self.data_manager.iter_tasks():
+                count += 1
+                yield task
+        finally:
+            self.metrics.observe("data_manager.iter_tasks", time.perf_counter() - start)
+            self.metrics.increment("tasks_loaded", count)
+
+    def save_tasks(
+            self,
+            tasks: TaskList,
+            changed: Optional[list[dict[str, Any]]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> Optional[list[dict[str, Any]]]:
+        if changed is None and deleted is None:
+            tasks = resolve_tasks(tasks)
+        before = self._storage_files()
+        start = time.perf_counter()
+        try:
+            merged = self.data_manager.save_tasks(tasks, changed=changed, deleted=deleted)
+        finally:
+            self.metrics.observe("data_manager.save_tasks", time.perf_counter() - start)
+        written = 0
+        for path, (inode, size) in self._storage_files().items():
+            old_inode, old_size = before.get(path, (None, 0))
+            written += size if inode != old_inode else max(size - old_size, 0)
+        self.metrics.increment("bytes_written", written)
+        self.metrics.increment("tasks_saved", len(tasks) if changed is None else len(changed))
+        return merged
+
+    def __getattr__(self, name: str) -> Any:
+        """Остальные методы (load_next_id, find_tasks и т.д.) передаются менеджеру данных без замеров."""
+        if name == "data_manager":
+            raise AttributeError(name)
+        return getattr(self.data_manager, name)
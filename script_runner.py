@@ -0,0 +1,110 @@
+import shlex
+import sys
+from typing import Iterable, TextIO
+
+from task_service import SORTING_KEYS, TaskService, validate_task_data
+
+UPDATABLE_FIELDS = ("title", "description", "priority", "due_date", "category")
+SEARCH_TYPES = ("search", "priority", "status")
+
+SCRIPT_HELP = """
+Команды сценария (по одной на строку, значения с пробелами заключаются в кавычки, # - комментарий):
+    add <название> <описание> <категория> <YYYY-MM-DD> <приоритет>
+    complete <id>
+    update <id> <title|description|priority|due_date|category> <значение>
+    delete <id>
+    search <search|priority|status> <значение>
+    list [priority|due_date|category|status]
+"""
+
+
+class ScriptError(Exception):
+    """Ошибка в команде сценария."""
+
+
+class ScriptRunner:
+    """
+    Класс для выполнения команд из сценария (файла или стандартного ввода) без интерактивного меню.
+    Все команды выполняются над одним объектом TaskService.
+    """
+    def __init__(self, task_service: TaskService):
+        self.task_service = task_service
+        self.commands = {
+            "add": self.add_task,
+            "complete": self.complete_task,
+            "update": self.update_task,
+            "delete": self.delete_task,
+            "search": self.search_task,
+            "list": self.list_tasks,
+        }
+
+    def run(self, lines: Iterable[str], errors: TextIO = sys.stderr) -> int:
+        """
+        Выполняет команды сценария. Ошибочные команды пропускаются с сообщением в поток errors.
+        :return: Количество команд, завершившихся ошибкой.
+        """
+        failed = 0
+        for number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                name, *args = shlex.split(line)
+                command = self.commands.get(name)
+                if command is None:
+                    raise ScriptError(f"неизвестная команда '{name}'")
+                command(args)
+            except (ScriptError, ValueError) as error:
+                failed += 1
+                print(f"Строка {number}: {error}", file=errors)
+        return failed
+
+    @staticmethod
+    def _expect_args(args: list[str], *counts: int) -> None:
+        if len(args) not in counts:
+            raise ScriptError(f"ожидается аргументов: {' или '.join(map(str, counts))}, получено {len(args)}")
+
+    def _task_id(self, value: str) -> int:
+        if not value.isdigit() or int(value) not in self.task_service.tasks_by_id:
+            raise ScriptError(f"задача с id '{value}' не найдена")
+        return int(value)
+
+    def add_task(self, args: list[str]) -> None:
+        self._expect_args(args, 5)
+        task = dict(zip(("title", "description", "category", "due_date", "priority"), args))
+        if error := validate_task_data(task):
+            raise ScriptError(error)
+        self.task_service.add_task(**task)
+
+    def complete_task(self, args: list[str]) -> None:
+        self._expect_args(args, 1)
+        self.task_service.complete_task(self._task_id(args[0]))
+
+    def update_task(self, args: list[str]) -> None:
+        self._expect_args(args, 3)
+        task_id, field, value = self._task_id(args[0]), args[1], args[2]
+        if field not in UPDATABLE_FIELDS:
+            raise ScriptError(f"поле '{field}' нельзя изменить")
+        task = self.task_service.tasks_by_id[task_id]
+        if error := validate_task_data(dict(task.to_dict(), **{field: value})):
+            raise ScriptError(error)
+        self.task_service.update_task(task_id, field, value)
+
+    def delete_task(self, args: list[str]) -> None:
+        self._expect_args(args, 1)
+        self.task_service.delete_task(self._task_id(args[0]))
+
+    def search_task(self, args: list[str]) -> None:
+        self._expect_args(args, 2)
+        if args[0] not in SEARCH_TYPES:
+            raise ScriptError(f"неизвестный тип поиска '{args[0]}'")
+        self.task_service.search_task(args[0], args[1])
+
+    def list_tasks(self, args: list[str]) -> None:
+        self._expect_args(args, 0, 1)
+        if not args:
+            self.task_service.display_tasks()
+        elif args[0] in SORTING_KEYS:
+            self.task_service.display_sorted_tasks(args[0])
+        else:
+            raise ScriptError(f"неизвестное поле сортировки '{args[0]}'")
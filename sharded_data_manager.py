@@ -0,0 +1,159 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from data_manager import DataManager, TaskList, resolve_tasks
+
+MANIFEST_NAME = "manifest.json"
+SHARD_SIZE = 10_000
+
+
+def read_shard(path: str) -> list[dict[str, Any]]:
+    """
+    Выгружает задачи из одного файла-шарда. При повреждении файла выбрасывает json.JSONDecodeError.
+    Функция объявлена на уровне модуля, чтобы ее можно было выполнить в дочернем процессе.
+    """
+    return list(DataManager(Path(path)).iter_tasks())
+
+
+class ShardedDataManager(DataManager):
+    """
+    Менеджер данных, хранящий задачи в нескольких JSON-файлах (шардах) по диапазонам id.
+    В шард с номером n попадают задачи с id от n * shard_size + 1 до (n + 1) * shard_size,
+    список шардов и их размер записываются в файл manifest.json. Шарды загружаются параллельно
+    в нескольких процессах, а при сохранении перезаписываются только шарды с измененными задачами.
+    """
+    def __init__(
+            self,
+            directory: Path = Path("tasks"),
+            shard_size: int = SHARD_SIZE,
+            workers: Optional[int] = None,
+            fsync: bool = False,
+    ):
+        """
+        :param directory: Каталог с манифестом и файлами шардов.
+        :param shard_size: Количество id в одном шарде. Для существующего каталога используется размер из манифеста.
+        :param workers: Количество процессов для загрузки шардов (по умолчанию - количество ядер процессора).
+        :param fsync: Дожидаться физической записи на диск при каждом сохранении.
+        """
+        super().__init__(directory / MANIFEST_NAME, fsync)
+        # Счетчик id и блокировка лежат рядом с каталогом, чтобы их можно было использовать до его создания
+        self.meta_path = directory.with_name(directory.name + ".meta")
+        self.lock_path = directory.with_name(directory.name + ".lock")
+        self.directory = directory
+        self.shard_size = shard_size
+        self.workers = workers or os.cpu_count() or 1
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.directory / f"shard-{shard}.json"
+
+    def _shard_of(self, task_id: int) -> int:
+        return (task_id - 1) // self.shard_size
+
+    def _read_manifest(self) -> list[int]:
+        """Читает манифест и возвращает номера шардов. Размер шарда берется из манифеста."""
+        try:
+            manifest = json.loads(self.file_path.read_text())
+        except FileNotFoundError:
+            return []
+        self.shard_size = manifest["shard_size"]
+        return manifest["shards"]
+
+    def load_tasks(self) -> list[dict[str, Any]]:
+        """
+        Выгружает задачи из всех шардов в порядке увеличения id.
+        Каталог с поврежденным шардом или манифестом перемещается в сторону, загружается пустой список задач.
+        """
+        try:
+            return self._load_shards()
+        except json.JSONDecodeError:
+            self.set_aside_corrupted()
+            return self._load_shards()
+
+    def set_aside_corrupted(self) -> Optional[Path]:
+        """
+        Переименовывает каталог с поврежденными данными в <каталог>.corrupt целиком, чтобы при следующем
+        сохранении новые шарды не перезаписали уцелевшие шарды с теми же номерами.
+        :return: Новый путь каталога или None, если данные не повреждены или отсутствуют.
+        """
+        with self.locked():
+            try:
+                self._load_shards()
+                return None
+            except json.JSONDecodeError:
+                pass
+            corrupt_path = self._free_path(self.directory.with_name(self.directory.name + ".corrupt"))
+            os.replace(self.directory, corrupt_path)
+            self.version, self.known_ids, self.fragments = None, set(), {}
+        return corrupt_path
+
+    def iter_tasks(self) -> Iterator[dict[str, Any]]:
+        """Шарды читаются параллельно, поэтому данные выгружаются целиком перед выдачей."""
+        return iter(self._load_shards())
+
+    def _load_shards(self) -> list[dict[str, Any]]:
+        """
+        Читает шарды под блокировкой, чтобы не получить смесь шардов из разных сохранений.
+        Если шардов несколько, они разбираются в отдельных процессах.
+        """
+        with self.locked():
+            self.version, self.known_ids = self._current_version(), set()
+            paths = [str(self._shard_path(shard)) for shard in sorted(self._read_manifest())]
+            if len(paths) > 1 and self.workers > 1:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(paths))) as executor:
+                    shards = list(executor.map(read_shard, paths))
+            else:
+                shards = [read_shard(path) for path in paths]
+
+        tasks = [task for shard in shards for task in shard]
+        self.known_ids = {task["id"] for task in tasks}
+        return tasks
+
+    def save_tasks(
+            self,
+            tasks: TaskList,
+            changed: Optional[list[dict[str, Any]]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        Сохраняет задачи, перезаписывая только шарды, в которых есть задачи из changed или deleted.
+        Если изменения неизвестны или были объединены с изменениями другого процесса, перезаписываются все шарды.
+        Объединение с изменениями других процессов выполняется так же, как в DataManager.save_tasks.
+        :return: Итоговый список задач, если он отличается от tasks из-за объединения, иначе None.
+        """
+        with self.locked():
+            merged = None
+            stored_shards = set(self._read_manifest())
+            changes_known = changed is not None or deleted is not None
+            if self._current_version() != self.version and changes_known:
+                tasks = merged = self._merge(changed or [], deleted or [])
+            tasks = resolve_tasks(tasks)
+
+            dirty = None
+            if changes_known and merged is None:
+                dirty = {self._shard_of(task["id"]) for task in changed or []}
+                dirty.update(self._shard_of(task_id) for task_id in deleted or [])
+
+            shards: dict[int, list[dict[str, Any]]] = {}
+            for task in tasks:
+                shard = self._shard_of(task["id"])
+                if dirty is None or shard in dirty:
+                    shards.setdefault(shard, []).append(task)
+            kept_shards = set() if dirty is None else stored_shards - dirty
+            removed_shards = stored_shards - kept_shards - set(shards)
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for shard, shard_tasks in shards.items():
+                self._write_atomic(self._shard_path(shard), json.dumps(shard_tasks, indent=4, ensure_ascii=False))
+            self._write_atomic(self.file_path, json.dumps({
+                "shard_size": self.shard_size,
+                "shards": sorted(kept_shards | set(shards)),
+            }))
+            for shard in removed_shards:
+                self._shard_path(shard).unlink(missing_ok=True)
+
+            self.version = self._current_version()
+            self.known_ids = {task["id"] for task in tasks}
+        return merged
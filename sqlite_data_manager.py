@@ -0,0 +1,177 @@
+import sqlite3
+from typing import Any, Iterator, Optional
+from pathlib import Path
+
+from data_manager import DataManager, TaskList, resolve_tasks
+
+TASK_FIELDS = ("id", "title", "description", "category", "due_date", "priority", "status")
+
+PRIORITY_ORDER = "CASE priority WHEN 'высокий' THEN 3 WHEN 'средний' THEN 2 WHEN 'низкий' THEN 1 ELSE 0 END DESC"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_category ON tasks (category);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+"""
+
+
+class SQLiteDataManager(DataManager):
+    """
+    Менеджер данных, хранящий задачи в базе SQLite.
+    Сохраняет только измененные задачи и умеет выполнять выборки (find_tasks) на стороне базы,
+    используя индексы по категории, статусу, приоритету и сроку выполнения. Одна задача читается,
+    добавляется и отмечается выполненной (get_task, insert_task, update_statuses) без загрузки остальных.
+    """
+    def __init__(self, file_path: Path = Path("tasks.db")):
+        super().__init__(file_path)
+        # Соединение может использоваться из других потоков (например, при отложенной записи),
+        # доступ к нему последовательный
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        # Встроенная lower() в SQLite работает только с ASCII, для кириллицы используем Python
+        self.connection.create_function("py_lower", 1, str.lower, deterministic=True)
+        self.connection.executescript(SCHEMA)
+
+    def load_tasks(self) -> list[dict[str, Any]]:
+        """Выгружает все задачи из базы данных в порядке увеличения id."""
+        return list(self.iter_tasks())
+
+    def iter_tasks(self) -> Iterator[dict[str, Any]]:
+        """Построчно выгружает задачи из базы данных в порядке увеличения id."""
+        for row in self.connection.execute("SELECT * FROM tasks ORDER BY id"):
+            yield dict(row)
+
+    def save_tasks(
+            self,
+            tasks: TaskList,
+            changed: Optional[list[dict[str, Any]]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> None:
+        """
+        Сохраняет изменения в базу данных одной транзакцией.
+        Если изменения неизвестны (changed и deleted равны None), заменяет содержимое таблицы целиком.
+        """
+        with self.connection:
+            if changed is None and deleted is None:
+                self.connection.execute("DELETE FROM tasks")
+                changed = resolve_tasks(tasks)
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(TASK_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(TASK_FIELDS))})",
+                ([task[field] for field in TASK_FIELDS] for task in changed or []),
+            )
+            self.connection.executemany(
+                "DELETE FROM tasks WHERE id = ?",
+                ((task_id,) for task_id in deleted or []),
+            )
+
+    def load_next_id(self) -> Optional[int]:
+        """Выгружает сохраненный счетчик id для новых задач, если он есть."""
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        return row["value"] if row else None
+
+    def save_next_id(self, next_id: int) -> None:
+        """Сохраняет счетчик id для новых задач."""
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (next_id,))
+
+    def get_task(self, task_id: int) -> Optional[dict[str, Any]]:
+        """Находит задачу по первичному ключу."""
+        row = self.connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return None if row is None else dict(row)
+
+    def update_statuses(self, changed: list[dict[str, Any]]) -> bool:
+        """
+        Записывает новые статусы одной транзакцией без загрузки всех задач.
+        Возвращает False и ничего не записывает, если задачи нет в базе или изменилось что-то кроме статуса.
+        """
+        with self.connection:
+            for task in changed:
+                stored = self.get_task(task["id"])
+                if stored is None or dict(stored, status=task["status"]) != task:
+                    return False
+            self.connection.executemany(
+                "UPDATE tasks SET status = ? WHERE id = ?",
+                ((task["status"], task["id"]) for task in changed),
+            )
+        return True
+
+    def insert_task(self, task: dict[str, Any]) -> dict[str, Any]:
+        """
+        Добавляет новую задачу, не загружая остальные. Id выдается по счетчику (load_next_id), но не меньше
+        наибольшего id в таблице плюс один; счетчик увеличивается в той же транзакции, поэтому
+        одновременно добавляющие задачи процессы получают разные id.
+        :param task: Поля задачи без id.
+        :return: Сохраненная задача с присвоенным id.
+        """
+        with self.connection:
+            # Блокировка на запись берется до чтения счетчика
+            self.connection.execute("BEGIN IMMEDIATE")
+            max_id = self.connection.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0
+            task = dict(task, id=max(self.load_next_id() or 1, max_id + 1))
+            self.connection.execute(
+                f"INSERT INTO tasks ({', '.join(TASK_FIELDS)}) VALUES ({', '.join('?' * len(TASK_FIELDS))})",
+                [task[field] for field in TASK_FIELDS],
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (task["id"] + 1,),
+            )
+        return task
+
+    def find_tasks(
+            self,
+            equals: Optional[dict[str, str]] = None,
+            contains: Optional[str] = None,
+            order_by: Optional[str] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Выполняет выборку задач на стороне базы данных.
+        :param equals: Точное совпадение значений полей, например {'category': 'работа'}.
+        :param contains: Подстрока для поиска в названии и описании без учета регистра.
+        :param order_by: Поле для сортировки, приоритет сортируется от высокого к низкому.
+        :param offset: Сколько найденных задач пропустить.
+        :param limit: Максимальное количество задач, None - без ограничения.
+        :return: Список найденных задач.
+        """
+        conditions, params = [], []
+        for field, value in (equals or {}).items():
+            if field not in TASK_FIELDS:
+                raise ValueError(f"Неизвестное поле задачи: {field}")
+            conditions.append(f"{field} = ?")
+            params.append(value)
+        if contains is not None:
+            conditions.append("(instr(py_lower(title), ?) > 0 OR instr(py_lower(description), ?) > 0)")
+            params += [contains.lower()] * 2
+
+        query = "SELECT * FROM tasks"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if order_by == "priority":
+            query += f" ORDER BY {PRIORITY_ORDER}, id"
+        elif order_by in TASK_FIELDS:
+            query += f" ORDER BY {order_by}, id"
+        else:
+            query += " ORDER BY id"
+        if limit is not None or offset:
+            query += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        return self._fetch(query, params)
+
+    def _fetch(self, query: str, params: list[Any] = ()) -> list[dict[str, Any]]:
+        return [dict(row) for row in self.connection.execute(query, params)]
@@ -0,0 +1,284 @@
+import threading
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Any, Callable, Iterable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from task_service import Task
+
+
+class TrigramIndex:
+    """
+    Триграммный индекс по названию и описанию задач для поиска подстроки без учета регистра.
+    Индекс находит кандидатов по пересечению списков триграмм искомой строки,
+    после чего каждый кандидат проверяется прямым поиском подстроки.
+    Построение списков триграмм обходится примерно в сотню прямых проверок всех задач (около 3 с на 100 тыс. задач),
+    поэтому индекс строится не при загрузке и не внутри поиска: после build_after_scans поисков
+    запускается построение в фоновом потоке по снимку текстов задач, а до его окончания поиски выполняются
+    прямой проверкой. Готовые списки подключаются в потоке, который работает с индексом, при следующем
+    обращении к нему, с поправкой на задачи, измененные во время построения.
+    """
+    fields = ("title", "description")
+    build_after_scans = 1
+
+    def __init__(self, tasks: Iterable['Task'] = ()):
+        self.postings: Optional[defaultdict[str, set[int]]] = None
+        self.scans = 0
+        self.texts: dict[int, tuple[str, ...]] = {task.id: self.task_texts(task) for task in tasks}
+        # Фоновое построение: поток, id задач, измененных после снимка, и результат (снимок, списки триграмм)
+        self.builder: Optional[threading.Thread] = None
+        self.changed_ids: set[int] = set()
+        self.built: Optional[tuple[dict[int, tuple[str, ...]], defaultdict[str, set[int]]]] = None
+
+    @classmethod
+    def task_texts(cls, task: 'Task') -> tuple[str, ...]:
+        """Возвращает индексируемые тексты задачи в нижнем регистре."""
+        return tuple(getattr(task, field).lower() for field in cls.fields)
+
+    @staticmethod
+    def trigrams(text: str) -> set[str]:
+        """Возвращает множество триграмм строки."""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def task_trigrams(self, texts: tuple[str, ...]) -> set[str]:
+        """
+        Возвращает объединенное множество триграмм текстов задачи.
+        Триграммы на стыке текстов содержат перевод строки и отсекаются проверкой кандидатов.
+        """
+        return self.trigrams("\n".join(texts))
+
+    def _build_postings(self, texts: dict[int, tuple[str, ...]]) -> defaultdict[str, set[int]]:
+        postings = defaultdict(set)
+        for task_id, task_texts in texts.items():
+            for trigram in self.task_trigrams(task_texts):
+                postings[trigram].add(task_id)
+        return postings
+
+    def start_build(self) -> None:
+        """Запускает построение списков триграмм в фоновом потоке по снимку текстов задач."""
+        snapshot = dict(self.texts)
+        self.changed_ids = set()
+
+        def run() -> None:
+            self.built = snapshot, self._build_postings(snapshot)
+
+        self.builder = threading.Thread(target=run, name="trigram-index", daemon=True)
+        self.builder.start()
+
+    def wait_for_build(self) -> None:
+        """Дожидается окончания фонового построения и подключает его результат."""
+        if self.builder is not None:
+            self.builder.join()
+        self._install_built()
+
+    def _install_built(self) -> None:
+        """Подключает построенные в фоне списки триграмм, исправляя их для задач, измененных после снимка."""
+        if self.built is None:
+            return
+        (snapshot, postings), self.built, self.builder = self.built, None, None
+        if self.postings is None:
+            for task_id in self.changed_ids:
+                self._remove_postings(postings, task_id, snapshot.get(task_id, ()))
+                if task_id in self.texts:
+                    for trigram in self.task_trigrams(self.texts[task_id]):
+                        postings[trigram].add(task_id)
+            self.postings = postings
+        self.changed_ids = set()
+
+    def _remove_postings(self, postings: dict[str, set[int]], task_id: int, texts: tuple[str, ...]) -> None:
+        for trigram in self.task_trigrams(texts):
+            posting = postings.get(trigram)
+            if posting is None:
+                continue
+            posting.discard(task_id)
+            if not posting:
+                del postings[trigram]
+
+    def add(self, task: 'Task') -> None:
+        """Добавляет задачу в индекс."""
+        self._install_built()
+        texts = self.texts[task.id] = self.task_texts(task)
+        if self.postings is None:
+            if self.builder is not None:
+                self.changed_ids.add(task.id)
+            return
+        for trigram in self.task_trigrams(texts):
+            self.postings[trigram].add(task.id)
+
+    def remove(self, task: 'Task') -> None:
+        """Удаляет задачу из индекса. Индекс хранит свои копии текстов, поэтому поля задачи уже могут быть изменены."""
+        self._install_built()
+        texts = self.texts.pop(task.id, ())
+        if self.postings is None:
+            if self.builder is not None:
+                self.changed_ids.add(task.id)
+            return
+        self._remove_postings(self.postings, task.id, texts)
+
+    def estimate(self, term: str) -> int:
+        """
+        Оценивает сверху количество задач, которые вернет search(term): размер самого короткого списка
+        триграмм, а пока индекс не построен (или строка короче трех символов) - количество всех задач.
+        """
+        self._install_built()
+        trigrams = self.trigrams(term.lower())
+        if not trigrams or self.postings is None:
+            return len(self.texts)
+        return min(len(self.postings.get(trigram, ())) for trigram in trigrams)
+
+    def search(self, term: str) -> list[int]:
+        """
+        Ищет задачи, в названии или описании которых есть подстрока term (без учета регистра).
+        Для строк короче трех символов триграммы не помогают, поэтому, как и до построения индекса,
+        проверяются все задачи.
+        :return: Отсортированный список id найденных задач.
+        """
+        self._install_built()
+        term = term.lower()
+        trigrams = self.trigrams(term)
+        if trigrams and self.postings is None and self.builder is None:
+            self.scans += 1
+            if self.scans >= self.build_after_scans:
+                self.start_build()
+        if trigrams and self.postings is not None:
+            postings = sorted((self.postings.get(trigram, set()) for trigram in trigrams), key=len)
+            candidates = set.intersection(*postings)
+        else:
+            candidates = self.texts
+        return sorted(
+            task_id for task_id in candidates
+            if any(term in text for text in self.texts[task_id])
+        )
+
+
+class BucketIndex:
+    """
+    Индекс по полю задачи с небольшим набором значений (категория, статус, приоритет):
+    значение поля -> множество id задач с этим значением.
+    """
+    def __init__(self, field: str, tasks: Iterable['Task'] = ()):
+        self.field = field
+        self.buckets: defaultdict[str, set[int]] = defaultdict(set)
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task: 'Task') -> None:
+        """Добавляет задачу в индекс."""
+        self.buckets[getattr(task, self.field)].add(task.id)
+
+    def remove(self, task: 'Task') -> None:
+        """Удаляет задачу из индекса. Вызывается до изменения поля задачи."""
+        value = getattr(task, self.field)
+        bucket = self.buckets.get(value)
+        if bucket is None:
+            return
+        bucket.discard(task.id)
+        if not bucket:
+            del self.buckets[value]
+
+    def get(self, value: str) -> set[int]:
+        """Возвращает множество id задач с переданным значением поля."""
+        return self.buckets.get(value, set())
+
+
+class SortedView:
+    """
+    Упорядоченное представление задач: список пар (ключ сортировки, id), поддерживаемый
+    вставкой бинарным поиском. При равных ключах задачи упорядочены по id.
+    Если передана функция include, в представление попадают только задачи, для которых она истинна.
+    Список пар строится по списку задач при первом обращении, а не при загрузке: сортировка всех задач
+    для каждого представления заметно удлиняет запуск, хотя большинство представлений может не понадобиться.
+    """
+    def __init__(
+            self,
+            key: Callable[['Task'], Any],
+            tasks: Iterable['Task'] = (),
+            include: Optional[Callable[['Task'], bool]] = None,
+    ):
+        """
+        :param tasks: Задачи представления. До построения изменения задач не отслеживаются, поэтому
+        это должен быть актуальный список задач (например, TaskService.tasks), а не его копия.
+        """
+        self.key = key
+        self.include = include
+        self.tasks = tasks
+        self._entries: Optional[list[tuple[Any, int]]] = None
+
+    @property
+    def entries(self) -> list[tuple[Any, int]]:
+        """Пары (ключ сортировки, id) в порядке сортировки. При первом обращении строятся по списку задач."""
+        if self._entries is None:
+            include, key = self.include, self.key
+            self._entries = sorted((key(task), task.id) for task in self.tasks if include is None or include(task))
+            self.tasks = ()
+        return self._entries
+
+    def add(self, task: 'Task') -> None:
+        """Добавляет задачу в представление."""
+        if self._entries is not None and (self.include is None or self.include(task)):
+            insort(self._entries, (self.key(task), task.id))
+
+    def remove(self, task: 'Task') -> None:
+        """Удаляет задачу из представления. Вызывается до изменения полей задачи."""
+        if self._entries is None or (self.include is not None and not self.include(task)):
+            return
+        entry = (self.key(task), task.id)
+        position = bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+
+    def _range_bounds(self, start: Any = None, end: Any = None) -> tuple[int, int]:
+        low = 0 if start is None else bisect_left(self.entries, (start,))
+        high = len(self.entries) if end is None else bisect_left(self.entries, (end,))
+        return low, max(low, high)
+
+    def count_range(self, start: Any = None, end: Any = None) -> int:
+        """Возвращает количество задач с ключом от start включительно до end не включительно."""
+        low, high = self._range_bounds(start, end)
+        return high - low
+
+    def range_ids(self, start: Any = None, end: Any = None, limit: Optional[int] = None) -> list[int]:
+        """
+        Возвращает id задач с ключом от start включительно до end не включительно в порядке сортировки,
+        не более limit штук. Границы находятся бинарным поиском, поэтому время - O(log n + k).
+        """
+        low, high = self._range_bounds(start, end)
+        if limit is not None:
+            high = min(high, low + limit)
+        return [task_id for _, task_id in self.entries[low:high]]
+
+    def ids(self, offset: int = 0, limit: Optional[int] = None) -> list[int]:
+        """Возвращает id задач в порядке сортировки, начиная с offset, не более limit штук."""
+        end = None if limit is None else offset + limit
+        return [task_id for _, task_id in self.entries[offset:end]]
+
+
+class TaskCounters:
+    """
+    Счетчики задач, обновляемые за O(1) при каждом изменении: количество задач по сочетаниям
+    (категория, статус, приоритет) и количество выполненных задач по сроку выполнения.
+    """
+    def __init__(self, completed_status: str, tasks: Iterable['Task'] = ()):
+        self.completed_status = completed_status
+        self.counts: Counter[tuple[str, str, str]] = Counter()
+        self.completed_by_due_date: Counter[str] = Counter()
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task: 'Task') -> None:
+        """Учитывает задачу в счетчиках."""
+        self.counts[(task.category, task.status, task.priority)] += 1
+        if task.status == self.completed_status:
+            self.completed_by_due_date[task.due_date] += 1
+
+    def remove(self, task: 'Task') -> None:
+        """Исключает задачу из счетчиков. Вызывается до изменения полей задачи."""
+        self._decrement(self.counts, (task.category, task.status, task.priority))
+        if task.status == self.completed_status:
+            self._decrement(self.completed_by_due_date, task.due_date)
+
+    @staticmethod
+    def _decrement(counter: Counter, key: Any) -> None:
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
@@ -1,20 +1,9 @@
-from enum import Enum
 from typing import Optional, Callable
-from datetime import datetime
-from task_service import TaskService
-
-
-class TaskPriority(Enum):
-    LOW_PRIORITY = "низкий"
-    MID_PRIORITY = "средний"
-    HIGH_PRIORITY = "высокий"
-
-class TaskCategory(Enum):
-    WORK = "работа"
-    PERSONAL = "личное"
-    STUDY = "учеба"
-    HEALTH = "здоровье"
-    OTHER = "прочее"
+from datetime import date
+from task_query import Eq, Range
+from task_service import (
+    CATEGORY_VALUES, PRIORITY_VALUES, STATUS_VALUES, TaskCategory, TaskPriority, TaskService, TaskStatus, parse_date,
+)
 
 SORTING_MAP = {
     "приоритет": "priority",
@@ -39,6 +28,10 @@ SEARCHING_MAP = {
 
 CANCEL_WORD = "stop"
 
+CONFIRM_WORDS = ('да', 'yes', 'д', 'y')
+
+PAGE_SIZE = 50
+
 def validate_input(
         prompt: str,
         error_message: str,
@@ -68,6 +61,14 @@ def validate_input(
 
         print(error_message)
 
+def ask_confirmation(prompt: str) -> bool:
+    """Запрашивает у пользователя подтверждение действия. Возвращает True, если пользователь согласился."""
+    return input(f"{prompt} (да/нет): ").strip().lower() in CONFIRM_WORDS
+
+def parse_task_ids(value: str) -> list[int]:
+    """Разбирает список id задач, разделенных пробелами или запятыми."""
+    return [int(task_id) for task_id in value.replace(",", " ").split()]
+
 def is_valid_sorting_type(value: str) -> bool:
     """Проверяет, что введен допустимый тип сортировки"""
     return value in SORTING_MAP.keys()
@@ -82,21 +83,29 @@ def is_valid_searching_type(value: str) -> bool:
 
 def is_valid_status(value: str) -> bool:
     """Проверяет. что введен допустимый статус задачи"""
-    return value in ['выполнена', 'не выполнена']
+    return value in STATUS_VALUES
 
 def is_valid_category(value: str) -> bool:
     """Проверяет, что введена допустимая категория"""
-    return value in {cat.value for cat in TaskCategory}
+    return value in CATEGORY_VALUES
 
 def is_not_empty(value: str) -> bool:
     """Проверяет, что введена не пустая строка"""
     return bool(value and value.strip())
 
 def is_valid_date(value: str) -> bool:
-    """Проверяет валидность даты (не раньше текущего дня)"""
-    input_date = datetime.strptime(value, "%Y-%m-%d")
-    current_date = datetime.today().date()
-    return input_date.date() >= current_date
+    """Проверяет валидность даты в формате YYYY-MM-DD (не раньше текущего дня)"""
+    input_date = parse_date(value)
+    return input_date is not None and input_date >= date.today()
+
+def is_any_date(value: str) -> bool:
+    """Проверяет, что введена дата в формате YYYY-MM-DD (в том числе прошедшая)"""
+    return parse_date(value) is not None
+
+def is_task_id_list(value: str) -> bool:
+    """Проверяет, что введен хотя бы один id задачи, несколько id разделены пробелами или запятыми"""
+    task_ids = value.replace(",", " ").split()
+    return bool(task_ids) and all(is_positive_integer(task_id) for task_id in task_ids)
 
 def is_positive_integer(value: str) -> bool:
     """Проверяет, что введенное значение - целое положительное число"""
@@ -104,7 +113,7 @@ def is_positive_integer(value: str) -> bool:
 
 def is_valid_priority(value: str) -> bool:
     """Проверяет что введенный статус соответствует одному из доступных статусов"""
-    return value in {priority.value for priority in TaskPriority}
+    return value in PRIORITY_VALUES
 
 
 class TaskManager:
@@ -112,8 +121,8 @@ class TaskManager:
     Класс для взаимодействия с пользователем, получения от него требуемых данных и параметров
     и передачи их для обработки в объект TaskService.
     """
-    def __init__(self, task_service: TaskService = TaskService()):
-        self.task_service = task_service
+    def __init__(self, task_service: Optional[TaskService] = None):
+        self.task_service = task_service if task_service is not None else TaskService()
 
     def display_tasks(self):
         """Выводит на экран меню доступных вариантов вывода задач"""
@@ -144,9 +153,22 @@ class TaskManager:
             return
 
 
+    @staticmethod
+    def display_pages(display: Callable[..., bool], *args) -> None:
+        """
+        Выводит задачи постранично по PAGE_SIZE задач.
+        Функция display выводит страницу и возвращает True, если есть следующая страница.
+        """
+        offset = 0
+        while display(*args, offset=offset, limit=PAGE_SIZE):
+            offset += PAGE_SIZE
+            answer = input(f"Нажмите Enter для следующей страницы (введите '{CANCEL_WORD}' для выхода): ")
+            if answer.lower() == CANCEL_WORD.lower():
+                return
+
     def display_all_tasks(self):
         """Выводит на экран все задачи из базы данных"""
-        self.task_service.display_tasks()
+        self.display_pages(self.task_service.display_tasks)
 
     def display_sorted_tasks(self):
         """
@@ -163,7 +185,7 @@ class TaskManager:
             return
 
         sorting_type = SORTING_MAP.get(input_sorting_term)
-        self.task_service.display_sorted_tasks(sorting_type)
+        self.display_pages(self.task_service.display_sorted_tasks, sorting_type)
 
     def display_category_tasks(self):
         """
@@ -180,7 +202,7 @@ class TaskManager:
             print("Действие отменено\n")
             return
 
-        self.task_service.display_tasks_by_category(category)
+        self.display_pages(self.task_service.display_tasks_by_category, category)
 
     def display_task_by_id(self):
         """
@@ -235,6 +257,7 @@ class TaskManager:
         display_options = {
             1: "Пометить задачу как выполненную",
             2: "Отредактировать задачу",
+            3: "Пометить выполненными задачи категории со сроком до выбранной даты",
         }
 
         for key, value in display_options.items():
@@ -244,6 +267,7 @@ class TaskManager:
         actions = {
             "1": self.complete_task,
             "2": self.update_task,
+            "3": self.complete_tasks_by_category,
         }
 
         action = actions.get(choice)
@@ -261,6 +285,40 @@ class TaskManager:
         task_id = self.display_task_by_id()
         self.task_service.complete_task(int(task_id))
 
+    def complete_tasks_by_category(self):
+        """
+        Запрашивает у пользователя категорию и дату, показывает количество невыполненных задач этой категории
+        со сроком раньше этой даты и после подтверждения отмечает их выполненными одной операцией.
+        """
+        category = validate_input(
+            "Введите категорию ('работа', 'личное', 'учеба', 'здоровье', 'прочее')",
+            "Некорректный ввод. Введите одну категорию - "
+            "'работа', 'личное', 'учеба', 'здоровье' или 'прочее'",
+            is_valid_category
+        )
+        if category is None:
+            print("Действие отменено\n")
+            return
+        due_before = validate_input(
+            "Введите дату в формате 'YYYY-MM-DD': будут выполнены задачи со сроком раньше этой даты",
+            "Некорректный ввод. Введите дату в формате 'YYYY-MM-DD'",
+            is_any_date
+        )
+        if due_before is None:
+            print("Действие отменено\n")
+            return
+
+        where = (Eq("category", category) & Range("due_date", end=due_before)
+                 & Eq("status", TaskStatus.UNCOMPLETED.value))
+        count = len(self.task_service.query_tasks(where))
+        if not count:
+            print("\nПодходящих невыполненных задач нет.\n")
+            return
+        if not ask_confirmation(f"Пометить выполненными задачи ({count} шт.)?"):
+            print("Действие отменено\n")
+            return
+        print(f"\nВыполнено задач: {self.task_service.complete_tasks(where)}.\n")
+
     def update_task(self):
         """
         Запрашивает у пользователя ID задачи, которую нужно отредактировать.
@@ -333,11 +391,34 @@ class TaskManager:
 
     def remove_task(self):
         """
-        Запрашивает у пользователя ID задачи для удаления.
-        Передает ID задачи для удаления в TaskService.
+        Запрашивает у пользователя ID одной или нескольких задач для удаления и один раз - подтверждение.
+        Несколько задач удаляются в TaskService одной операцией.
         """
-        task_id = input("Введите id задачи: ")
-        self.task_service.delete_task(int(task_id))
+        value = validate_input(
+            "Введите id задачи (несколько id - через пробел)",
+            "ID задачи должен быть целым числом",
+            is_task_id_list
+        )
+        if value is None:
+            print("Действие отменено\n")
+            return
+
+        task_ids = parse_task_ids(value)
+        if len(task_ids) == 1:
+            if not ask_confirmation(f"Вы уверены, что хотите удалить задачу с ID {task_ids[0]}?"):
+                print("Удаление задачи отменено.")
+                return
+            self.task_service.delete_task(task_ids[0])
+            return
+
+        if not ask_confirmation(f"Вы уверены, что хотите удалить задачи с ID {', '.join(map(str, task_ids))}?"):
+            print("Удаление задач отменено.")
+            return
+        print(f"\nУдалено задач: {self.task_service.delete_tasks(task_ids=task_ids)}.")
+
+    def display_summary(self):
+        """Выводит на экран сводку по задачам: количество по категориям, статусам и приоритетам, просроченные задачи."""
+        self.task_service.display_summary()
 
     def search_task(self):
         """
@@ -384,5 +465,5 @@ class TaskManager:
             search_field["validator"]
         )
         if search_term:
-            self.task_service.search_task(SEARCHING_MAP.get(search_type), search_term)
+            self.display_pages(self.task_service.search_task, SEARCHING_MAP.get(search_type), search_term)
 
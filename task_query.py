@@ -0,0 +1,358 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from task_service import Task, TaskService
+
+
+class Predicate(ABC):
+    """
+    Условие отбора задач. Условия объединяются операторами & (И), | (ИЛИ) и ~ (НЕ).
+    Пример: Eq('priority', 'высокий') & Eq('status', 'не выполнена') & Range('due_date', end='2030-01-01').
+    Подклассы реализуют matches, fields, candidates и describe, иначе объект условия не создается.
+    """
+    @abstractmethod
+    def matches(self, task: 'Task') -> bool:
+        """Проверяет, удовлетворяет ли задача условию."""
+
+    @abstractmethod
+    def fields(self) -> set[str]:
+        """Возвращает поля задачи, которые использует условие."""
+
+    def cost(self, service: 'TaskService') -> Optional[int]:
+        """
+        Оценивает количество задач-кандидатов, которые вернет индекс для этого условия,
+        без построения самого множества. None - подходящего индекса нет.
+        """
+        return None
+
+    def selectivity(self, service: 'TaskService') -> float:
+        """
+        Оценивает долю задач, удовлетворяющих условию, по размерам индексов.
+        Для условий без индекса оценки нет, и считается, что подходят все задачи.
+        """
+        cost = self.cost(service)
+        return 1.0 if cost is None or not service.tasks else min(cost / len(service.tasks), 1.0)
+
+    @abstractmethod
+    def candidates(self, service: 'TaskService') -> set[int]:
+        """
+        Возвращает id задач-кандидатов из индекса (вызывается, только если cost не None).
+        Множество может содержать лишние задачи, каждый кандидат затем проверяется через matches.
+        """
+
+    @abstractmethod
+    def describe(self) -> str:
+        """Возвращает описание условия для плана запроса."""
+
+    def __and__(self, other: 'Predicate') -> 'And':
+        return And(*self._operands(And), *other._operands(And))
+
+    def __or__(self, other: 'Predicate') -> 'Or':
+        return Or(*self._operands(Or), *other._operands(Or))
+
+    def _operands(self, group: type) -> tuple['Predicate', ...]:
+        """Разворачивает вложенные условия того же вида, чтобы a & b & c давало одно And из трех условий."""
+        return self.predicates if isinstance(self, group) else (self,)
+
+    def __invert__(self) -> 'Not':
+        return Not(self)
+
+    def __repr__(self) -> str:
+        return self.describe()
+
+
+class Eq(Predicate):
+    """Значение поля равно value."""
+    def __init__(self, field: str, value: Any):
+        self.field = field
+        self.value = value
+
+    def matches(self, task: 'Task') -> bool:
+        return getattr(task, self.field) == self.value
+
+    def fields(self) -> set[str]:
+        return {self.field}
+
+    def cost(self, service: 'TaskService') -> Optional[int]:
+        if self.field == "id":
+            return 1
+        if self.field in service.field_indexes:
+            return len(service.field_indexes[self.field].get(self.value))
+        return None
+
+    def candidates(self, service: 'TaskService') -> set[int]:
+        if self.field == "id":
+            return {self.value} if self.value in service.tasks_by_id else set()
+        return service.field_indexes[self.field].get(self.value)
+
+    def describe(self) -> str:
+        return f"{self.field} = {self.value!r}"
+
+
+class In(Predicate):
+    """Значение поля входит в набор values."""
+    def __init__(self, field: str, values: Iterable[Any]):
+        self.field = field
+        self.values = frozenset(values)
+
+    def matches(self, task: 'Task') -> bool:
+        return getattr(task, self.field) in self.values
+
+    def fields(self) -> set[str]:
+        return {self.field}
+
+    def cost(self, service: 'TaskService') -> Optional[int]:
+        if self.field == "id":
+            return len(self.values)
+        if self.field in service.field_indexes:
+            return sum(len(service.field_indexes[self.field].get(value)) for value in self.values)
+        return None
+
+    def candidates(self, service: 'TaskService') -> set[int]:
+        if self.field == "id":
+            return {task_id for task_id in self.values if task_id in service.tasks_by_id}
+        return set().union(*(service.field_indexes[self.field].get(value) for value in self.values))
+
+    def describe(self) -> str:
+        return f"{self.field} in {sorted(self.values)!r}"
+
+
+class Contains(Predicate):
+    """Подстрока text (без учета регистра) есть хотя бы в одном из полей, по умолчанию - в названии или описании."""
+    def __init__(self, text: str, fields: tuple[str, ...] = ("title", "description")):
+        self.text = text.lower()
+        self.text_fields = tuple(fields)
+
+    def matches(self, task: 'Task') -> bool:
+        return any(self.text in getattr(task, field).lower() for field in self.text_fields)
+
+    def fields(self) -> set[str]:
+        return set(self.text_fields)
+
+    def _indexed(self, service: 'TaskService') -> bool:
+        return set(self.text_fields) <= set(service.text_index.fields)
+
+    def cost(self, service: 'TaskService') -> Optional[int]:
+        return service.text_index.estimate(self.text) if self._indexed(service) else None
+
+    def candidates(self, service: 'TaskService') -> set[int]:
+        return set(service.text_index.search(self.text))
+
+    def describe(self) -> str:
+        return f"{' или '.join(self.text_fields)} содержит {self.text!r}"
+
+
+class Range(Predicate):
+    """Значение поля не меньше start и меньше end (границы необязательны), например диапазон дат."""
+    def __init__(self, field: str, start: Any = None, end: Any = None):
+        self.field = field
+        self.start = start
+        self.end = end
+
+    def matches(self, task: 'Task') -> bool:
+        value = getattr(task, self.field)
+        return (self.start is None or value >= self.start) and (self.end is None or value < self.end)
+
+    def fields(self) -> set[str]:
+        return {self.field}
+
+    def _view(self, service: 'TaskService'):
+        """Упорядоченное представление, если оно упорядочено по самому значению поля (а не, например, по весу)."""
+        view = service.sorted_views.get(self.field)
+        return view if view is not None and isinstance(view.key, attrgetter) else None
+
+    def cost(self, service: 'TaskService') -> Optional[int]:
+        view = self._view(service)
+        return None if view is None else view.count_range(self.start, self.end)
+
+    def candidates(self, service: 'TaskService') -> set[int]:
+        return set(self._view(service).range_ids(self.start, self.end))
+
+    def describe(self) -> str:
+        return f"{self.start!r} <= {self.field} < {self.end!r}"
+
+
+class And(Predicate):
+    """Выполнены все условия. Кандидаты берутся из самого избирательного индекса среди условий."""
+    def __init__(self, *predicates: Predicate):
+        self.predicates = predicates
+
+    def matches(self, task: 'Task') -> bool:
+        return all(predicate.matches(task) for predicate in self.predicates)
+
+    def fields(self) -> set[str]:
+        return set().union(*(predicate.fields() for predicate in self.predicates))
+
+    def best(self, service: 'TaskService') -> tuple[Optional[int], Optional[Predicate]]:
+        """Возвращает условие с наименьшей оценкой количества кандидатов и эту оценку."""
+        costs = ((predicate.cost(service), predicate) for predicate in self.predicates)
+        return min(((cost, predicate) for cost, predicate in costs if cost is not None),
+                   key=lambda item: item[0], default=(None, None))
+
+    def cost(self, service: 'TaskService') -> Optional[int]:
+        return self.best(service)[0]
+
+    def selectivity(self, service: 'TaskService') -> float:
+        """Условия считаются независимыми, поэтому их доли перемножаются."""
+        result = 1.0
+        for predicate in self.predicates:
+            result *= predicate.selectivity(service)
+        return result
+
+    def candidates(self, service: 'TaskService') -> set[int]:
+        return self.best(service)[1].candidates(service)
+
+    def describe(self) -> str:
+        return "(" + " И ".join(predicate.describe() for predicate in self.predicates) + ")"
+
+
+class Or(Predicate):
+    """Выполнено хотя бы одно условие. Индекс используется, только если он есть для каждого условия."""
+    def __init__(self, *predicates: Predicate):
+        self.predicates = predicates
+
+    def matches(self, task: 'Task') -> bool:
+        return any(predicate.matches(task) for predicate in self.predicates)
+
+    def fields(self) -> set[str]:
+        return set().union(*(predicate.fields() for predicate in self.predicates))
+
+    def cost(self, service: 'TaskService') -> Optional[int]:
+        costs = [predicate.cost(service) for predicate in self.predicates]
+        return None if None in costs else sum(costs)
+
+    def selectivity(self, service: 'TaskService') -> float:
+        return min(sum(predicate.selectivity(service) for predicate in self.predicates), 1.0)
+
+    def candidates(self, service: 'TaskService') -> set[int]:
+        return set().union(*(predicate.candidates(service) for predicate in self.predicates))
+
+    def describe(self) -> str:
+        return "(" + " ИЛИ ".join(predicate.describe() for predicate in self.predicates) + ")"
+
+
+class Not(Predicate):
+    """Условие не выполнено. Индексы не используются, проверяются все задачи."""
+    def __init__(self, predicate: Predicate):
+        self.predicate = predicate
+
+    def matches(self, task: 'Task') -> bool:
+        return not self.predicate.matches(task)
+
+    def fields(self) -> set[str]:
+        return self.predicate.fields()
+
+    def selectivity(self, service: 'TaskService') -> float:
+        if self.predicate.cost(service) is None:
+            return 1.0
+        return 1.0 - self.predicate.selectivity(service)
+
+    def candidates(self, service: 'TaskService') -> set[int]:
+        return set(service.tasks_by_id)
+
+    def describe(self) -> str:
+        return f"НЕ {self.predicate.describe()}"
+
+
+@dataclass
+class QueryPlan:
+    """
+    План выполнения запроса.
+    :param source: Откуда берутся задачи-кандидаты: 'index' - из индекса условия index_predicate,
+    'sorted_view' - обход упорядоченного представления поля сортировки до набора limit задач,
+    'scan' - все задачи.
+    :param estimate: Оценка количества кандидатов.
+    """
+    source: str
+    estimate: int
+    index_predicate: Optional[Predicate] = None
+
+    def describe(self) -> str:
+        if self.source == "index":
+            return f"индекс по условию {self.index_predicate.describe()}, кандидатов: {self.estimate}"
+        if self.source == "sorted_view":
+            return f"обход упорядоченного представления, задач: {self.estimate}"
+        return f"проверка всех задач: {self.estimate}"
+
+
+def _index_predicate(where: Predicate, service: 'TaskService') -> tuple[Optional[int], Optional[Predicate]]:
+    """Возвращает оценку количества кандидатов и условие, по индексу которого они будут получены."""
+    cost = where.cost(service)
+    if cost is None:
+        return None, None
+    while isinstance(where, And):
+        where = where.best(service)[1]
+    return cost, where
+
+
+def plan_query(
+        service: 'TaskService',
+        where: Optional[Predicate] = None,
+        order_view: Any = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+) -> QueryPlan:
+    """
+    Выбирает способ получения кандидатов. Обычно это самый избирательный индекс среди условий.
+    Если нужна одна страница в порядке упорядоченного представления, представление обходится до набора
+    страницы, когда по оценке для этого придется просмотреть меньше задач, чем кандидатов в индексе
+    (или индекса нет вовсе).
+    """
+    total = len(service.tasks)
+    cost, predicate = (None, None) if where is None else _index_predicate(where, service)
+    if order_view is not None and limit is not None:
+        # При равномерном распределении подходящих задач до набора страницы придется просмотреть
+        # (offset + limit) / доля подходящих задач
+        matching = total if where is None else where.selectivity(service) * total
+        scanned = int(min((offset + limit) * total / max(matching, 1), total))
+        if cost is None or scanned < cost:
+            return QueryPlan("sorted_view", scanned)
+    if cost is not None:
+        return QueryPlan("index", cost, predicate)
+    return QueryPlan("scan", total)
+
+
+def execute_query(
+        service: 'TaskService',
+        where: Optional[Predicate] = None,
+        order_key: Optional[Callable[['Task'], Any]] = None,
+        order_view: Any = None,
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+) -> list['Task']:
+    """
+    Выполняет запрос над задачами TaskService.
+    :param order_key: Ключ сортировки, задачи с равными ключами упорядочены по id. None - по id.
+    :param order_view: Упорядоченное представление с тем же ключом, если оно есть.
+    :return: Задачи, удовлетворяющие условию where, с offset по offset + limit в порядке сортировки.
+    """
+    plan = plan_query(service, where, order_view, offset, limit)
+    end = None if limit is None else offset + limit
+    tasks_by_id = service.tasks_by_id
+
+    if plan.source == "sorted_view":
+        entries = reversed(order_view.entries) if descending else order_view.entries
+        found = []
+        for _, task_id in entries:
+            task = tasks_by_id[task_id]
+            if where is None or where.matches(task):
+                found.append(task)
+                if end is not None and len(found) >= end:
+                    break
+        return found[offset:end]
+
+    if plan.source == "index":
+        tasks = [tasks_by_id[task_id] for task_id in sorted(plan.index_predicate.candidates(service))]
+    else:
+        tasks = service.tasks
+    if where is not None:
+        tasks = [task for task in tasks if where.matches(task)]
+    if order_key is not None:
+        tasks = sorted(tasks, key=lambda task: (order_key(task), task.id), reverse=descending)
+    elif descending:
+        tasks = tasks[::-1]
+    return tasks[offset:end]
@@ -1,9 +1,51 @@
-from dataclasses import dataclass
+import csv
+import json
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field, fields
+from datetime import date, timedelta
 from enum import Enum
-from typing import Any
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, TextIO
 from operator import attrgetter
 
 from data_manager import DataManager
+from task_index import BucketIndex, SortedView, TaskCounters, TrigramIndex
+from task_query import Predicate, QueryPlan, execute_query, plan_query
+
+INDEXED_FIELDS = ("category", "status", "priority")
+
+# Атрибуты TaskService, которые заполняет reload_tasks
+LOADED_ATTRIBUTES = frozenset({
+    "tasks", "tasks_by_id", "next_id", "text_index", "field_indexes", "sorted_views", "deadline_index", "records",
+    "counters",
+})
+
+TABLE_HEADER = (
+    f"\n{'ID':<5}{'Название':<25}{'Описание':<45}{'Категория':<15}"
+    f"{'Срок выполнения':<20}{'Приоритет':<15}{'Статус':<20}\n" + "-" * 140 + "\n"
+)
+TABLE_FOOTER = "-" * 140 + " \n\n"
+
+# Количество последних сроков выполнения в сводке по выполненным задачам
+SUMMARY_DAYS = 7
+
+# Сроки задач сильно повторяются, поэтому разобранные даты кэшируются
+DATE_CACHE_SIZE = 16384
+
+PRIORITY_WEIGHT = {
+    "низкий": 1,
+    "средний": 2,
+    "высокий": 3
+}
+
+SORTING_KEYS = {
+    "priority": lambda task: -PRIORITY_WEIGHT.get(task.priority, 0),
+    "due_date": attrgetter("due_date"),
+    "category": attrgetter("category"),
+    "status": attrgetter("status"),
+}
 
 
 class TaskStatus(Enum):
@@ -11,7 +53,36 @@ class TaskStatus(Enum):
     UNCOMPLETED = "не выполнена"
 
 
-@dataclass
+class TaskPriority(Enum):
+    LOW_PRIORITY = "низкий"
+    MID_PRIORITY = "средний"
+    HIGH_PRIORITY = "высокий"
+
+
+class TaskCategory(Enum):
+    WORK = "работа"
+    PERSONAL = "личное"
+    STUDY = "учеба"
+    HEALTH = "здоровье"
+    OTHER = "прочее"
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(value: str) -> Optional[date]:
+    """
+    Разбирает дату в формате 'YYYY-MM-DD'. Для некорректного значения возвращает None.
+    Формат проверяется напрямую, без strptime, а результат кэшируется, так что каждая строка разбирается один раз.
+    """
+    if (not isinstance(value, str) or len(value) != 10 or value[4] != "-" or value[7] != "-"
+            or not value.isascii() or not (value[:4] + value[5:7] + value[8:]).isdigit()):
+        return None
+    try:
+        return date(int(value[:4]), int(value[5:7]), int(value[8:]))
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
 class Task:
     """
     Класс Задача для упрощения манипулирования объектами задач - получения (from_dict) и
@@ -25,6 +96,11 @@ class Task:
     priority: str
     status: str
 
+    @property
+    def due(self) -> Optional[date]:
+        """Срок выполнения в виде даты (None, если дата некорректна)."""
+        return parse_date(self.due_date)
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "id": self.id,
@@ -41,6 +117,205 @@ class Task:
         return cls(**data)
 
 
+class ValueCodes:
+    """
+    Таблица кодов для полей с небольшим набором значений: значение -> небольшое целое число.
+    Начинается со значений перечисления, неизвестные значения получают новые коды при первом появлении.
+    """
+    def __init__(self, enum: type[Enum]):
+        self.values: list[str] = [item.value for item in enum]
+        self.codes: dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+
+def _coded_field(name: str, codes: ValueCodes) -> property:
+    """Создает свойство, которое хранит строковое значение поля в виде кода."""
+    def getter(self):
+        return codes.decode(getattr(self, name))
+
+    def setter(self, value):
+        setattr(self, name, codes.encode(value))
+
+    return property(getter, setter)
+
+
+def _encode_date(value: str) -> int | str:
+    """Переводит дату 'YYYY-MM-DD' в порядковый номер дня, некорректные даты хранятся строкой."""
+    parsed = parse_date(value)
+    return value if parsed is None else parsed.toordinal()
+
+
+def _decode_date(value: int | str) -> str:
+    return date.fromordinal(value).isoformat() if isinstance(value, int) else value
+
+
+class CompactTask:
+    """
+    Компактное представление задачи для больших наборов данных.
+    Использует __slots__, хранит категорию, приоритет и статус кодами перечислений,
+    а срок выполнения - порядковым номером дня. Снаружи поля выглядят так же, как у Task,
+    to_dict и from_dict возвращают и принимают те же словари.
+    """
+    __slots__ = ("id", "title", "description", "_category", "_due_date", "_priority", "_status")
+
+    category = _coded_field("_category", ValueCodes(TaskCategory))
+    priority = _coded_field("_priority", ValueCodes(TaskPriority))
+    status = _coded_field("_status", ValueCodes(TaskStatus))
+
+    def __init__(
+            self,
+            id: int,
+            title: str,
+            description: str,
+            category: str,
+            due_date: str,
+            priority: str,
+            status: str,
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.category = category
+        self.due_date = due_date
+        self.priority = priority
+        self.status = status
+
+    @property
+    def due_date(self) -> str:
+        return _decode_date(self._due_date)
+
+    @due_date.setter
+    def due_date(self, value: str) -> None:
+        self._due_date = _encode_date(value)
+
+    @property
+    def due(self) -> Optional[date]:
+        """Срок выполнения в виде даты (None, если дата некорректна)."""
+        return date.fromordinal(self._due_date) if isinstance(self._due_date, int) else None
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (Task, CompactTask)):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"CompactTask({fields})"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "category": self.category,
+            "due_date": self.due_date,
+            "priority": self.priority,
+            "status": self.status,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'CompactTask':
+        return cls(**data)
+
+
+TASK_FIELDS = tuple(task_field.name for task_field in fields(Task))
+IMPORTED_FIELDS = ("title", "description", "category", "due_date", "priority")
+
+CATEGORY_VALUES = frozenset(category.value for category in TaskCategory)
+PRIORITY_VALUES = frozenset(priority.value for priority in TaskPriority)
+STATUS_VALUES = frozenset(status.value for status in TaskStatus)
+
+
+@dataclass
+class ImportResult:
+    """Результат пакетного добавления задач: количество добавленных и описание пропущенных задач."""
+    added: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class TaskSummary:
+    """
+    Сводка по задачам: количество задач по сочетаниям (категория, статус, приоритет) и по каждому полю,
+    количество просроченных задач и количество выполненных задач по сроку выполнения.
+    """
+    total: int
+    counts: dict[tuple[str, str, str], int]
+    by_category: dict[str, int]
+    by_status: dict[str, int]
+    by_priority: dict[str, int]
+    overdue: int
+    completed_by_due_date: dict[str, int]
+
+    @property
+    def completion_rate(self) -> float:
+        """Доля выполненных задач от 0 до 1."""
+        return self.by_status.get(TaskStatus.COMPLETED.value, 0) / self.total if self.total else 0.0
+
+
+def validate_tasks(rows: Iterable[dict[str, Any]]) -> list[Optional[str]]:
+    """
+    Проверяет пакет задач (например, при импорте): справочники допустимых значений и разбор дат
+    связываются с локальными переменными один раз на пакет, а не для каждой задачи.
+    :param rows: Задачи в виде словарей. Строки JSONL, которые не удалось разобрать, передаются
+    ошибкой разбора (см. parse_json_lines) и тоже считаются некорректными задачами.
+    :return: Для каждой задачи - описание ошибки или None.
+    """
+    categories, priorities, statuses, parse = CATEGORY_VALUES, PRIORITY_VALUES, STATUS_VALUES, parse_date
+    errors = []
+    for data in rows:
+        if isinstance(data, json.JSONDecodeError):
+            errors.append(f"некорректный JSON: {data.msg}")
+            continue
+        if not isinstance(data, dict):
+            errors.append("задача должна быть JSON-объектом")
+            continue
+        get = data.get
+        if not isinstance(get("title"), str) or not get("title").strip():
+            errors.append("поле 'title' должно быть непустой строкой")
+        elif not isinstance(get("description"), str) or not get("description").strip():
+            errors.append("поле 'description' должно быть непустой строкой")
+        elif not isinstance(get("category"), str) or get("category") not in categories:
+            errors.append(f"недопустимая категория '{get('category')}'")
+        elif not isinstance(get("priority"), str) or get("priority") not in priorities:
+            errors.append(f"недопустимый приоритет '{get('priority')}'")
+        elif get("status") and (not isinstance(get("status"), str) or get("status") not in statuses):
+            errors.append(f"недопустимый статус '{get('status')}'")
+        elif not isinstance(get("due_date"), str) or parse(get("due_date")) is None:
+            errors.append(f"некорректная дата '{get('due_date')}'")
+        else:
+            errors.append(None)
+    return errors
+
+
+def parse_json_lines(stream: TextIO) -> Iterator[Any]:
+    """
+    Построчно разбирает JSONL, пропуская пустые строки.
+    Вместо строки, которую не удалось разобрать, возвращается ошибка разбора, чтобы импорт продолжился.
+    """
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as error:
+            yield error
+
+
+def validate_task_data(data: dict[str, Any]) -> Optional[str]:
+    """Проверяет данные импортируемой задачи. Возвращает описание ошибки или None."""
+    return validate_tasks((data,))[0]
+
+
 def require_task(func):
     def wrapper(self, task_id, *args, **kwargs):
         task = self._get_task_by_id(task_id)
@@ -50,31 +325,156 @@ def require_task(func):
     return wrapper
 
 
+def require_stored_task(func):
+    """
+    Как require_task, но пока задачи не загружены, задача читается из менеджера данных по id
+    (см. TaskService._get_stored_task). Такая задача не входит в индексы, метод не должен менять ее через _set_field.
+    """
+    def wrapper(self, task_id, *args, **kwargs):
+        task = self._get_stored_task(task_id)
+        if task is None:
+            return
+        return func(self, task, *args, **kwargs)
+    return wrapper
+
+
 class TaskService:
     """
     Класс для обработки данных о задачах и взаимодействия с менеджером данных
     """
-    def __init__(self, data_manager: DataManager = DataManager()):
-        self.data_manager = data_manager
-        self.tasks: list[Task] = [Task.from_dict(task) for task in self.data_manager.load_tasks()]
+    def __init__(self, data_manager: Optional[DataManager] = None, compact: bool = False):
+        """
+        Задачи загружаются из менеджера данных при первом обращении к ним, а не при создании объекта.
+        :param data_manager: Менеджер данных для загрузки и сохранения задач (по умолчанию - файл tasks.json).
+        :param compact: Хранить задачи в компактном представлении CompactTask для экономии памяти.
+        """
+        self.data_manager = data_manager if data_manager is not None else DataManager()
+        self.task_class = CompactTask if compact else Task
+        # Словари задач для менеджера данных хранятся между сохранениями и создаются заново только
+        # для измененных задач. В компактном режиме они не хранятся, чтобы не расходовать память,
+        # и по той же причине у менеджера данных отключается кэш закодированных записей
+        self.cache_records = not compact
+        if compact and hasattr(self.data_manager, "set_fragment_cache"):
+            self.data_manager.set_fragment_cache(False)
+        # Менеджеры данных с методом find_tasks (например, SQLite) выполняют выборки сами,
+        # поэтому для вывода задач не нужно загружать их все в память
+        self.can_push_down = hasattr(self.data_manager, "find_tasks")
+        # Менеджеры данных с методом get_task (например, двоичный формат) находят одну задачу по id,
+        # а с методом update_statuses - записывают новый статус на место, не загружая все задачи
+        self.can_get_task = hasattr(self.data_manager, "get_task")
+        self.can_update_statuses = hasattr(self.data_manager, "update_statuses")
+        # Менеджеры данных с методом insert_task (например, SQLite) сами выдают id новой задаче
+        self.can_insert_task = hasattr(self.data_manager, "insert_task")
+
+    def __getattr__(self, name: str) -> Any:
+        """Загружает задачи при первом обращении к списку задач или индексам."""
+        if name in LOADED_ATTRIBUTES:
+            self.reload_tasks()
+            return getattr(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @property
+    def loaded(self) -> bool:
+        """Загружены ли задачи в память."""
+        return "tasks" in vars(self)
+
+    def reload_tasks(self) -> None:
+        """
+        Загружает задачи из менеджера данных, перестраивает индекс по id и счетчик id.
+        Поврежденный файл задач перемещается менеджером данных в сторону до первого сохранения,
+        чтобы пустой список задач не был записан поверх него.
+        """
+        try:
+            self._set_tasks(self.data_manager.iter_tasks())
+        except json.JSONDecodeError:
+            corrupt_path = self.data_manager.set_aside_corrupted()
+            if corrupt_path is not None:
+                print(f"\nФайл задач поврежден и перемещен в {corrupt_path}. Список задач пуст.")
+            self._set_tasks(self.data_manager.iter_tasks())
+
+    def _set_tasks(self, tasks: Iterable[dict[str, Any]]) -> None:
+        """Заменяет задачи в памяти переданными и перестраивает индексы и счетчик id."""
+        self.tasks: list[Task] = [self.task_class.from_dict(task) for task in tasks]
+        self.tasks_by_id: dict[int, Task] = {task.id: task for task in self.tasks}
+        self.records: dict[int, dict[str, Any]] = {}
+        self.next_id = max(self.data_manager.load_next_id() or 1, max(self.tasks_by_id, default=0) + 1)
+        self.text_index = TrigramIndex(self.tasks)
+        self.field_indexes = {field: BucketIndex(field, self.tasks) for field in INDEXED_FIELDS}
+        self.sorted_views = {field: SortedView(key, self.tasks) for field, key in SORTING_KEYS.items()}
+        # Сроки невыполненных задач в виде дат: просроченные и ближайшие задачи находятся бинарным поиском.
+        # Задачи с нераспознанным сроком в индекс не входят: у них нет срока, по которому их можно упорядочить
+        self.deadline_index = SortedView(
+            attrgetter("due"),
+            self.tasks,
+            include=lambda task: task.due is not None and task.status != TaskStatus.COMPLETED.value,
+        )
+        self.counters = TaskCounters(TaskStatus.COMPLETED.value, self.tasks)
+
+    def _index_task(self, task: Task) -> None:
+        """Добавляет задачу во вторичные индексы."""
+        self.text_index.add(task)
+        for index in self.field_indexes.values():
+            index.add(task)
+        for view in self.sorted_views.values():
+            view.add(task)
+        self.deadline_index.add(task)
+        self.counters.add(task)
+
+    def _unindex_task(self, task: Task) -> None:
+        """Удаляет задачу из вторичных индексов. Вызывается до изменения полей задачи."""
+        self.text_index.remove(task)
+        for index in self.field_indexes.values():
+            index.remove(task)
+        for view in self.sorted_views.values():
+            view.remove(task)
+        self.deadline_index.remove(task)
+        self.counters.remove(task)
+
+    def find_task_ids(self, **equals: str) -> set[int]:
+        """
+        Возвращает id задач, у которых все переданные поля равны переданным значениям,
+        пересекая множества индексов начиная с наименьшего.
+        Пример: find_task_ids(category='работа', status='не выполнена').
+        """
+        buckets = sorted((self.field_indexes[field].get(value) for field, value in equals.items()), key=len)
+        if not buckets:
+            return set(self.tasks_by_id)
+        return set.intersection(*buckets)
+
+    def _get_tasks_by_ids(self, task_ids: Iterable[int], offset: int = 0, limit: Optional[int] = None) -> list[Task]:
+        """Возвращает задачи с переданными id в порядке увеличения id, начиная с offset, не более limit штук."""
+        end = None if limit is None else offset + limit
+        return [self.tasks_by_id[task_id] for task_id in sorted(task_ids)[offset:end]]
 
     @staticmethod
     def print_tasks(tasks: list[Task]) -> None:
-        """Выводит на экран информацию о переданных заданиях"""
+        """Выводит на экран информацию о переданных заданиях одной записью в поток вывода"""
+        sys.stdout.write(TaskService.format_tasks(tasks))
+
+    @staticmethod
+    def format_tasks(tasks: list[Task]) -> str:
+        """Формирует таблицу с информацией о переданных заданиях"""
         if not tasks:
-            print("\nЗадания не найдены.")
-            return
+            return "\nЗадания не найдены.\n"
 
-        print(f"\n{'ID':<5}{'Название':<25}{'Описание':<45}{'Категория':<15}"
-              f"{'Срок выполнения':<20}{'Приоритет':<15}{'Статус':<20}")
-        print("-" * 140)
+        lines = [TABLE_HEADER]
         for task in tasks:
             title = task.title if len(task.title) <= 20 else task.title[:17] + '...'
             descr = task.description if len(task.description) <= 40 else task.description[:32] + '...'
-            print(
+            lines.append(
                 f"{task.id:<5}{title:<25}{descr:<45}{task.category:<15}"
-                f"{task.due_date:<20}{task.priority:<15}{task.status:<20}")
-        print("-" * 140, '\n')
+                f"{task.due_date:<20}{task.priority:<15}{task.status:<20}\n")
+        lines.append(TABLE_FOOTER)
+        return "".join(lines)
+
+    def _display_page(self, tasks: list[Task], limit: Optional[int]) -> bool:
+        """
+        Выводит страницу задач. Задачи запрашиваются с одной лишней, чтобы узнать, есть ли следующая страница.
+        :return: True, если после этой страницы есть еще задачи.
+        """
+        has_more = limit is not None and len(tasks) > limit
+        self.print_tasks(tasks[:limit])
+        return has_more
 
     @staticmethod
     def print_single_task(task: Task) -> None:
@@ -87,22 +487,220 @@ class TaskService:
 
     def _sort_tasks_by_priority(self) -> list[Task]:
         """Метод для вывода заданий с корректной сортировкой по приоритету"""
-        priority_weight = {
-            "низкий": 1,
-            "средний": 2,
-            "высокий": 3
-        }
-        sorted_tasks = sorted(self.tasks, key=lambda task: priority_weight.get(task.priority, 0), reverse=True)
-        return sorted_tasks
+        return self.get_sorted_tasks("priority")
 
-    def _save_tasks(self) -> None:
-        """Передает список всех текущих задач в менеджер данных для сохранения."""
-        self.data_manager.save_tasks([task.to_dict() for task in self.tasks])
+    def get_tasks(self, offset: int = 0, limit: Optional[int] = None) -> list[Task]:
+        """
+        Возвращает задачи в порядке увеличения id.
+        :param offset: Сколько задач пропустить с начала.
+        :param limit: Максимальное количество задач, None - все задачи.
+        """
+        if self.can_push_down:
+            return self._find_tasks(offset=offset, limit=limit)
+        return self.tasks[offset:None if limit is None else offset + limit]
+
+    def get_sorted_tasks(self, sorting_term: str, offset: int = 0, limit: Optional[int] = None) -> list[Task]:
+        """
+        Возвращает задачи, отсортированные по переданному параметру, из поддерживаемого
+        упорядоченного представления без повторной сортировки.
+        :param sorting_term: Поле для сортировки ('priority', 'due_date', 'category', 'status').
+        :param offset: Сколько задач пропустить с начала.
+        :param limit: Максимальное количество задач, None - все задачи.
+        """
+        if self.can_push_down:
+            return self._find_tasks(order_by=sorting_term, offset=offset, limit=limit)
+        return [self.tasks_by_id[task_id] for task_id in self.sorted_views[sorting_term].ids(offset, limit)]
 
+    def get_tasks_by_category(self, category: str, offset: int = 0, limit: Optional[int] = None) -> list[Task]:
+        """Возвращает задачи выбранной категории в порядке увеличения id (см. get_tasks)."""
+        if self.can_push_down:
+            return self._find_tasks(equals={"category": category}, offset=offset, limit=limit)
+        return self._get_tasks_by_ids(self.field_indexes["category"].get(category), offset, limit)
+
+    def get_search_results(
+            self,
+            search_type: str,
+            search_term: str,
+            offset: int = 0,
+            limit: Optional[int] = None,
+    ) -> list[Task]:
+        """
+        Возвращает задачи, найденные по выбранному параметру и значению поиска, в порядке увеличения id.
+        :param search_type: Параметр поиска ('search' - подстрока в названии или описании, 'priority', 'status').
+        :param search_term: Значение для поиска по выбранному параметру.
+        """
+        if search_type == 'search' and self.can_push_down:
+            return self._find_tasks(contains=search_term, offset=offset, limit=limit)
+        if search_type == 'search':
+            return self._get_tasks_by_ids(self.text_index.search(search_term), offset, limit)
+        if self.can_push_down:
+            return self._find_tasks(equals={search_type: search_term.lower()}, offset=offset, limit=limit)
+        return self._get_tasks_by_ids(self.find_task_ids(**{search_type: search_term.lower()}), offset, limit)
+
+    def due_between(self, start: date, end: date, limit: Optional[int] = None) -> list[Task]:
+        """
+        Возвращает невыполненные задачи со сроком от start до end включительно в порядке срока.
+        Пример: due_between(date.today(), date.today() + timedelta(days=7)) - задачи на ближайшую неделю.
+        """
+        # Следующего дня после date.max нет, поэтому в этом случае верхняя граница не задается
+        stop = end + timedelta(days=1) if end < date.max else None
+        return [self.tasks_by_id[task_id] for task_id in self.deadline_index.range_ids(start, stop, limit)]
+
+    def overdue(self, today: Optional[date] = None, limit: Optional[int] = None) -> list[Task]:
+        """Возвращает невыполненные задачи со сроком раньше today (по умолчанию - сегодня), начиная с самых старых."""
+        today = today or date.today()
+        return [self.tasks_by_id[task_id] for task_id in self.deadline_index.range_ids(end=today, limit=limit)]
+
+    def next_n_due(self, n: int, today: Optional[date] = None) -> list[Task]:
+        """Возвращает n невыполненных задач с ближайшим сроком, начиная с today (по умолчанию - сегодня)."""
+        today = today or date.today()
+        return [self.tasks_by_id[task_id] for task_id in self.deadline_index.range_ids(start=today, limit=n)]
+
+    def get_summary(self, today: Optional[date] = None) -> TaskSummary:
+        """
+        Возвращает сводку по задачам. Счетчики обновляются при каждом изменении задач, а просроченные задачи
+        считаются бинарным поиском по индексу сроков, поэтому время не зависит от количества задач.
+        :param today: Дата, относительно которой задачи считаются просроченными (по умолчанию - сегодня).
+        """
+        counts = dict(self.counters.counts)
+        by_field = []
+        for position, values in enumerate((TaskCategory, TaskStatus, TaskPriority)):
+            totals = dict.fromkeys((value.value for value in values), 0)
+            for key, count in counts.items():
+                totals[key[position]] = totals.get(key[position], 0) + count
+            by_field.append(totals)
+        return TaskSummary(
+            total=sum(counts.values()),
+            counts=counts,
+            by_category=by_field[0],
+            by_status=by_field[1],
+            by_priority=by_field[2],
+            overdue=self.deadline_index.count_range(end=today or date.today()),
+            completed_by_due_date=dict(sorted(self.counters.completed_by_due_date.items())),
+        )
+
+    def display_summary(self, today: Optional[date] = None) -> None:
+        """Выводит на экран сводку по задачам: количество задач по категориям, статусам и приоритетам."""
+        summary = self.get_summary(today)
+        print(
+            f"\nВсего задач: {summary.total}, выполнено: {summary.by_status[TaskStatus.COMPLETED.value]} "
+            f"({summary.completion_rate:.0%}), просрочено: {summary.overdue}\n"
+        )
+        by_category_status = defaultdict(int)
+        for (category, status, _), count in summary.counts.items():
+            by_category_status[category, status] += count
+        print(f"{'Категория':<15}" + "".join(f"{status:<15}" for status in summary.by_status))
+        for category in summary.by_category:
+            print(f"{category:<15}" + "".join(
+                f"{by_category_status[category, status]:<15}" for status in summary.by_status
+            ))
+        print("\nПо приоритетам: " + ", ".join(
+            f"{priority} - {count}" for priority, count in summary.by_priority.items()
+        ))
+        if summary.completed_by_due_date:
+            recent = list(summary.completed_by_due_date.items())[-SUMMARY_DAYS:]
+            print("Выполненные задачи по срокам: " + ", ".join(f"{day} - {count}" for day, count in recent))
+        print()
+
+    def _check_query(self, where: Optional[Predicate], order_by: Optional[str]) -> None:
+        unknown = (where.fields() if where is not None else set()) | ({order_by} if order_by else set())
+        unknown -= set(TASK_FIELDS)
+        if unknown:
+            raise ValueError(f"Неизвестное поле задачи: {', '.join(sorted(unknown))}")
+
+    def query_tasks(
+            self,
+            where: Optional[Predicate] = None,
+            order_by: Optional[str] = None,
+            descending: bool = False,
+            offset: int = 0,
+            limit: Optional[int] = None,
+    ) -> list[Task]:
+        """
+        Возвращает задачи, удовлетворяющие составному условию, в заданном порядке.
+        Кандидаты берутся из самого избирательного подходящего индекса, остальные условия
+        проверяются только на них (см. task_query.plan_query).
+        Пример: query_tasks(Eq('priority', 'высокий') & ~Eq('status', 'выполнена'), order_by='due_date', limit=10).
+        :param where: Условие отбора, None - все задачи.
+        :param order_by: Поле для сортировки (приоритет - от высокого к низкому), None - по id.
+        :param descending: Обратный порядок сортировки.
+        :param offset: Сколько задач пропустить с начала.
+        :param limit: Максимальное количество задач, None - все задачи.
+        :raises ValueError: Если условие или сортировка используют неизвестное поле.
+        """
+        self._check_query(where, order_by)
+        return execute_query(
+            self,
+            where,
+            order_key=SORTING_KEYS.get(order_by) or (attrgetter(order_by) if order_by else None),
+            order_view=self.sorted_views.get(order_by),
+            descending=descending,
+            offset=offset,
+            limit=limit,
+        )
+
+    def explain_query(
+            self,
+            where: Optional[Predicate] = None,
+            order_by: Optional[str] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+    ) -> QueryPlan:
+        """Возвращает план, по которому query_tasks выполнит запрос с теми же параметрами."""
+        self._check_query(where, order_by)
+        return plan_query(self, where, self.sorted_views.get(order_by), offset, limit)
+
+    def _save_tasks(
+            self,
+            changed: Optional[list[Task]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> dict[int, int]:
+        """
+        Передает список всех текущих задач в менеджер данных для сохранения.
+        Словари заново создаются только для измененных задач, если изменений нет - сохранение не выполняется.
+        Если менеджер данных объединил изменения с изменениями другого процесса,
+        задачи в памяти заменяются итоговым списком.
+        :param changed: Добавленные или измененные задачи, если известны.
+        :param deleted: ID удаленных задач, если известны.
+        :return: Новые id задач, перенумерованных при объединении: {прежний id: новый id}.
+        """
+        if changed is not None and not changed and not deleted:
+            return {}
+        records = self.records
+        if changed is None:
+            records.clear()
+        for task in changed or ():
+            records[task.id] = task.to_dict()
+        for task_id in deleted or ():
+            records.pop(task_id, None)
+
+        get_record = records.get
+        # Полный список словарей нужен не всем менеджерам данных (например, журналу - только при
+        # неизвестных изменениях), поэтому он передается функцией и строится по требованию
+        merged = self.data_manager.save_tasks(
+            lambda: [get_record(task.id) or self._record(task) for task in self.tasks],
+            changed=None if changed is None else [records[task.id] for task in changed],
+            deleted=deleted,
+        )
+        if not self.cache_records:
+            records.clear()
+        if merged is None:
+            return {}
+        self._set_tasks(merged)
+        return dict(getattr(self.data_manager, "renumbered", None) or {})
+
+    def _record(self, task: Task) -> dict[str, Any]:
+        record = self.records[task.id] = task.to_dict()
+        return record
+
+
+    def _find_tasks(self, **query) -> list[Task]:
+        """Выполняет выборку задач на стороне менеджера данных и возвращает список объектов Task."""
+        return [self.task_class.from_dict(task) for task in self.data_manager.find_tasks(**query)]
 
     def _get_task_by_id(self, task_id: int) -> Task | None:
         """Ищет задачу по переданному id, в случае успеха возвращает объект Task, в противном случае возвращает None"""
-        task = next((task for task in self.tasks if task.id == task_id), None)
+        task = self.tasks_by_id.get(task_id)
 
         if not task:
             print(f"\nЗадача с таким id - '{task_id}' не найдена.\n")
@@ -110,6 +708,19 @@ class TaskService:
 
         return task
 
+    def _get_stored_task(self, task_id: int) -> Task | None:
+        """
+        Ищет задачу по id. Пока задачи не загружены, а менеджер данных умеет находить одну задачу,
+        задача читается из него, без загрузки всех задач и построения индексов.
+        """
+        if self.loaded or not self.can_get_task:
+            return self._get_task_by_id(task_id)
+        record = self.data_manager.get_task(task_id)
+        if record is None:
+            print(f"\nЗадача с таким id - '{task_id}' не найдена.\n")
+            return None
+        return self.task_class.from_dict(record)
+
     def add_task(
             self,
             title: str,
@@ -117,7 +728,7 @@ class TaskService:
             category: str,
             due_date: str,
             priority: str,
-    ) -> None:
+    ) -> Task:
         """
         Метод для добавления нового задания в базу данных.
         Присваивает задаче новый уникальный id, устанавливает статус 'не выполнена'.
@@ -126,11 +737,10 @@ class TaskService:
         :param category: Категория задача
         :param due_date: Дедлайн (срок выполнения задачи)
         :param priority: Приоритет
+        :return: Созданная задача. Если при сохранении другой процесс уже занял ее id,
+        возвращается задача с новым id из объединенного списка.
         """
-        task_id = 1 if not self.tasks else max(task.id for task in self.tasks) + 1
-
-        new_task = Task(
-            id=task_id,
+        data = dict(
             title=title,
             description=description,
             category=category,
@@ -138,86 +748,188 @@ class TaskService:
             priority=priority,
             status=TaskStatus.UNCOMPLETED.value,
         )
+        if not self.loaded and self.can_insert_task:
+            # Пока задачи не загружены, id выдает менеджер данных, задача сохраняется без загрузки остальных
+            new_task = self.task_class.from_dict(self.data_manager.insert_task(data))
+            print(f"\nЗадача '{new_task.title}' сохранена!")
+            return new_task
 
-        self.tasks.append(new_task)
-        self._save_tasks()
+        new_task = self._create_task(**data)
+        renumbered = self._save_tasks(changed=[new_task])
+        new_task = self.tasks_by_id.get(renumbered.get(new_task.id, new_task.id), new_task)
+        self.data_manager.save_next_id(self.next_id)
 
         print(f"\nЗадача '{new_task.title}' сохранена!")
+        return new_task
+
+    def _create_task(self, **data: str) -> Task:
+        """
+        Создает задачу с новым id, добавляет ее в индексы и список задач без сохранения.
+        Задача попадает в список задач и занимает id только после успешного добавления в индексы.
+        """
+        new_task = self.task_class(id=self.next_id, **data)
+        self._index_task(new_task)
+        self.next_id += 1
+        self.tasks.append(new_task)
+        self.tasks_by_id[new_task.id] = new_task
+        return new_task
+
+    def add_tasks(self, tasks: Iterable[dict[str, Any]], batch_size: int = 1000) -> ImportResult:
+        """
+        Добавляет задачи пакетами с одним сохранением на пакет.
+        Каждой задаче присваивается новый id (id из входных данных не используется),
+        статус по умолчанию - 'не выполнена'. Некорректные задачи пропускаются.
+        :param tasks: Задачи в виде словарей с полями title, description, category, due_date, priority
+        и необязательным полем status.
+        :param batch_size: Количество задач в одном сохранении.
+        :return: Количество добавленных задач и описание пропущенных.
+        """
+        result = ImportResult()
+        batch = []
+        rows, number = iter(tasks), 0
+        while chunk := list(islice(rows, batch_size)):
+            for data, error in zip(chunk, validate_tasks(chunk)):
+                number += 1
+                if error:
+                    result.errors.append(f"Задача {number}: {error}")
+                    continue
+                batch.append(self._create_task(
+                    **{key: data[key] for key in IMPORTED_FIELDS},
+                    status=data.get("status") or TaskStatus.UNCOMPLETED.value,
+                ))
+                if len(batch) >= batch_size:
+                    self._save_batch(batch)
+                    result.added += len(batch)
+                    batch = []
+        if batch:
+            self._save_batch(batch)
+            result.added += len(batch)
+        return result
+
+    def _save_batch(self, batch: list[Task]) -> None:
+        self._save_tasks(changed=batch)
+        self.data_manager.save_next_id(self.next_id)
+
+    def import_tasks(self, stream: TextIO, file_format: str, batch_size: int = 1000) -> ImportResult:
+        """
+        Импортирует задачи из потока в формате CSV (с заголовком) или JSONL (одна задача на строку).
+        :param stream: Открытый текстовый поток.
+        :param file_format: 'csv' или 'jsonl'.
+        :param batch_size: Количество задач в одном сохранении.
+        """
+        if file_format == "csv":
+            rows = csv.DictReader(stream)
+        elif file_format == "jsonl":
+            rows = parse_json_lines(stream)
+        else:
+            raise ValueError(f"Неизвестный формат: {file_format}")
+        return self.add_tasks(rows, batch_size)
+
+    def export_tasks(self, stream: TextIO, file_format: str) -> int:
+        """
+        Построчно записывает все задачи в поток в формате CSV (с заголовком) или JSONL.
+        :param stream: Открытый текстовый поток.
+        :param file_format: 'csv' или 'jsonl'.
+        :return: Количество выгруженных задач.
+        """
+        if file_format not in ("csv", "jsonl"):
+            raise ValueError(f"Неизвестный формат: {file_format}")
+        if self.can_push_down and not self.loaded:
+            rows = self.data_manager.iter_tasks()
+        else:
+            rows = (task.to_dict() for task in self.tasks)
+
+        writer = csv.DictWriter(stream, fieldnames=TASK_FIELDS) if file_format == "csv" else None
+        if writer:
+            writer.writeheader()
+        count = 0
+        for row in rows:
+            if writer:
+                writer.writerow(row)
+            else:
+                stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+        return count
 
     @require_task
     def delete_task(self, task: int | Task) -> None:
         """
-        Удаляет задачу с переданным id.
+        Удаляет задачу с переданным id. Подтверждение удаления запрашивает TaskManager.
         Декоратор ищет задачу по полученному id и в случае успеха возвращает в метод объект Task
         :param task: Задача, полученная от декоратора require_task.
         """
-        confirm = input(f"Вы уверены, что хотите удалить задачу {task.title} с ID {task.id} (да/нет): ")
-        if confirm.lower() in ('да', 'yes', 'д', 'y'):
-            self.tasks.remove(task)
-            self._save_tasks()
-            print(f"\nЗадача с id '{task.id}' удалена.")
-            return
-        else:
-            print(f"Удаление задачи '{task.title}' отменено.")
+        self.tasks.remove(task)
+        del self.tasks_by_id[task.id]
+        self._unindex_task(task)
+        self._save_tasks(changed=[], deleted=[task.id])
+        print(f"\nЗадача с id '{task.id}' удалена.")
 
-    def display_tasks(self) -> None:
-        """Выводит на экран все задачи в порядке увеличения id."""
-        if not self.tasks:
+    def display_tasks(self, offset: int = 0, limit: Optional[int] = None) -> bool:
+        """
+        Выводит на экран задачи в порядке увеличения id.
+        :param offset: Сколько задач пропустить с начала.
+        :param limit: Размер страницы, None - все задачи.
+        :return: True, если после выведенной страницы есть еще задачи.
+        """
+        tasks = self.get_tasks(offset, None if limit is None else limit + 1)
+        if not tasks:
             print("В настоящие момент нет ни одной задачи.")
-        self.print_tasks(self.tasks)
+        return self._display_page(tasks, limit)
 
-    def display_sorted_tasks(self, sorting_term: str) -> None:
-        """Выводит на экран все задачи, отсортированные по переданному параметру."""
-        if sorting_term == 'priority':
-            sorted_tasks = self._sort_tasks_by_priority()
-        else:
-            sorted_tasks = sorted(self.tasks, key=attrgetter(sorting_term))
-        self.print_tasks(sorted_tasks)
+    def display_sorted_tasks(self, sorting_term: str, offset: int = 0, limit: Optional[int] = None) -> bool:
+        """Выводит на экран задачи, отсортированные по переданному параметру, постранично (см. display_tasks)."""
+        return self._display_page(
+            self.get_sorted_tasks(sorting_term, offset, None if limit is None else limit + 1), limit,
+        )
 
-    def display_tasks_by_category(self, category: str) -> None:
-        """Выводит на экран все задачи выбранной категории."""
-        sorted_tasks = list(filter(lambda task: task.category == category, self.tasks))
-        self.print_tasks(sorted_tasks)
+    def display_tasks_by_category(self, category: str, offset: int = 0, limit: Optional[int] = None) -> bool:
+        """Выводит на экран задачи выбранной категории постранично (см. display_tasks)."""
+        return self._display_page(
+            self.get_tasks_by_category(category, offset, None if limit is None else limit + 1), limit,
+        )
 
-    @require_task
+    @require_stored_task
     def display_single_task(self, task: int | Task) -> None:
         self.print_single_task(task)
 
-    def search_task(self, search_type: str, search_term: str) -> None:
+    def search_task(
+            self,
+            search_type: str,
+            search_term: str,
+            offset: int = 0,
+            limit: Optional[int] = None,
+    ) -> bool:
         """
         Проводит поиск среди всех задач по выбранному параметру и значению поиска.
-        В случае, если есть несколько задач, удовлетворяющих критериям поиска - выводит все эти задачи.
+        В случае, если есть несколько задач, удовлетворяющих критериям поиска - выводит все эти задачи
+        (или страницу из limit задач, начиная с offset).
         :param search_type: Параметр поиска.
         :param search_term: Значение для поиска по выбранному параметру.
-        :return:
+        :param offset: Сколько найденных задач пропустить с начала.
+        :param limit: Размер страницы, None - все найденные задачи.
+        :return: True, если после выведенной страницы есть еще задачи.
         """
-        search_fields = {
-            'search': ['title', 'description'],
-            'status': ['status'],
-            'priority': ['priority'],
-        }
-        fields = search_fields.get(search_type)
-        tasks = [
-            task for task in self.tasks
-            if any(
-                (field in ['status', 'priority'] and search_term.lower() == str(getattr(task, field)).lower()) or
-                (field in ['title', 'description'] and search_term.lower() in str(getattr(task, field)).lower())
-                for field in fields
-            )
-        ]
+        tasks = self.get_search_results(search_type, search_term, offset, None if limit is None else limit + 1)
         if tasks:
             print("\nВот что удалось найти по вашему запросу:\n")
-        self.print_tasks(tasks)
+        return self._display_page(tasks, limit)
 
-    @require_task
+    @require_stored_task
     def complete_task(self, task: int | Task) -> None:
-        """Отмечает выбранную задачу как выполненную."""
+        """
+        Отмечает выбранную задачу как выполненную.
+        Пока задачи не загружены, новый статус записывается менеджером данных на место (см. update_statuses),
+        если он это умеет, иначе задачи загружаются и сохраняются как обычно.
+        """
         if task.status == TaskStatus.COMPLETED.value:
             print(f"\nЭта задача - '{task.title}' уже выполнена.\n")
             return
 
-        task.status = TaskStatus.COMPLETED.value
-        self._save_tasks()
+        record = dict(task.to_dict(), status=TaskStatus.COMPLETED.value)
+        if self.loaded or not self.can_update_statuses or not self.data_manager.update_statuses([record]):
+            task = self.tasks_by_id[task.id]
+            self._set_field(task, "status", TaskStatus.COMPLETED.value)
+            self._save_tasks(changed=[task])
         print(f"\nЗадача '{task.title}' выполнена!\n")
 
     @require_task
@@ -229,8 +941,92 @@ class TaskService:
         :param updated_attr: Атрибут объекта Task, который надо обновить.
         :param new_value: Новое значение для атрибута Task.
         """
-        setattr(task, updated_attr, new_value)
-        self._save_tasks()
+        if getattr(task, updated_attr) == new_value:
+            print(f"\nЗадача '{task.title}' не изменилась.")
+            return
+
+        self._set_field(task, updated_attr, new_value)
+        self._save_tasks(changed=[task])
         print(f"\nЗадача '{task.title}' обновлена!")
 
+    def _set_field(self, task: Task, field_name: str, value: str) -> None:
+        """Изменяет поле задачи и обновляет индексы без сохранения."""
+        self._unindex_task(task)
+        setattr(task, field_name, value)
+        self._index_task(task)
+
+    def select_tasks(self, where: Optional[Predicate] = None, task_ids: Optional[Iterable[int]] = None) -> list[Task]:
+        """
+        Отбирает задачи для массовой операции по условию и/или списку id.
+        Если заданы оба параметра, отбираются задачи из списка, удовлетворяющие условию. Несуществующие id пропускаются.
+        :raises ValueError: Если не задано ни условие, ни список id, или условие использует неизвестное поле.
+        """
+        if where is None and task_ids is None:
+            raise ValueError("Не задано ни условие, ни список id задач")
+        if task_ids is None:
+            return self.query_tasks(where)
+
+        self._check_query(where, None)
+        tasks_by_id = self.tasks_by_id
+        tasks = [tasks_by_id[task_id] for task_id in dict.fromkeys(task_ids) if task_id in tasks_by_id]
+        return tasks if where is None else [task for task in tasks if where.matches(task)]
+
+    def complete_tasks(self, where: Optional[Predicate] = None, task_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Отмечает выполненными все отобранные задачи (см. select_tasks) с одним сохранением.
+        Пример: complete_tasks(Eq('category', 'учеба') & Range('due_date', end='2030-01-01')).
+        :return: Количество задач, отмеченных выполненными (уже выполненные задачи не учитываются).
+        """
+        completed = TaskStatus.COMPLETED.value
+        tasks = [task for task in self.select_tasks(where, task_ids) if task.status != completed]
+        for task in tasks:
+            self._set_field(task, "status", completed)
+        self._save_tasks(changed=tasks)
+        return len(tasks)
+
+    def update_tasks(
+            self,
+            values: dict[str, str],
+            where: Optional[Predicate] = None,
+            task_ids: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Присваивает полям всех отобранных задач (см. select_tasks) новые значения с одним сохранением.
+        :param values: Новые значения полей, например {'priority': 'высокий'}.
+        :return: Количество задач, у которых изменилось хотя бы одно поле.
+        :raises ValueError: Если среди полей есть неизвестное поле или id.
+        """
+        unknown = set(values) - (set(TASK_FIELDS) - {"id"})
+        if unknown:
+            raise ValueError(f"Поле задачи нельзя изменить: {', '.join(sorted(unknown))}")
+
+        changed = []
+        for task in self.select_tasks(where, task_ids):
+            updates = {name: value for name, value in values.items() if getattr(task, name) != value}
+            if not updates:
+                continue
+            self._unindex_task(task)
+            for name, value in updates.items():
+                setattr(task, name, value)
+            self._index_task(task)
+            changed.append(task)
+        self._save_tasks(changed=changed)
+        return len(changed)
+
+    def delete_tasks(self, where: Optional[Predicate] = None, task_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Удаляет все отобранные задачи (см. select_tasks) с одним сохранением.
+        :return: Количество удаленных задач.
+        """
+        tasks = self.select_tasks(where, task_ids)
+        deleted = {task.id for task in tasks}
+        if not deleted:
+            return 0
+        for task in tasks:
+            del self.tasks_by_id[task.id]
+            self._unindex_task(task)
+        self.tasks = [task for task in self.tasks if task.id not in deleted]
+        self._save_tasks(changed=[], deleted=sorted(deleted))
+        return len(deleted)
+
 
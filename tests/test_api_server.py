@@ -0,0 +1,177 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import MagicMock
+from urllib.parse import urlencode
+from api_server import ApiServer, BackgroundDataManager
+from data_manager import DataManager
+from metrics import InstrumentedDataManager, Metrics
+from task_service import TaskService, TaskStatus
+from test_data import sample_tasks
+
+
+@pytest.fixture
+def background(data_manager):
+    background = BackgroundDataManager(data_manager)
+    yield background
+    background.close()
+
+@pytest.fixture
+def server(background):
+    return ApiServer(TaskService(data_manager=background))
+
+
+async def request(port, method, target, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    content = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(content)}\r\n\r\n".encode("latin-1") + content
+    )
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+def run_requests(server, *requests):
+    async def scenario():
+        tcp_server = await server.start(port=0)
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            return [await request(port, *args) for args in requests]
+    return asyncio.run(scenario())
+
+def test_list_and_get_tasks(server):
+    (status, page), (_, sorted_page), (_, single), (missing, _) = run_requests(
+        server,
+        ("GET", "/tasks?limit=1"),
+        ("GET", "/tasks?sort=due_date"),
+        ("GET", "/tasks/2"),
+        ("GET", "/tasks/99"),
+    )
+    assert status == 200
+    assert page == {"tasks": [sample_tasks[0]], "has_more": True}
+    assert [task["id"] for task in sorted_page["tasks"]] == [1, 2]
+    assert single == sample_tasks[1]
+    assert missing == 404
+
+def test_mutations_are_saved_in_background(server, background, data_manager):
+    new_task = {
+        "title": "Новая задача", "description": "Описание", "category": "работа",
+        "due_date": "2030-01-01", "priority": "высокий",
+    }
+    (created, added), (_, completed), (_, updated), (_, deleted), (_, page) = run_requests(
+        server,
+        ("POST", "/tasks", new_task),
+        ("POST", "/tasks/1/complete"),
+        ("PATCH", "/tasks/3", {"title": "Изменено"}),
+        ("DELETE", "/tasks/2"),
+        ("GET", "/tasks"),
+    )
+    assert created == 201
+    assert added["task"] == dict(new_task, id=3, status=TaskStatus.UNCOMPLETED.value)
+    assert completed["task"]["status"] == TaskStatus.COMPLETED.value
+    assert "выполнена" in completed["message"]
+    assert updated["task"]["title"] == "Изменено"
+    assert [task["id"] for task in page["tasks"]] == [1, 3]
+    background.flush()
+    assert data_manager.save_tasks.call_count == 4
+    assert data_manager.save_tasks.call_args.kwargs["deleted"] == [2]
+
+def test_combined_filters(server):
+    (_, page), (_, empty) = run_requests(
+        server,
+        ("GET", "/tasks?" + urlencode({"status": "не выполнена", "due_before": "2023-12-02", "search": "task"})),
+        ("GET", "/tasks?" + urlencode({"category": "личное", "priority": "высокий", "sort": "due_date"})),
+    )
+    assert page == {"tasks": [sample_tasks[0]], "has_more": False}
+    assert empty == {"tasks": [], "has_more": False}
+
+def test_invalid_requests(server):
+    responses = run_requests(
+        server,
+        ("POST", "/tasks", {"title": "Без остальных полей"}),
+        ("PATCH", "/tasks/1", {"status": "выполнена"}),
+        ("PATCH", "/tasks/1", {"due_date": "01.01.2030"}),
+        ("GET", "/tasks?sort=title"),
+        ("PUT", "/tasks/1"),
+        ("GET", "/projects"),
+    )
+    assert [status for status, _ in responses] == [400, 400, 400, 400, 405, 404]
+    assert all("error" in payload for _, payload in responses)
+
+def test_non_string_fields_are_rejected(server):
+    new_task = {
+        "title": 123, "description": "Описание", "category": "работа",
+        "due_date": "2030-01-01", "priority": "высокий",
+    }
+    (created, error), (updated, _), (_, page) = run_requests(
+        server,
+        ("POST", "/tasks", new_task),
+        ("PATCH", "/tasks/1", {"priority": ["высокий"]}),
+        ("GET", "/tasks?search=task"),
+    )
+    assert (created, updated) == (400, 400)
+    assert "title" in error["error"]
+    assert [task["id"] for task in page["tasks"]] == [1, 2]
+    assert len(server.task_service.tasks) == len(server.task_service.tasks_by_id) == 2
+
+def test_unexpected_error_returns_500(server, monkeypatch, capsys):
+    monkeypatch.setattr(server.task_service, "complete_task", MagicMock(side_effect=AttributeError("boom")))
+    (status, payload), (listed, _) = run_requests(server, ("POST", "/tasks/1/complete"), ("GET", "/tasks"))
+    assert status == 500
+    assert "error" in payload
+    assert listed == 200
+    assert "boom" in capsys.readouterr().err
+
+def test_concurrent_clients(server):
+    async def scenario():
+        tcp_server = await server.start(port=0)
+        port = tcp_server.sockets[0].getsockname()[1]
+        new_task = {
+            "title": "Задача", "description": "Описание", "category": "работа",
+            "due_date": "2030-01-01", "priority": "низкий",
+        }
+        async with tcp_server:
+            return await asyncio.gather(*(request(port, "POST", "/tasks", new_task) for _ in range(20)))
+    responses = asyncio.run(scenario())
+    assert sorted(payload["task"]["id"] for _, payload in responses) == list(range(3, 23))
+    assert len(server.task_service.tasks) == 22
+
+@pytest.mark.parametrize("instrumented", [False, True])
+def test_merge_with_other_process_is_applied(tmp_path, capsys, instrumented):
+    path = tmp_path / "tasks.json"
+    DataManager(path).save_tasks([sample_tasks[0]])
+    data_manager = DataManager(path)
+    if instrumented:
+        data_manager = InstrumentedDataManager(data_manager, Metrics())
+    background = BackgroundDataManager(data_manager)
+    server = ApiServer(TaskService(data_manager=background))
+    other = TaskService(data_manager=DataManager(path))
+    other.tasks
+    new_task = {
+        "title": "Задача сервера", "description": "Описание", "category": "работа",
+        "due_date": "2030-01-01", "priority": "высокий",
+    }
+
+    async def scenario():
+        tcp_server = await server.start(port=0)
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            other.add_task("from B", "d", "работа", "2030-01-01", "низкий")
+            _, added = await request(port, "POST", "/tasks", new_task)
+            await request(port, "POST", "/tasks/1/complete")
+            await asyncio.get_running_loop().run_in_executor(None, background.flush)
+            await asyncio.sleep(0)
+            return added
+    added = asyncio.run(scenario())
+    background.close()
+
+    stored = [(task["id"], task["title"], task["status"]) for task in DataManager(path).load_tasks()]
+    assert stored == [
+        (1, "Task 1", TaskStatus.COMPLETED.value),
+        (2, "from B", TaskStatus.UNCOMPLETED.value),
+        (3, "Задача сервера", TaskStatus.UNCOMPLETED.value),
+    ]
+    assert [(task.id, task.title, task.status) for task in server.task_service.tasks] == stored
+    assert added["task"]["id"] == 3
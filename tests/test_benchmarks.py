@@ -0,0 +1,21 @@
+import pytest
+from benchmarks.generate_tasks import generate_tasks
+from benchmarks.run_benchmarks import DATA_MANAGERS, run_benchmarks
+from task_service import validate_task_data
+
+
+def test_generated_tasks_are_valid_and_reproducible():
+    tasks = list(generate_tasks(200, seed=1))
+    assert [task["id"] for task in tasks] == list(range(1, 201))
+    assert all(validate_task_data(task) is None for task in tasks)
+    assert {task["category"] for task in tasks} == {"работа", "личное", "учеба", "здоровье", "прочее"}
+    assert tasks == list(generate_tasks(200, seed=1))
+
+@pytest.mark.parametrize("backend", DATA_MANAGERS)
+def test_run_benchmarks_report(backend):
+    report = run_benchmarks(sizes=(20,), backend=backend, repeat=1)
+    results = report["results"]["20"]
+    assert report["meta"]["backend"] == backend
+    assert {"startup", "load", "save", "add_task", "get_task_by_id", "search_task[search]",
+            "display_sorted_tasks[due_date]", "display_tasks_by_category[работа]"} <= results.keys()
+    assert all(timing["min_ms"] >= 0 for timing in results.values())
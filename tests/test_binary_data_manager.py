@@ -0,0 +1,78 @@
+import pytest
+from binary_data_manager import BinaryDataManager
+from task_service import TaskService, TaskStatus
+from test_data import sample_tasks
+
+
+@pytest.fixture
+def data_manager(tmp_path):
+    data_manager = BinaryDataManager(tmp_path / "tasks.bin")
+    data_manager.save_tasks(sample_tasks)
+    return data_manager
+
+def test_load_tasks(data_manager, tmp_path):
+    assert BinaryDataManager(tmp_path / "tasks.bin").load_tasks() == sample_tasks
+
+def test_load_missing_file(tmp_path):
+    assert BinaryDataManager(tmp_path / "missing.bin").load_tasks() == []
+
+def test_round_trip_unknown_values(data_manager):
+    task = dict(sample_tasks[0], id=3, category="New Category", due_date="someday", title="Задача 3")
+    data_manager.save_tasks(sample_tasks + [task])
+    assert data_manager.load_tasks()[-1] == task
+
+def test_get_task(data_manager):
+    assert data_manager.get_task(2) == sample_tasks[1]
+    assert data_manager.get_task(999) is None
+
+def test_status_is_updated_in_place(data_manager, tmp_path):
+    inode = data_manager.file_path.stat().st_ino
+    completed = dict(sample_tasks[0], status=TaskStatus.COMPLETED.value)
+    data_manager.save_tasks([completed, sample_tasks[1]], changed=[completed])
+    assert data_manager.file_path.stat().st_ino == inode
+    assert BinaryDataManager(tmp_path / "tasks.bin").get_task(1) == completed
+
+def test_file_replaced_by_other_instance_is_remapped(data_manager, tmp_path):
+    assert data_manager.get_task(2) == sample_tasks[1]
+    renamed = dict(sample_tasks[1], title="Изменено другим процессом")
+    BinaryDataManager(tmp_path / "tasks.bin").save_tasks([sample_tasks[0], renamed])
+    assert data_manager.get_task(2) == renamed
+    completed = dict(renamed, status=TaskStatus.COMPLETED.value)
+    assert data_manager.update_statuses([completed])
+    assert BinaryDataManager(tmp_path / "tasks.bin").get_task(2) == completed
+    assert not data_manager.update_statuses([dict(sample_tasks[0], title="Устарело", status=TaskStatus.COMPLETED.value)])
+
+def test_other_changes_rewrite_file(data_manager, tmp_path):
+    updated = dict(sample_tasks[0], title="Новое название")
+    data_manager.save_tasks([updated, sample_tasks[1]], changed=[updated])
+    assert BinaryDataManager(tmp_path / "tasks.bin").load_tasks() == [updated, sample_tasks[1]]
+
+def test_find_tasks(data_manager):
+    assert [task["id"] for task in data_manager.find_tasks(equals={"category": "личное"})] == [2]
+    assert data_manager.find_tasks(equals={"category": "учеба"}) == []
+    assert [task["id"] for task in data_manager.find_tasks(contains="TASK 1")] == [1]
+    assert [task["id"] for task in data_manager.find_tasks(order_by="due_date")] == [1, 2]
+
+def test_task_service_loads_tasks_on_first_mutation(data_manager, capsys):
+    task_service = TaskService(data_manager=data_manager)
+    task_service.display_tasks()
+    assert not task_service.loaded
+    assert "Task 2" in capsys.readouterr().out
+    task_service.complete_task(2)
+    assert task_service.tasks[1].status == TaskStatus.COMPLETED.value
+    assert data_manager.get_task(2)["status"] == TaskStatus.COMPLETED.value
+
+def test_single_task_is_read_and_completed_without_loading(data_manager, capsys):
+    inode = data_manager.file_path.stat().st_ino
+    task_service = TaskService(data_manager=data_manager)
+    task_service.display_single_task(2)
+    task_service.display_single_task(999)
+    task_service.complete_task(2)
+    assert not task_service.loaded
+    output = capsys.readouterr().out
+    assert "Task 2" in output and "'999' не найдена" in output and "выполнена!" in output
+    assert data_manager.file_path.stat().st_ino == inode
+    assert data_manager.get_task(2)["status"] == TaskStatus.COMPLETED.value
+    task_service.complete_task(2)
+    assert "уже выполнена" in capsys.readouterr().out
+    assert not task_service.loaded
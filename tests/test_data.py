@@ -1,3 +1,5 @@
+from unittest.mock import MagicMock
+from data_manager import DataManager
 from task_service import TaskStatus
 
 sample_tasks = [
@@ -20,3 +22,13 @@ sample_tasks = [
         "status": TaskStatus.UNCOMPLETED.value,
     },
 ]
+
+
+def mock_data_manager(tasks: list[dict] = sample_tasks) -> MagicMock:
+    """Заглушка менеджера данных: выдает копии задач, без сохраненного счетчика id и без объединения изменений."""
+    data_manager = MagicMock(spec=DataManager)
+    data_manager.load_tasks.return_value = tasks
+    data_manager.iter_tasks.side_effect = lambda: iter([dict(task) for task in tasks])
+    data_manager.load_next_id.return_value = None
+    data_manager.save_tasks.return_value = None
+    return data_manager
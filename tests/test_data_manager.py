@@ -0,0 +1,145 @@
+import json
+import pytest
+from unittest.mock import patch
+from data_manager import DataManager
+from test_data import sample_tasks
+
+
+@pytest.fixture
+def data_manager(tmp_path):
+    return DataManager(tmp_path / "tasks.json")
+
+def test_save_and_load_tasks(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    assert data_manager.load_tasks() == sample_tasks
+
+def test_load_missing_or_empty_file(data_manager):
+    assert data_manager.load_tasks() == []
+    data_manager.file_path.write_text("  \n")
+    assert data_manager.load_tasks() == []
+    data_manager.file_path.write_text("[ ]")
+    assert data_manager.load_tasks() == []
+
+def test_iter_tasks_reads_in_small_chunks(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    assert list(data_manager._read_json_array(chunk_size=5)) == sample_tasks
+
+def test_iter_tasks_yields_before_end_of_file(data_manager):
+    content = json.dumps(sample_tasks, ensure_ascii=False)
+    data_manager.file_path.write_text(content[:-10])
+    tasks = data_manager._read_json_array(chunk_size=5)
+    assert next(tasks) == sample_tasks[0]
+    with pytest.raises(json.JSONDecodeError):
+        next(tasks)
+
+def test_load_corrupted_file(data_manager):
+    data_manager.file_path.write_text('[{"id": 1,')
+    assert data_manager.load_tasks() == []
+    corrupt_path = data_manager.file_path.with_name("tasks.json.corrupt")
+    assert corrupt_path.read_text() == '[{"id": 1,'
+    data_manager.save_tasks(sample_tasks, changed=sample_tasks)
+    assert corrupt_path.read_text() == '[{"id": 1,'
+
+def test_set_aside_keeps_previous_corrupted_files(data_manager):
+    for content in ('[{"id": 1,', '[{"id": 2,'):
+        data_manager.file_path.write_text(content)
+        assert data_manager.load_tasks() == []
+    assert data_manager.file_path.with_name("tasks.json.corrupt").read_text() == '[{"id": 1,'
+    assert data_manager.file_path.with_name("tasks.json.corrupt.1").read_text() == '[{"id": 2,'
+
+def test_valid_file_is_not_set_aside(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    assert data_manager.set_aside_corrupted() is None
+    assert data_manager.load_tasks() == sample_tasks
+
+def test_save_replaces_file_atomically(data_manager):
+    data_manager.fsync = True
+    data_manager.save_tasks(sample_tasks)
+    data_manager.save_next_id(3)
+    assert [path.name for path in data_manager.file_path.parent.iterdir() if path.suffix == ".tmp"] == []
+    assert data_manager.load_tasks() == sample_tasks
+    assert data_manager.load_next_id() == 3
+
+def test_concurrent_changes_are_merged(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    other = DataManager(data_manager.file_path)
+    other.load_tasks()
+    data_manager.load_tasks()
+
+    other_task = dict(sample_tasks[1], title="Изменено другим процессом")
+    assert other.save_tasks([sample_tasks[0], other_task], changed=[other_task]) is None
+
+    own_task = dict(sample_tasks[0], title="Изменено этим процессом")
+    merged = data_manager.save_tasks([own_task, sample_tasks[1]], changed=[own_task])
+    assert merged == [own_task, other_task]
+    assert data_manager.load_tasks() == [own_task, other_task]
+
+def test_concurrent_new_tasks_get_distinct_ids(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    other = DataManager(data_manager.file_path)
+    other.load_tasks()
+    data_manager.load_tasks()
+
+    other_task = dict(sample_tasks[0], id=3, title="Задача другого процесса")
+    other.save_tasks(sample_tasks + [other_task], changed=[other_task])
+    other.save_next_id(4)
+    own_task = dict(sample_tasks[0], id=3, title="Задача этого процесса")
+    merged = data_manager.save_tasks(sample_tasks + [own_task], changed=[own_task])
+    assert [(task["id"], task["title"]) for task in merged[2:]] == [
+        (3, "Задача другого процесса"), (4, "Задача этого процесса"),
+    ]
+    data_manager.save_next_id(4)
+    assert data_manager.load_next_id() == 4
+
+def test_concurrent_delete_is_merged(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    other = DataManager(data_manager.file_path)
+    other.load_tasks()
+    data_manager.load_tasks()
+
+    other_task = dict(sample_tasks[0], title="Изменено другим процессом")
+    other.save_tasks([other_task, sample_tasks[1]], changed=[other_task])
+    assert data_manager.save_tasks([sample_tasks[0]], changed=[], deleted=[2]) == [other_task]
+
+def test_lock_is_reentrant(data_manager):
+    with data_manager.locked():
+        with data_manager.locked():
+            data_manager.save_tasks(sample_tasks)
+        assert data_manager.lock_depth == 1
+    assert data_manager.lock_depth == 0
+
+def test_save_encodes_only_changed_tasks(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    changed_task = dict(sample_tasks[1], title="Изменено")
+    with patch("data_manager.json.dumps", wraps=json.dumps) as dumps:
+        data_manager.save_tasks([sample_tasks[0], changed_task], changed=[changed_task])
+    dumps.assert_called_once()
+    content = data_manager.file_path.read_text()
+    assert content == json.dumps([sample_tasks[0], changed_task], indent=4, ensure_ascii=False)
+
+def test_first_save_is_encoded_at_once_and_split_into_fragments(data_manager):
+    tasks = sample_tasks + [dict(sample_tasks[0], id=3, title="С переводом\nстроки {")]
+    with patch("data_manager.json.dumps", wraps=json.dumps) as dumps:
+        data_manager.save_tasks(tasks, changed=[])
+    dumps.assert_called_once()
+    assert data_manager.fragments == {
+        task["id"]: "    " + json.dumps(task, indent=4, ensure_ascii=False).replace("\n", "\n    ") for task in tasks
+    }
+
+def test_save_without_fragment_cache(data_manager):
+    data_manager.set_fragment_cache(False)
+    data_manager.save_tasks(sample_tasks)
+    assert data_manager.fragments == {}
+    changed_task = dict(sample_tasks[1], title="Изменено")
+    with patch("data_manager.json.dumps", wraps=json.dumps) as dumps:
+        data_manager.save_tasks([sample_tasks[0], changed_task], changed=[changed_task])
+    dumps.assert_called_once()
+    content = data_manager.file_path.read_text()
+    assert content == json.dumps([sample_tasks[0], changed_task], indent=4, ensure_ascii=False)
+
+def test_save_after_load_encodes_all_tasks(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    data_manager.file_path.write_text(json.dumps([dict(sample_tasks[0], title="Изменено")]))
+    tasks = data_manager.load_tasks()
+    data_manager.save_tasks(tasks, changed=[])
+    assert data_manager.load_tasks() == tasks
@@ -0,0 +1,72 @@
+import json
+import pytest
+from journal_data_manager import JournalDataManager
+from task_service import TaskService
+from test_data import sample_tasks
+
+
+@pytest.fixture
+def data_manager(tmp_path):
+    data_manager = JournalDataManager(tmp_path / "tasks.json", compact_threshold=3)
+    data_manager.save_tasks(sample_tasks)
+    return data_manager
+
+def test_full_save_writes_snapshot(data_manager):
+    assert json.loads(data_manager.file_path.read_text()) == sample_tasks
+    assert not data_manager.journal_path.exists()
+
+def test_changes_are_appended_to_journal(data_manager):
+    updated_task = dict(sample_tasks[0], status="выполнена")
+    data_manager.save_tasks([updated_task, sample_tasks[1]], changed=[updated_task])
+    assert json.loads(data_manager.file_path.read_text()) == sample_tasks
+    assert len(data_manager.journal_path.read_text().splitlines()) == 1
+
+def test_full_task_list_is_built_only_when_needed(data_manager):
+    data_manager.load_tasks()
+    built = []
+    updated_task = dict(sample_tasks[0], status="выполнена")
+    data_manager.save_tasks(lambda: built.append(1) or [updated_task, sample_tasks[1]], changed=[updated_task])
+    assert built == []
+    data_manager.save_tasks(lambda: built.append(1) or [updated_task, sample_tasks[1]])
+    assert built == [1]
+    assert data_manager.load_tasks() == [updated_task, sample_tasks[1]]
+
+def test_load_replays_journal(data_manager, tmp_path):
+    new_task = dict(sample_tasks[1], id=3, title="Task 3")
+    data_manager.save_tasks([sample_tasks[1], new_task], changed=[new_task], deleted=[1])
+    loaded = JournalDataManager(tmp_path / "tasks.json").load_tasks()
+    assert [task["id"] for task in loaded] == [2, 3]
+    assert loaded[1]["title"] == "Task 3"
+
+def test_load_skips_truncated_record(data_manager, tmp_path):
+    with data_manager.journal_path.open("a", encoding="utf-8") as journal:
+        journal.write('{"op": "delete", "id": 1}\n{"op": "del')
+    loaded = JournalDataManager(tmp_path / "tasks.json").load_tasks()
+    assert [task["id"] for task in loaded] == [2]
+
+def test_compaction_after_threshold(data_manager):
+    tasks = [dict(task) for task in sample_tasks]
+    for title in ("A", "B", "C"):
+        tasks[0]["title"] = title
+        data_manager.save_tasks(tasks, changed=[tasks[0]])
+    assert not data_manager.journal_path.exists()
+    assert data_manager.journal_size == 0
+    assert json.loads(data_manager.file_path.read_text())[0]["title"] == "C"
+
+def test_next_id_is_persisted(data_manager, tmp_path):
+    assert data_manager.load_next_id() is None
+    data_manager.save_next_id(5)
+    assert JournalDataManager(tmp_path / "tasks.json").load_next_id() == 5
+
+def test_concurrent_new_tasks_get_distinct_ids(tmp_path, capsys):
+    path = tmp_path / "shared.json"
+    own, other = TaskService(JournalDataManager(path)), TaskService(JournalDataManager(path))
+    own.tasks, other.tasks
+    own.add_task("from A", "d", "работа", "2030-01-01", "низкий")
+    other.add_task("from B", "d", "работа", "2030-01-01", "низкий")
+    assert [(task.id, task.title) for task in other.tasks] == [(1, "from A"), (2, "from B")]
+    own.complete_task(1)
+    loaded = JournalDataManager(path).load_tasks()
+    assert [(task["id"], task["title"], task["status"]) for task in loaded] == [
+        (1, "from A", "выполнена"), (2, "from B", "не выполнена"),
+    ]
@@ -0,0 +1,66 @@
+import json
+import pytest
+from data_manager import DataManager
+from journal_data_manager import JournalDataManager
+from metrics import Histogram, InstrumentedDataManager, Metrics, instrument_service
+from task_service import TaskService
+from test_data import sample_tasks
+
+
+@pytest.fixture
+def metrics():
+    return Metrics()
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(seconds)
+    assert histogram.to_dict() == {"count": 4, "sum": 4.25, "buckets": {"0.1": 1, "1.0": 3, "+Inf": 4}}
+
+def test_instrumented_service_records_public_methods(metrics, data_manager):
+    task_service = instrument_service(TaskService(data_manager=data_manager), metrics)
+    task_service.display_tasks()
+    task_service.complete_task(1)
+    operations = metrics.snapshot()["operations"]
+    assert operations["task_service.display_tasks"]["count"] == 1
+    assert operations["task_service.complete_task"]["count"] == 1
+    assert not any(name.startswith("task_service._") for name in operations)
+
+def test_uninstrumented_service_has_no_wrappers(data_manager):
+    assert "display_tasks" not in vars(TaskService(data_manager=data_manager))
+
+def test_data_manager_bytes_and_tasks(metrics, tmp_path):
+    data_manager = InstrumentedDataManager(DataManager(tmp_path / "tasks.json"), metrics)
+    data_manager.save_tasks(sample_tasks)
+    size = (tmp_path / "tasks.json").stat().st_size
+    assert list(data_manager.iter_tasks()) == sample_tasks
+    assert data_manager.load_tasks() == sample_tasks
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {
+        "bytes_read": 2 * size,
+        "bytes_written": size,
+        "tasks_loaded": 2 * len(sample_tasks),
+        "tasks_saved": len(sample_tasks),
+    }
+    assert {"data_manager.save_tasks", "data_manager.iter_tasks", "data_manager.load_tasks"} <= snapshot["operations"].keys()
+
+def test_appended_journal_counts_only_new_bytes(metrics, tmp_path):
+    journal = JournalDataManager(tmp_path / "tasks.json")
+    data_manager = InstrumentedDataManager(journal, metrics)
+    data_manager.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    first = journal.journal_path.stat().st_size
+    data_manager.save_tasks(sample_tasks, changed=[sample_tasks[1]])
+    assert metrics.counters["bytes_written"] == journal.journal_path.stat().st_size
+    assert metrics.counters["bytes_written"] > first
+    assert metrics.counters["tasks_saved"] == 2
+
+def test_dump_formats(metrics, tmp_path):
+    metrics.observe("task_service.add_task", 0.002)
+    metrics.increment("tasks_saved", 3)
+    metrics.dump(tmp_path / "metrics.json")
+    metrics.dump(tmp_path / "metrics.prom")
+    assert json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))["counters"] == {"tasks_saved": 3}
+    prometheus = (tmp_path / "metrics.prom").read_text(encoding="utf-8")
+    assert 'task_manager_operation_seconds_bucket{operation="task_service.add_task",le="0.005"} 1' in prometheus
+    assert 'task_manager_operation_seconds_count{operation="task_service.add_task"} 1' in prometheus
+    assert "task_manager_tasks_saved_total 3" in prometheus
@@ -0,0 +1,46 @@
+import io
+import pytest
+from script_runner import ScriptRunner
+from task_service import TaskService, TaskStatus
+
+
+@pytest.fixture
+def runner(data_manager):
+    return ScriptRunner(TaskService(data_manager=data_manager))
+
+def test_run_commands(runner, capsys):
+    script = [
+        "# комментарий",
+        'add "Новая задача" "Описание задачи" учеба 2030-01-01 высокий',
+        "complete 1",
+        "update 2 title 'Новое название'",
+        "delete 3",
+        "search search новое",
+        "list priority",
+    ]
+    assert runner.run(script) == 0
+    tasks = runner.task_service.tasks_by_id
+    assert 3 not in tasks
+    assert tasks[1].status == TaskStatus.COMPLETED.value
+    assert tasks[2].title == "Новое название"
+    assert "Новое название" in capsys.readouterr().out
+
+def test_invalid_commands_are_reported(runner):
+    errors = io.StringIO()
+    script = [
+        "unknown",
+        "complete 999",
+        "add only-title",
+        "update 1 status выполнена",
+        "update 1 category unknown",
+        "search search 'unclosed",
+        "list title",
+    ]
+    assert runner.run(script, errors=errors) == len(script)
+    assert errors.getvalue().count("Строка") == len(script)
+    assert runner.task_service.tasks_by_id[1].status == TaskStatus.UNCOMPLETED.value
+
+def test_delete_does_not_ask_confirmation(runner, data_manager):
+    assert runner.run(["delete 1"]) == 0
+    assert 1 not in runner.task_service.tasks_by_id
+    data_manager.save_tasks.assert_called_once()
@@ -0,0 +1,67 @@
+import pytest
+from sharded_data_manager import ShardedDataManager
+from test_data import sample_tasks
+
+
+@pytest.fixture
+def data_manager(tmp_path):
+    return ShardedDataManager(tmp_path / "tasks", shard_size=1, workers=1)
+
+def test_save_and_load_tasks(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    assert sorted(path.name for path in data_manager.directory.iterdir()) == [
+        "manifest.json", "shard-0.json", "shard-1.json",
+    ]
+    assert data_manager.load_tasks() == sample_tasks
+
+def test_load_missing_directory(data_manager):
+    assert data_manager.load_tasks() == []
+
+def test_load_shards_in_parallel(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    assert ShardedDataManager(data_manager.directory, workers=2).load_tasks() == sample_tasks
+
+def test_load_corrupted_shard(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    data_manager._shard_path(1).write_text('[{"id": 2,')
+    assert data_manager.load_tasks() == []
+    corrupt_directory = data_manager.directory.with_name("tasks.corrupt")
+    assert (corrupt_directory / "shard-0.json").exists()
+    data_manager.save_tasks([sample_tasks[0]], changed=[sample_tasks[0]])
+    assert (corrupt_directory / "shard-1.json").read_text() == '[{"id": 2,'
+
+def test_save_rewrites_only_changed_shards(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    data_manager.load_tasks()
+    unchanged_inode = data_manager._shard_path(0).stat().st_ino
+    changed_task = dict(sample_tasks[1], title="Изменено")
+    data_manager.save_tasks([sample_tasks[0], changed_task], changed=[changed_task])
+    assert data_manager._shard_path(0).stat().st_ino == unchanged_inode
+    assert data_manager.load_tasks() == [sample_tasks[0], changed_task]
+
+def test_delete_removes_empty_shard(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    data_manager.load_tasks()
+    data_manager.save_tasks(sample_tasks[:1], changed=[], deleted=[2])
+    assert not data_manager._shard_path(1).exists()
+    assert data_manager.load_tasks() == sample_tasks[:1]
+
+def test_shard_size_is_read_from_manifest(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    other = ShardedDataManager(data_manager.directory, shard_size=100, workers=1)
+    assert other.load_tasks() == sample_tasks
+    assert other.shard_size == 1
+
+def test_concurrent_changes_are_merged(data_manager):
+    data_manager.save_tasks(sample_tasks)
+    other = ShardedDataManager(data_manager.directory, workers=1)
+    other.load_tasks()
+    data_manager.load_tasks()
+
+    other_task = dict(sample_tasks[1], title="Изменено другим процессом")
+    assert other.save_tasks([sample_tasks[0], other_task], changed=[other_task]) is None
+
+    own_task = dict(sample_tasks[0], title="Изменено этим процессом")
+    merged = data_manager.save_tasks([own_task, sample_tasks[1]], changed=[own_task])
+    assert merged == [own_task, other_task]
+    assert data_manager.load_tasks() == [own_task, other_task]
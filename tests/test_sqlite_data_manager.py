@@ -0,0 +1,79 @@
+import pytest
+from sqlite_data_manager import SQLiteDataManager
+from task_service import TaskService
+from test_data import sample_tasks
+
+
+@pytest.fixture
+def data_manager(tmp_path):
+    data_manager = SQLiteDataManager(tmp_path / "tasks.db")
+    data_manager.save_tasks(sample_tasks)
+    return data_manager
+
+def test_load_tasks(data_manager):
+    assert data_manager.load_tasks() == sample_tasks
+
+def test_save_changes(data_manager):
+    new_task = dict(sample_tasks[0], id=3, title="Задача 3")
+    data_manager.save_tasks([], changed=[new_task], deleted=[1])
+    assert [task["id"] for task in data_manager.load_tasks()] == [2, 3]
+
+def test_find_tasks_by_field(data_manager):
+    assert [task["id"] for task in data_manager.find_tasks(equals={"category": "личное"})] == [2]
+
+def test_find_tasks_contains_cyrillic(data_manager):
+    new_task = dict(sample_tasks[0], id=3, title="Изучить SQLite")
+    data_manager.save_tasks([], changed=[new_task])
+    assert [task["id"] for task in data_manager.find_tasks(contains="ИЗУЧИТЬ")] == [3]
+
+def test_find_tasks_ordered_by_priority(data_manager):
+    assert [task["id"] for task in data_manager.find_tasks(order_by="priority")] == [1, 2]
+
+def test_find_tasks_rejects_unknown_field(data_manager):
+    with pytest.raises(ValueError):
+        data_manager.find_tasks(equals={"unknown": "value"})
+
+def test_task_service_pushes_down_queries(data_manager, capsys):
+    task_service = TaskService(data_manager=data_manager)
+    task_service.tasks = []
+    task_service.search_task('search', 'task 2')
+    captured = capsys.readouterr()
+    assert "Task 2" in captured.out
+    assert "Task 1" not in captured.out
+
+def test_next_id_is_persisted(data_manager):
+    assert data_manager.load_next_id() is None
+    data_manager.save_next_id(5)
+    assert data_manager.load_next_id() == 5
+
+def test_find_tasks_page(data_manager):
+    assert [task["id"] for task in data_manager.find_tasks(offset=1, limit=1)] == [2]
+    assert [task["id"] for task in data_manager.find_tasks(offset=1)] == [2]
+
+def test_get_task_and_update_statuses(data_manager):
+    assert data_manager.get_task(2) == sample_tasks[1]
+    assert data_manager.get_task(3) is None
+    assert data_manager.update_statuses([dict(sample_tasks[0], status="выполнена")]) is True
+    assert data_manager.get_task(1)["status"] == "выполнена"
+    assert data_manager.update_statuses([dict(sample_tasks[1], status="выполнена", title="Другая")]) is False
+    assert data_manager.update_statuses([dict(sample_tasks[0], id=3)]) is False
+    assert data_manager.get_task(2) == sample_tasks[1]
+
+def test_insert_task_allocates_id(data_manager):
+    data_manager.save_next_id(2)
+    task = {field: value for field, value in sample_tasks[0].items() if field != "id"}
+    assert data_manager.insert_task(task)["id"] == 3
+    assert data_manager.insert_task(task)["id"] == 4
+    assert data_manager.load_next_id() == 5
+    assert data_manager.get_task(4) == dict(task, id=4)
+
+def test_task_service_uses_single_task_operations(data_manager, monkeypatch, capsys):
+    task_service = TaskService(data_manager=data_manager)
+    monkeypatch.setattr(data_manager, "iter_tasks", lambda: pytest.fail("все задачи загружены"))
+    task_service.display_single_task(2)
+    task_service.complete_task(1)
+    new_task = task_service.add_task("Задача 3", "Описание", "работа", "2030-01-01", "низкий")
+    assert new_task.id == 3
+    assert not task_service.loaded
+    assert data_manager.get_task(1)["status"] == "выполнена"
+    assert data_manager.get_task(3)["title"] == "Задача 3"
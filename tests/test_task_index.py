@@ -0,0 +1,129 @@
+import threading
+from task_index import BucketIndex, SortedView, TaskCounters, TrigramIndex
+from task_service import Task
+from test_data import sample_tasks
+
+
+def make_task(task_id, title, description="Описание"):
+    return Task.from_dict(dict(sample_tasks[0], id=task_id, title=title, description=description))
+
+def test_trigram_search_is_case_insensitive():
+    index = TrigramIndex([make_task(1, "Купить Молоко"), make_task(2, "Позвонить маме")])
+    assert index.search("МОЛОК") == [1]
+    assert index.search("позвон") == [2]
+    assert index.search("хлеб") == []
+
+def test_trigram_search_checks_description():
+    index = TrigramIndex([make_task(1, "Task 1", "Написать статью о FastAPI")])
+    assert index.search("fastapi") == [1]
+
+def test_trigram_search_short_term():
+    index = TrigramIndex([make_task(1, "Ab"), make_task(2, "Cd")])
+    assert index.search("b") == [1]
+
+def test_trigram_search_requires_contiguous_match():
+    index = TrigramIndex([make_task(1, "abcd xbcy")])
+    assert index.search("abcy") == []
+
+def test_trigram_index_remove_after_update():
+    task = make_task(1, "Старое название")
+    index = TrigramIndex([task])
+    index.remove(task)
+    task.title = "Новое название"
+    index.add(task)
+    assert index.search("старое") == []
+    assert index.search("новое") == [1]
+
+def test_trigram_index_is_built_after_scans():
+    task = make_task(1, "Купить молоко", "Зайти в магазин")
+    index = TrigramIndex([task, make_task(2, "Позвонить маме")])
+    index.build_after_scans = 2
+    assert index.search("молоко") == [1]
+    assert index.builder is None
+    assert index.search("молоко") == [1]
+    index.wait_for_build()
+    assert index.postings is not None
+    assert index.search("ко зай") == []
+    index.remove(task)
+    task.title = "Купить хлеб"
+    index.add(task)
+    assert index.search("молоко") == []
+    assert index.search("хлеб") == [1]
+
+def test_changes_during_background_build_are_applied():
+    kept, removed, updated = make_task(1, "Купить молоко"), make_task(2, "Позвонить маме"), make_task(3, "Старое")
+    index = TrigramIndex([kept, removed, updated])
+    release = threading.Event()
+    build_postings = index._build_postings
+    index._build_postings = lambda texts: release.wait() and build_postings(texts)
+    assert index.search("молоко") == [1]
+    assert index.postings is None and index.builder is not None
+    index.remove(removed)
+    index.remove(updated)
+    updated.title = "Новое"
+    index.add(updated)
+    index.add(make_task(4, "Купить хлеб"))
+    assert index.search("купить") == [1, 4]
+    release.set()
+    index.wait_for_build()
+    assert index.postings is not None
+    assert index.search("маме") == []
+    assert index.search("старое") == []
+    assert index.search("новое") == [3]
+    assert index.search("купить") == [1, 4]
+
+def test_bucket_index_add_and_remove():
+    task = make_task(1, "Task 1")
+    index = BucketIndex("category", [task, Task.from_dict(sample_tasks[1])])
+    assert index.get("работа") == {1}
+    index.remove(task)
+    task.category = "личное"
+    index.add(task)
+    assert index.get("работа") == set()
+    assert index.get("личное") == {1, 2}
+
+def test_sorted_view_keeps_order_on_update():
+    tasks = [make_task(1, "B"), make_task(2, "A"), make_task(3, "C")]
+    view = SortedView(lambda task: task.title, tasks)
+    assert view.ids() == [2, 1, 3]
+    view.remove(tasks[2])
+    tasks[2].title = "0"
+    view.add(tasks[2])
+    assert view.ids() == [3, 2, 1]
+    assert view.ids(offset=1, limit=1) == [2]
+
+def test_sorted_view_is_built_on_first_use():
+    tasks = [make_task(1, "B"), make_task(2, "A")]
+    view = SortedView(lambda task: task.title, tasks)
+    view.remove(tasks[0])
+    tasks[0].title = "0"
+    view.add(tasks[0])
+    new_task = make_task(3, "C")
+    tasks.append(new_task)
+    view.add(new_task)
+    assert view._entries is None
+    assert view.ids() == [1, 2, 3]
+
+def test_sorted_view_include_and_range_limit():
+    tasks = [make_task(task_id, f"Задача {task_id}") for task_id in range(1, 6)]
+    tasks[2].status = "выполнена"
+    view = SortedView(lambda task: task.id % 3, tasks, include=lambda task: task.status != "выполнена")
+    assert view.range_ids() == [1, 4, 2, 5]
+    assert view.range_ids(start=1, limit=1) == [1]
+    view.remove(tasks[0])
+    tasks[0].status = "выполнена"
+    view.add(tasks[0])
+    assert view.range_ids(end=2) == [4]
+
+def test_task_counters_follow_changes():
+    tasks = [Task.from_dict(task) for task in sample_tasks]
+    counters = TaskCounters("выполнена", tasks)
+    assert counters.counts == {("работа", "не выполнена", "высокий"): 1, ("личное", "не выполнена", "средний"): 1}
+    counters.remove(tasks[0])
+    tasks[0].status = "выполнена"
+    counters.add(tasks[0])
+    assert counters.counts[("работа", "выполнена", "высокий")] == 1
+    assert ("работа", "не выполнена", "высокий") not in counters.counts
+    assert counters.completed_by_due_date == {"2023-12-01": 1}
+    counters.remove(tasks[0])
+    assert counters.completed_by_due_date == {}
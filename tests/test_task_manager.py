@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from task_manager import TaskManager
+from task_manager import PAGE_SIZE, TaskManager
 from task_service import TaskService, Task
 from test_data import sample_tasks
 
@@ -9,6 +9,8 @@ from test_data import sample_tasks
 def task_service():
     task_service = MagicMock(spec=TaskService)
     task_service.tasks = [Task.from_dict(task) for task in sample_tasks]
+    for method in ('display_tasks', 'display_sorted_tasks', 'display_tasks_by_category', 'search_task'):
+        getattr(task_service, method).return_value = False
     return task_service
 
 @pytest.fixture
@@ -22,19 +24,19 @@ def test_display_tasks(task_manager, capsys):
     assert "Просмотр всех задач" in captured.out
 
 def test_display_all_tasks(task_manager):
-    with patch.object(task_manager.task_service, 'display_tasks') as mock_display_tasks:
+    with patch.object(task_manager.task_service, 'display_tasks', return_value=False) as mock_display_tasks:
         task_manager.display_all_tasks()
         mock_display_tasks.assert_called_once()
 
 def test_display_sorted_tasks(task_manager, capsys):
     with patch('builtins.input', return_value='приоритет'):
-        with patch.object(task_manager.task_service, 'display_sorted_tasks') as mock_display_tasks:
+        with patch.object(task_manager.task_service, 'display_sorted_tasks', return_value=False) as mock_display_tasks:
             task_manager.display_sorted_tasks()
             mock_display_tasks.assert_called_once()
 
 def test_display_category_tasks(task_manager, capsys):
     with patch('builtins.input', return_value='работа'):
-        with patch.object(task_manager.task_service, 'display_tasks_by_category') as mock_display_category_tasks:
+        with patch.object(task_manager.task_service, 'display_tasks_by_category', return_value=False) as mock_display_category_tasks:
             task_manager.display_category_tasks()
             mock_display_category_tasks.assert_called_once()
 
@@ -67,7 +69,7 @@ def test_update_task(task_manager):
     task_manager.task_service.update_task.assert_called_once_with(1, 'title', 'New Title')
 
 def test_remove_task(task_manager):
-    with patch('builtins.input', return_value='1'):
+    with patch('builtins.input', side_effect=['1', 'да']):
         task_manager.remove_task()
     task_manager.task_service.delete_task.assert_called_once_with(1)
 
@@ -75,5 +77,55 @@ def test_search_task(task_manager, capsys):
     with patch('builtins.input', side_effect=['название и описание', 'Task']):
         task_manager.search_task()
     task_manager.task_service.search_task.assert_called_once_with(
-        'search', 'Task',
+        'search', 'Task', offset=0, limit=PAGE_SIZE,
     )
+
+def test_default_task_service_is_created_lazily(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    task_manager = TaskManager()
+    assert isinstance(task_manager.task_service, TaskService)
+    assert not task_manager.task_service.loaded
+
+def test_display_pages(task_manager):
+    display = MagicMock(side_effect=[True, True, False])
+    with patch('builtins.input', return_value=''):
+        task_manager.display_pages(display, 'priority')
+    assert [call.kwargs['offset'] for call in display.call_args_list] == [0, PAGE_SIZE, 2 * PAGE_SIZE]
+
+def test_display_pages_stop(task_manager):
+    display = MagicMock(return_value=True)
+    with patch('builtins.input', return_value='stop'):
+        task_manager.display_pages(display)
+    display.assert_called_once_with(offset=0, limit=PAGE_SIZE)
+
+def test_remove_task_cancelled(task_manager):
+    with patch('builtins.input', side_effect=['1', 'нет']):
+        task_manager.remove_task()
+    task_manager.task_service.delete_task.assert_not_called()
+
+def test_remove_several_tasks(task_manager, capsys):
+    task_manager.task_service.delete_tasks.return_value = 2
+    with patch('builtins.input', side_effect=['1, 2', 'да']) as mock_input:
+        task_manager.remove_task()
+    task_manager.task_service.delete_tasks.assert_called_once_with(task_ids=[1, 2])
+    assert mock_input.call_count == 2
+    assert "Удалено задач: 2" in capsys.readouterr().out
+
+def test_complete_tasks_by_category(task_manager, capsys):
+    task_manager.task_service.query_tasks.return_value = task_manager.task_service.tasks[:1]
+    task_manager.task_service.complete_tasks.return_value = 1
+    with patch('builtins.input', side_effect=['работа', '2024-01-01', 'да']):
+        task_manager.complete_tasks_by_category()
+    where = task_manager.task_service.complete_tasks.call_args.args[0]
+    assert [task.id for task in task_manager.task_service.tasks if where.matches(task)] == [1]
+    assert "Выполнено задач: 1" in capsys.readouterr().out
+
+def test_display_summary(task_manager):
+    task_manager.display_summary()
+    task_manager.task_service.display_summary.assert_called_once()
+
+def test_enums_are_reexported():
+    import task_manager
+    import task_service
+    assert task_manager.TaskCategory is task_service.TaskCategory
+    assert task_manager.TaskPriority is task_service.TaskPriority
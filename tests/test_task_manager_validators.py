@@ -57,4 +57,8 @@ def test_is_positive_integer():
 
 def test_is_valid_priority():
     assert is_valid_priority("низкий") == True
-    assert is_valid_priority("invalid") == False
\ No newline at end of file
+    assert is_valid_priority("invalid") == False
+
+def test_is_valid_date_rejects_malformed_value():
+    assert is_valid_date("abc") == False
+    assert is_valid_date("2030-02-30") == False
@@ -0,0 +1,77 @@
+import pytest
+from benchmarks.generate_tasks import generate_tasks
+from task_query import Contains, Eq, In, Predicate, Range
+from task_service import SORTING_KEYS, TaskService, TaskStatus
+from test_data import mock_data_manager
+
+generated_tasks = list(generate_tasks(1000, seed=3))
+
+
+@pytest.fixture
+def task_service():
+    return TaskService(data_manager=mock_data_manager(generated_tasks))
+
+QUERIES = [
+    Eq("priority", "высокий") & Eq("status", TaskStatus.UNCOMPLETED.value) & Eq("category", "работа")
+    & Range("due_date", end="2026-01-01") & Contains("ить"),
+    Eq("category", "учеба") | Contains("стоматолог"),
+    ~Eq("status", TaskStatus.COMPLETED.value) & In("priority", ["высокий", "средний"]),
+    Range("due_date", start="2024-06-01", end="2024-07-01"),
+    Contains("ОТЧЕТ", fields=("title",)) & ~Range("due_date", end="2025-01-01"),
+]
+
+@pytest.mark.parametrize("where", QUERIES, ids=repr)
+@pytest.mark.parametrize("order_by", [None, "due_date", "priority"])
+def test_query_matches_brute_force(task_service, where, order_by):
+    expected = [task for task in task_service.tasks if where.matches(task)]
+    if order_by:
+        expected.sort(key=lambda task: (SORTING_KEYS[order_by](task), task.id))
+    assert expected
+    assert task_service.query_tasks(where, order_by=order_by) == expected
+    assert task_service.query_tasks(where, order_by=order_by, offset=2, limit=5) == expected[2:7]
+    assert task_service.query_tasks(where, order_by=order_by, descending=True, limit=3) == expected[::-1][:3]
+
+def test_planner_picks_most_selective_index(task_service):
+    where = Eq("status", TaskStatus.UNCOMPLETED.value) & Eq("category", "работа") & Eq("priority", "высокий")
+    plan = task_service.explain_query(where)
+    sizes = {field: len(task_service.find_task_ids(**{field: predicate.value}))
+             for field, predicate in zip(("status", "category", "priority"), where.predicates)}
+    assert plan.source == "index"
+    assert plan.index_predicate.field == min(sizes, key=sizes.get)
+    assert plan.estimate == min(sizes.values())
+
+def test_planner_uses_date_range_and_falls_back_to_scan(task_service):
+    narrow = Range("due_date", start="2024-03-01", end="2024-03-02")
+    plan = task_service.explain_query(Eq("status", TaskStatus.UNCOMPLETED.value) & narrow)
+    assert plan.index_predicate is narrow
+    assert task_service.explain_query(~Eq("status", TaskStatus.COMPLETED.value)).source == "scan"
+    assert task_service.explain_query(Eq("status", TaskStatus.COMPLETED.value) | Eq("title", "x")).source == "scan"
+
+def test_planner_walks_sorted_view_for_first_page(task_service):
+    plan = task_service.explain_query(~Eq("category", "работа"), order_by="due_date", limit=10)
+    assert plan.source == "sorted_view"
+    selective = Eq("category", "работа") & Range("due_date", start="2024-03-01", end="2024-03-03")
+    assert task_service.explain_query(selective, order_by="priority", limit=10).source == "index"
+    assert task_service.explain_query(~Eq("category", "работа"), order_by="due_date").source == "scan"
+
+def test_query_is_updated_with_tasks(task_service):
+    task_service.update_task(1, "due_date", "2020-01-01")
+    assert [task.id for task in task_service.query_tasks(Range("due_date", end="2021-01-01"))] == [1]
+    task_service.delete_task(1)
+    assert task_service.query_tasks(Range("due_date", end="2021-01-01")) == []
+
+def test_unknown_field(task_service):
+    with pytest.raises(ValueError):
+        task_service.query_tasks(Eq("owner", "я"))
+    with pytest.raises(ValueError):
+        task_service.query_tasks(order_by="owner")
+
+def test_predicate_must_implement_all_methods():
+    class TitleOnly(Predicate):
+        def matches(self, task):
+            return task.title == "x"
+
+    with pytest.raises(TypeError):
+        TitleOnly()
+    with pytest.raises(TypeError):
+        Predicate()
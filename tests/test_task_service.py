@@ -1,14 +1,11 @@
+import io
+from datetime import date
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 from data_manager import DataManager
-from task_service import TaskService, TaskStatus
-from test_data import sample_tasks
-
-@pytest.fixture
-def data_manager():
-    data_manager = MagicMock(spec=DataManager)
-    data_manager.load_tasks.return_value = sample_tasks
-    return data_manager
+from task_query import Eq, Range
+from task_service import CompactTask, Task, TaskService, TaskStatus, parse_date, validate_tasks
+from test_data import mock_data_manager, sample_tasks
 
 @pytest.fixture
 def task_service(data_manager):
@@ -90,3 +87,299 @@ def test_sort_tasks_by_priority(task_service):
 def test_save_tasks(task_service, data_manager):
     task_service._save_tasks()
     data_manager.save_tasks.assert_called_once()
+
+def test_add_task_does_not_reuse_deleted_id(task_service, data_manager):
+    with patch('builtins.input', return_value='да'):
+        task_service.delete_task(2)
+    task_service.add_task("New Task", "New Description", "работа", "2023-12-03", "низкий")
+    assert task_service.tasks[-1].id == 3
+    assert task_service._get_task_by_id(3) is task_service.tasks[-1]
+    data_manager.save_next_id.assert_called_once_with(4)
+
+def test_reload_tasks_uses_stored_next_id(task_service, data_manager):
+    data_manager.load_next_id.return_value = 10
+    task_service.reload_tasks()
+    assert task_service.next_id == 10
+    assert task_service._get_task_by_id(2).title == "Task 2"
+
+def test_corrupted_file_is_not_overwritten(tmp_path, capsys):
+    path = tmp_path / "tasks.json"
+    path.write_text('[{"id": 1, "title": "Task 1",')
+    task_service = TaskService(data_manager=DataManager(path))
+    task_service.add_task("Новая задача", "Описание", "работа", "2030-01-01", "низкий")
+    assert "tasks.json.corrupt" in capsys.readouterr().out
+    assert (tmp_path / "tasks.json.corrupt").read_text() == '[{"id": 1, "title": "Task 1",'
+    assert [task["title"] for task in DataManager(path).load_tasks()] == ["Новая задача"]
+
+def test_add_task_returns_renumbered_task(tmp_path, capsys):
+    path = tmp_path / "tasks.json"
+    task_service, other = TaskService(data_manager=DataManager(path)), TaskService(data_manager=DataManager(path))
+    task_service.tasks, other.tasks
+    other.add_task("Задача другого процесса", "Описание", "работа", "2030-01-01", "низкий")
+    task = task_service.add_task("Новая задача", "Описание", "работа", "2030-01-01", "низкий")
+    assert task.id == 2
+    assert task_service.tasks_by_id[2] is task
+    assert task_service.tasks_by_id[1].title == "Задача другого процесса"
+
+def test_search_task_after_update(task_service, capsys):
+    task_service.update_task(2, 'title', 'Купить хлеб')
+    capsys.readouterr()
+    task_service.search_task('search', 'ХЛЕБ')
+    captured = capsys.readouterr()
+    assert "Купить хлеб" in captured.out
+    assert "Task 1" not in captured.out
+
+def test_find_task_ids_intersects_indexes(task_service):
+    task_service.complete_task(2)
+    assert task_service.find_task_ids(status=TaskStatus.UNCOMPLETED.value) == {1}
+    assert task_service.find_task_ids(category="личное", status=TaskStatus.COMPLETED.value) == {2}
+    assert task_service.find_task_ids(category="работа", priority="низкий") == set()
+
+def test_search_task_by_status(task_service, capsys):
+    task_service.complete_task(1)
+    capsys.readouterr()
+    task_service.search_task('status', 'Выполнена')
+    captured = capsys.readouterr()
+    assert "Task 1" in captured.out
+    assert "Task 2" not in captured.out
+
+def test_get_sorted_tasks_after_update(task_service):
+    task_service.update_task(2, 'priority', 'высокий')
+    task_service.update_task(1, 'due_date', '2024-01-01')
+    assert [task.id for task in task_service.get_sorted_tasks('priority')] == [1, 2]
+    assert [task.id for task in task_service.get_sorted_tasks('due_date')] == [2, 1]
+    assert [task.id for task in task_service.get_sorted_tasks('category', limit=1)] == [2]
+
+def test_compact_task_round_trip():
+    for data in sample_tasks:
+        task = CompactTask.from_dict(data)
+        assert task.to_dict() == data
+        assert task == Task.from_dict(data)
+    assert not hasattr(task, '__dict__')
+
+def test_compact_task_keeps_unknown_values():
+    data = dict(sample_tasks[0], category="New Category", due_date="someday")
+    assert CompactTask.from_dict(data).to_dict() == data
+
+def test_compact_task_service(data_manager, capsys):
+    task_service = TaskService(data_manager=data_manager, compact=True)
+    task_service.complete_task(1)
+    assert isinstance(task_service.tasks[0], CompactTask)
+    assert task_service.tasks[0].status == TaskStatus.COMPLETED.value
+    assert task_service.find_task_ids(status=TaskStatus.COMPLETED.value) == {1}
+    data_manager.set_fragment_cache.assert_called_once_with(False)
+
+def test_add_tasks_saves_once_per_batch(task_service, data_manager):
+    rows = [
+        {"title": f"Imported {i}", "description": "Описание", "category": "учеба",
+         "due_date": "2024-01-01", "priority": "средний"}
+        for i in range(5)
+    ]
+    rows.insert(2, dict(rows[0], category="unknown"))
+    result = task_service.add_tasks(rows, batch_size=2)
+    assert result.added == 5
+    assert len(result.errors) == 1 and "Задача 3" in result.errors[0]
+    assert [task.id for task in task_service.tasks[2:]] == [3, 4, 5, 6, 7]
+    assert task_service.tasks[-1].status == TaskStatus.UNCOMPLETED.value
+    assert data_manager.save_tasks.call_count == 3
+    assert task_service.find_task_ids(category="учеба") == {3, 4, 5, 6, 7}
+
+def test_import_and_export_round_trip(task_service, data_manager):
+    for file_format in ("csv", "jsonl"):
+        stream = io.StringIO()
+        assert task_service.export_tasks(stream, file_format) == 2
+        stream.seek(0)
+        other_service = TaskService(data_manager=data_manager)
+        other_service.tasks.clear()
+        other_service.tasks_by_id.clear()
+        assert other_service.import_tasks(stream, file_format).added == 2
+        assert [task.to_dict() for task in other_service.tasks] == [
+            dict(task, id=task["id"] + 2) for task in sample_tasks
+        ]
+
+def test_import_rejects_non_string_fields(task_service):
+    next_id = task_service.next_id
+    stream = io.StringIO(
+        '{"title": 5, "description": "d", "category": "работа", "due_date": "2030-01-01", "priority": "низкий"}\n'
+        '{"title": "t", "description": "d", "category": ["работа"], "due_date": "2030-01-01", "priority": "низкий"}\n'
+    )
+    result = task_service.import_tasks(stream, "jsonl")
+    assert result.added == 0
+    assert len(result.errors) == 2
+    assert len(task_service.tasks) == len(task_service.tasks_by_id) == 2
+    assert task_service.next_id == next_id
+
+def test_import_reports_malformed_jsonl_lines(task_service):
+    stream = io.StringIO(
+        '{"title": "t", "description": "d", "category": "работа", "due_date": "2030-01-01", "priority": "низкий"\n'
+        '5\n'
+        '["t", "d"]\n'
+        '{"title": "t", "description": "d", "category": "работа", "due_date": "2030-01-01", "priority": "низкий"}\n'
+    )
+    result = task_service.import_tasks(stream, "jsonl")
+    assert result.added == 1
+    assert [error.split(":")[0] for error in result.errors] == ["Задача 1", "Задача 2", "Задача 3"]
+    assert "некорректный JSON" in result.errors[0]
+    assert "JSON-объектом" in result.errors[1]
+    assert task_service.tasks[-1].id == 3
+
+def test_export_unknown_format(task_service):
+    with pytest.raises(ValueError):
+        task_service.export_tasks(io.StringIO(), "xml")
+
+def test_tasks_are_loaded_on_first_access(data_manager):
+    task_service = TaskService(data_manager=data_manager)
+    data_manager.iter_tasks.assert_not_called()
+    assert not task_service.loaded
+    assert task_service._get_task_by_id(2).title == "Task 2"
+    assert len(task_service.tasks) == 2
+    data_manager.iter_tasks.assert_called_once()
+
+def test_display_sorted_tasks_page(task_service, capsys):
+    assert task_service.display_sorted_tasks('priority', offset=0, limit=1) is True
+    captured = capsys.readouterr()
+    assert "Task 1" in captured.out
+    assert "Task 2" not in captured.out
+    assert task_service.display_sorted_tasks('priority', offset=1, limit=1) is False
+    assert "Task 2" in capsys.readouterr().out
+
+def test_print_tasks_writes_once(task_service):
+    with patch('sys.stdout') as stdout:
+        task_service.print_tasks(task_service.tasks)
+    stdout.write.assert_called_once()
+    assert stdout.write.call_args.args[0] == task_service.format_tasks(task_service.tasks)
+
+def test_save_replaces_tasks_with_merged_result(task_service, data_manager):
+    merged = [dict(task, title="Изменено другим процессом") for task in sample_tasks]
+    data_manager.save_tasks.return_value = merged
+    task_service.complete_task(1)
+    assert [task.title for task in task_service.tasks] == ["Изменено другим процессом"] * len(sample_tasks)
+    assert task_service.find_task_ids(status=TaskStatus.UNCOMPLETED.value) == {1, 2}
+
+def test_deadline_queries(task_service):
+    assert [task.id for task in task_service.overdue(date(2023, 12, 2))] == [1]
+    assert [task.id for task in task_service.due_between(date(2023, 12, 1), date(2023, 12, 2))] == [1, 2]
+    assert [task.id for task in task_service.due_between(date(2023, 12, 2), date(2023, 12, 9))] == [2]
+    assert [task.id for task in task_service.next_n_due(1, today=date(2023, 12, 1))] == [1]
+    assert task_service.next_n_due(5, today=date(2023, 12, 3)) == []
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_tasks_with_unparseable_due_date_are_not_in_deadline_index(compact):
+    tasks = [*sample_tasks, dict(sample_tasks[0], id=3, due_date="someday")]
+    task_service = TaskService(data_manager=mock_data_manager(tasks=tasks), compact=compact)
+    assert [task.id for task in task_service.due_between(date(2023, 1, 1), date.max)] == [1, 2]
+    assert [task.id for task in task_service.next_n_due(5, today=date(2023, 1, 1))] == [1, 2]
+    assert task_service.get_summary(today=date(2030, 1, 1)).overdue == 2
+    task_service.update_task(3, "due_date", "2023-11-30")
+    assert [task.id for task in task_service.overdue(date(2023, 12, 2))] == [3, 1]
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_deadline_index_follows_changes(data_manager, compact):
+    task_service = TaskService(data_manager=data_manager, compact=compact)
+    task_service.complete_task(1)
+    assert [task.id for task in task_service.overdue(date(2024, 1, 1))] == [2]
+    task_service.update_task(2, "due_date", "2030-01-01")
+    assert task_service.overdue(date(2024, 1, 1)) == []
+    new_task = task_service.add_task("Новая", "Описание", "работа", "2029-12-31", "низкий")
+    assert [task.id for task in task_service.next_n_due(2, today=date(2024, 1, 1))] == [new_task.id, 2]
+    task_service.delete_task(2)
+    assert [task.id for task in task_service.next_n_due(2, today=date(2024, 1, 1))] == [new_task.id]
+
+
+def test_parse_date():
+    assert parse_date("2030-03-31") == date(2030, 3, 31)
+    assert parse_date("2030-3-31") is None
+    assert parse_date("2030-02-30") is None
+    assert parse_date("２０３０-03-31") is None
+    hits = parse_date.cache_info().hits
+    parse_date("2030-03-31")
+    assert parse_date.cache_info().hits == hits + 1
+
+
+def test_validate_tasks_reports_errors_per_row():
+    rows = [
+        {"title": "Задача", "description": "Описание", "category": "работа",
+         "due_date": "2030-01-01", "priority": "низкий"},
+        {"title": "Задача", "description": "Описание", "category": "работа",
+         "due_date": "01.01.2030", "priority": "низкий"},
+        {"title": "Задача", "description": "Описание", "category": "работа",
+         "due_date": ["2030-01-01"], "priority": "низкий"},
+    ]
+    assert validate_tasks(rows) == [None, "некорректная дата '01.01.2030'", "некорректная дата '['2030-01-01']'"]
+
+
+def test_task_due_date_is_parsed(task_service):
+    task = task_service._get_task_by_id(1)
+    assert task.due == date.fromisoformat(task.due_date)
+
+
+def test_update_task_with_same_value_is_not_saved(task_service, data_manager):
+    task_service.update_task(1, 'title', task_service.tasks[0].title)
+    data_manager.save_tasks.assert_not_called()
+    task_service._save_tasks(changed=[])
+    data_manager.save_tasks.assert_not_called()
+
+
+def test_save_reuses_records_of_unchanged_tasks(task_service, data_manager):
+    task_service.update_task(1, 'title', 'Updated Task')
+    first_records = data_manager.save_tasks.call_args.args[0]()
+    task_service.update_task(2, 'title', 'Updated Task')
+    records = data_manager.save_tasks.call_args.args[0]()
+    assert records[0] is first_records[0]
+    assert records[1] is not first_records[1]
+    assert records[1]["title"] == 'Updated Task'
+    assert data_manager.save_tasks.call_args.kwargs["changed"] == [records[1]]
+
+
+def test_complete_tasks_by_filter(task_service, data_manager):
+    assert task_service.complete_tasks(Eq("category", "работа") & Range("due_date", end="2024-01-01")) == 1
+    assert task_service.tasks_by_id[1].status == TaskStatus.COMPLETED.value
+    assert task_service.tasks_by_id[2].status == TaskStatus.UNCOMPLETED.value
+    assert task_service.find_task_ids(status=TaskStatus.COMPLETED.value) == {1}
+    data_manager.save_tasks.assert_called_once()
+    assert task_service.complete_tasks(task_ids=[1, 999]) == 0
+    data_manager.save_tasks.assert_called_once()
+
+
+def test_update_tasks_saves_once(task_service, data_manager):
+    assert task_service.update_tasks({"priority": "высокий"}, task_ids=[1, 2]) == 1
+    assert task_service.find_task_ids(priority="высокий") == {1, 2}
+    assert [task["id"] for task in data_manager.save_tasks.call_args.kwargs["changed"]] == [2]
+    with pytest.raises(ValueError):
+        task_service.update_tasks({"id": 5}, task_ids=[1])
+
+
+def test_delete_tasks(task_service, data_manager):
+    assert task_service.delete_tasks(Eq("priority", "средний") | Eq("priority", "высокий")) == 2
+    assert task_service.tasks == []
+    assert task_service.tasks_by_id == {}
+    data_manager.save_tasks.assert_called_once()
+    assert data_manager.save_tasks.call_args.args[0]() == []
+    assert data_manager.save_tasks.call_args.kwargs == {"changed": [], "deleted": [1, 2]}
+
+
+def test_bulk_operation_requires_filter(task_service):
+    with pytest.raises(ValueError):
+        task_service.delete_tasks()
+
+
+def test_get_summary_is_updated_on_changes(task_service):
+    task_service.complete_task(1)
+    task_service.add_task("New Task", "New Description", "учеба", "2030-01-01", "низкий")
+    summary = task_service.get_summary(today=date(2024, 1, 1))
+    assert summary.total == 3
+    assert summary.by_category == {"работа": 1, "личное": 1, "учеба": 1, "здоровье": 0, "прочее": 0}
+    assert summary.by_status == {TaskStatus.COMPLETED.value: 1, TaskStatus.UNCOMPLETED.value: 2}
+    assert summary.by_priority == {"низкий": 1, "средний": 1, "высокий": 1}
+    assert summary.overdue == 1
+    assert summary.completed_by_due_date == {"2023-12-01": 1}
+    assert summary.completion_rate == pytest.approx(1 / 3)
+    task_service.delete_tasks(task_ids=[1, 2, 3])
+    assert task_service.get_summary().total == 0
+    assert task_service.get_summary().completion_rate == 0.0
+
+
+def test_display_summary(task_service, capsys):
+    task_service.display_summary(today=date(2024, 1, 1))
+    captured = capsys.readouterr()
+    assert "Всего задач: 2, выполнено: 0 (0%), просрочено: 2" in captured.out
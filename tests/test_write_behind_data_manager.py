@@ -0,0 +1,105 @@
+import pytest
+from data_manager import DataManager
+from task_service import TaskService
+from write_behind_data_manager import Durability, WriteBehindDataManager
+from test_data import sample_tasks
+
+
+@pytest.fixture
+def write_behind(data_manager):
+    write_behind = WriteBehindDataManager(data_manager, max_batch=3, max_delay=60)
+    yield write_behind
+    write_behind.close()
+
+def test_saves_are_coalesced(write_behind, data_manager):
+    first = dict(sample_tasks[0], title="A")
+    second = dict(sample_tasks[0], title="B")
+    write_behind.save_tasks([first, sample_tasks[1]], changed=[first])
+    write_behind.save_tasks([second, sample_tasks[1]], changed=[second])
+    data_manager.save_tasks.assert_not_called()
+    write_behind.flush()
+    data_manager.save_tasks.assert_called_once_with([second, sample_tasks[1]], changed=[second], deleted=[])
+
+def test_flush_when_batch_is_full(write_behind, data_manager):
+    for _ in range(3):
+        write_behind.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    data_manager.save_tasks.assert_called_once()
+
+def test_delete_overrides_change(write_behind, data_manager):
+    write_behind.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    write_behind.save_tasks(sample_tasks[1:], changed=[], deleted=[1])
+    write_behind.flush()
+    data_manager.save_tasks.assert_called_once_with(sample_tasks[1:], changed=[], deleted=[1])
+
+def test_unknown_changes_save_everything(write_behind, data_manager):
+    write_behind.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    write_behind.save_tasks(sample_tasks)
+    write_behind.flush()
+    data_manager.save_tasks.assert_called_once_with(sample_tasks, changed=None, deleted=None)
+
+def test_reads_flush_pending_changes(write_behind, data_manager):
+    write_behind.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    assert write_behind.load_tasks() == sample_tasks
+    data_manager.save_tasks.assert_called_once()
+    write_behind.load_next_id()
+    data_manager.load_next_id.assert_called_once()
+
+def test_reset_for_merge_is_passed_to_data_manager(write_behind, data_manager):
+    write_behind.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    write_behind.reset_for_merge({1, 2})
+    data_manager.save_tasks.assert_called_once()
+    data_manager.reset_for_merge.assert_called_once_with({1, 2})
+
+def test_durability_per_operation(data_manager):
+    write_behind = WriteBehindDataManager(data_manager, durability=Durability.OPERATION)
+    write_behind.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    data_manager.save_tasks.assert_called_once()
+    assert data_manager.fsync is True
+    write_behind.close()
+
+def test_next_id_is_saved_with_batch(write_behind, data_manager):
+    write_behind.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    write_behind.save_next_id(3)
+    data_manager.save_next_id.assert_not_called()
+    write_behind.flush()
+    data_manager.save_next_id.assert_called_once_with(3)
+
+def test_without_time_limit(data_manager):
+    write_behind = WriteBehindDataManager(data_manager, max_batch=10, max_delay=None)
+    write_behind.save_tasks(sample_tasks, changed=[sample_tasks[0]])
+    assert write_behind.timer is None
+    write_behind.close()
+    data_manager.save_tasks.assert_called_once()
+
+def file_tasks(path):
+    return [(task["id"], task["title"], task["status"]) for task in DataManager(path).load_tasks()]
+
+def two_writers(path, **options):
+    TaskService(DataManager(path)).add_task("a", "d", "работа", "2030-01-01", "низкий")
+    write_behind = WriteBehindDataManager(DataManager(path), max_delay=None, durability=Durability.NONE, **options)
+    own, other = TaskService(write_behind), TaskService(DataManager(path))
+    own.tasks, other.tasks
+    return write_behind, own, other
+
+def test_merge_is_returned_when_batch_is_written(tmp_path, capsys):
+    write_behind, own, other = two_writers(tmp_path / "tasks.json", max_batch=1)
+    other.add_task("from B", "d", "работа", "2030-01-01", "низкий")
+    own.add_task("from A", "d", "работа", "2030-01-01", "низкий")
+    own.complete_task(1)
+    write_behind.close()
+    assert [(task.id, task.title) for task in own.tasks] == [(1, "a"), (2, "from B"), (3, "from A")]
+    assert file_tasks(tmp_path / "tasks.json") == [
+        (1, "a", "выполнена"), (2, "from B", "не выполнена"), (3, "from A", "не выполнена"),
+    ]
+
+def test_merge_from_deferred_flush_is_returned_on_next_save(tmp_path, capsys):
+    write_behind, own, other = two_writers(tmp_path / "tasks.json", max_batch=10)
+    own.add_task("from A", "d", "работа", "2030-01-01", "низкий")
+    other.add_task("from B", "d", "работа", "2030-01-01", "низкий")
+    write_behind.flush()
+    own.complete_task(1)
+    assert [(task.id, task.title) for task in own.tasks] == [(1, "a"), (2, "from B"), (3, "from A")]
+    write_behind.close()
+    assert file_tasks(tmp_path / "tasks.json") == [
+        (1, "a", "выполнена"), (2, "from B", "не выполнена"), (3, "from A", "не выполнена"),
+    ]
@@ -0,0 +1,179 @@
+import atexit
+import threading
+import time
+from enum import Enum
+from functools import wraps
+from typing import Any, Iterator, Optional
+
+from data_manager import DataManager, TaskList, resolve_tasks
+
+
+class Durability(Enum):
+    NONE = "none"                # изменения копятся в пакеты, без fsync
+    BATCH = "batch"              # изменения копятся в пакеты, fsync после записи каждого пакета
+    OPERATION = "operation"      # каждое изменение записывается сразу с fsync
+
+
+class WriteBehindDataManager:
+    """
+    Обертка над менеджером данных с отложенной записью.
+    Сохранения, пришедшие в течение max_delay секунд или до накопления max_batch изменений,
+    объединяются в одну запись (max_delay=None - без ограничения по времени, только по количеству).
+    Изменения сливаются по id задачи, так что менеджер данных получает
+    последнюю версию каждой измененной задачи и полный список задач на момент записи.
+    Если при записи менеджер данных объединил пакет с изменениями другого процесса, итоговый список
+    возвращается из save_tasks: сразу, если запись выполнена в этом вызове, или при следующем вызове,
+    если пакет был записан по таймеру.
+    """
+    def __init__(
+            self,
+            data_manager: DataManager,
+            max_batch: int = 100,
+            max_delay: Optional[float] = 1.0,
+            durability: Durability = Durability.BATCH,
+    ):
+        self.data_manager = data_manager
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.durability = durability
+        self.data_manager.fsync = durability != Durability.NONE
+
+        self.lock = threading.RLock()
+        self.timer: Optional[threading.Timer] = None
+        self.pending_since: Optional[float] = None
+        self.pending_count = 0
+        self.tasks: list[dict[str, Any]] = []
+        self.changed: Optional[dict[int, dict[str, Any]]] = {}
+        self.deleted: set[int] = set()
+        self.next_id: Optional[int] = None
+        # Результат объединения с изменениями другого процесса, еще не переданный вызывающему коду
+        self.merged: Optional[list[dict[str, Any]]] = None
+        atexit.register(self.flush)
+
+    def save_tasks(
+            self,
+            tasks: TaskList,
+            changed: Optional[list[dict[str, Any]]] = None,
+            deleted: Optional[list[int]] = None,
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        Добавляет изменения в текущий пакет и записывает его, если пакет заполнен или устарел.
+        Пакет может быть записан по таймеру в другом потоке, поэтому полный список задач строится сразу,
+        кроме режима OPERATION, в котором запись выполняется в этом же вызове.
+        :return: Итоговый список задач, если записанный пакет был объединен с изменениями другого процесса, иначе None.
+        """
+        if self.durability == Durability.OPERATION:
+            return self.data_manager.save_tasks(tasks, changed=changed, deleted=deleted)
+
+        with self.lock:
+            self.tasks = resolve_tasks(tasks)
+            if changed is None and deleted is None:
+                self.changed = None
+            elif self.changed is not None:
+                for task in changed or []:
+                    self.changed[task["id"]] = task
+                    self.deleted.discard(task["id"])
+                for task_id in deleted or []:
+                    self.changed.pop(task_id, None)
+                    self.deleted.add(task_id)
+            self.pending_count += 1
+            merged = self._apply_pending_to_merged()
+
+            if self.pending_since is None:
+                self.pending_since = time.monotonic()
+                if self.max_delay is not None:
+                    self.timer = threading.Timer(self.max_delay, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+
+            if self.pending_count >= self.max_batch or (
+                    self.max_delay is not None and time.monotonic() - self.pending_since >= self.max_delay):
+                self.flush()
+                if self.merged is not None:
+                    merged, self.merged = self.merged, None
+            return merged
+
+    def _apply_pending_to_merged(self) -> Optional[list[dict[str, Any]]]:
+        """
+        Если предыдущий пакет был объединен с изменениями другого процесса при записи по таймеру,
+        применяет к итоговому списку текущий пакет и делает результат списком задач для следующей записи.
+        При неизвестных изменениях текущий пакет заменяет файл целиком, и итоговый список не нужен.
+        """
+        merged, self.merged = self.merged, None
+        if merged is None or self.changed is None:
+            return None
+        tasks = {task["id"]: task for task in merged}
+        for task_id in self.deleted:
+            tasks.pop(task_id, None)
+        tasks.update(self.changed)
+        self.tasks = sorted(tasks.values(), key=lambda task: task["id"])
+        return self.tasks
+
+    def save_next_id(self, next_id: int) -> None:
+        """Запоминает счетчик id, он сохраняется вместе со следующим пакетом изменений."""
+        if self.durability == Durability.OPERATION:
+            self.data_manager.save_next_id(next_id)
+            return
+        with self.lock:
+            self.next_id = next_id
+
+    def flush(self) -> None:
+        """Записывает накопленный пакет изменений, если он есть."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.next_id is not None:
+                self.data_manager.save_next_id(self.next_id)
+                self.next_id = None
+            if not self.pending_count:
+                return
+            merged = self.data_manager.save_tasks(
+                self.tasks,
+                changed=None if self.changed is None else list(self.changed.values()),
+                deleted=None if self.changed is None else list(self.deleted),
+            )
+            if merged is not None:
+                self.merged = merged
+            self.pending_since = None
+            self.pending_count = 0
+            self.tasks = []
+            self.changed = {}
+            self.deleted = set()
+
+    def close(self) -> None:
+        """Записывает накопленные изменения и отключает запись при выходе из программы."""
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def load_tasks(self) -> list[dict[str, Any]]:
+        """Задачи загружаются заново, поэтому отложенный результат объединения больше не нужен."""
+        with self.lock:
+            self.flush()
+            self.merged = None
+            return self.data_manager.load_tasks()
+
+    def iter_tasks(self) -> Iterator[dict[str, Any]]:
+        with self.lock:
+            self.flush()
+            self.merged = None
+            return self.data_manager.iter_tasks()
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Остальные методы (load_next_id, find_tasks и т.д.) передаются менеджеру данных.
+        Перед вызовом записываются накопленные изменения, чтобы чтение не вернуло устаревшие данные.
+        """
+        if name == "data_manager":
+            raise AttributeError(name)
+        attribute = getattr(self.data_manager, name)
+        if not callable(attribute):
+            return attribute
+
+        @wraps(attribute)
+        def call(*args, **kwargs):
+            with self.lock:
+                self.flush()
+                return attribute(*args, **kwargs)
+
+        return call